@@ -23,4 +23,4 @@ solution to an equation.
 
 __all__ = ["nomo_axis", "nomo_axis_func",
            "nomo_grid_box", "nomo_grid", "nomo_wrapper", "nomographer",
-           "isopleth", "nomograph3"]
+           "isopleth", "nomograph3", "tick_plan", "label_index", "nomo_text", "text_metrics", "stroke_batch", "symbols", "display_list", "svg_stream", "frozen_canvas", "layers", "tiles", "path_compaction"]
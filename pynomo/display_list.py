@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Display list is a backend neutral drawing of a finished nomogram. All
+paths are in absolute coordinates (PostScript points) and stored as arrays:
+
+    segments  float (N,8)  x0,y0,x1,y1,x2,y2,x3,y3 of Bezier curves,
+                           straight lines have control points at their ends
+    subpaths  int (M,3)    first segment, number of segments, closed (0/1)
+    items     int (K,4)    kind (STROKE, FILL, TEXT), first subpath,
+                           number of subpaths, style index
+    texts     float (T,5)  item index, llx, lly, urx, ury of text box
+    styles    list of dicts (colors, linewidth, dash, linecap, ...)
+
+Items are in drawing order. Texts are filled outlines of the typeset text.
+"""
+
+import json
+import math
+import numpy
+import pyx
+from .nomo_text import Drawn_Text_Box, Deferred_Text_Box
+from .symbols import Symbol_Instances
+
+STROKE = 0
+FILL = 1
+TEXT = 2
+
+DEFAULT_STATE = {'stroke': ['gray', 0.0],
+                 'fill': ['gray', 0.0],
+                 'linewidth': pyx.style._defaultlinewidth_pt,
+                 'dash': [],
+                 'dash_offset': 0.0,
+                 'dash_relative': True,
+                 'linecap': 0,
+                 'linejoin': 0,
+                 'miterlimit': 10.0,
+                 'opacity': 1.0}
+
+
+class Display_List(object):
+    """
+    Backend neutral drawing of nomogram, see module doc. Made from pyx
+    canvas with from_canvas(), written back to pyx canvas with to_canvas()
+    and stored with save() (.json or .npz), read with load_display_list().
+    """
+
+    def __init__(self):
+        self.segments = []
+        self.subpaths = []
+        self.items = []
+        self.texts = []
+        self.styles = []
+        self.style_index = {}  # json of style -> index
+        self.bbox = [0.0, 0.0, 0.0, 0.0]  # llx, lly, urx, ury in pt
+
+    def from_canvas(self, c):
+        """
+        adds drawing of pyx canvas c
+        """
+        bbox = c.bbox()
+        if bbox:
+            self.bbox = list(bbox.highrestuple_pt())
+        self._add_canvas_(c, pyx.trafo.trafo(), DEFAULT_STATE)
+        return self
+
+    def _add_canvas_(self, c, trafo, state):
+        """
+        adds items of canvas c with transformation trafo and graphics state
+        """
+        if c.clip is not None:
+            print("display list: clipping of canvas is ignored")
+        trafo = trafo * c.trafo
+        state = apply_styles(state, c.styles)
+        for item in c.items:
+            self._add_item_(item, trafo, state)
+
+    def _add_item_(self, item, trafo, state):
+        """
+        adds single canvas item
+        """
+        if isinstance(item, Deferred_Text_Box):
+            item = item.typeset()
+        if isinstance(item, pyx.canvas.canvas):
+            self._add_canvas_(item, trafo, state)
+        elif isinstance(item, pyx.deco.decoratedpath):
+            path_state = apply_styles(state, item.styles)
+            if item.fillstyles is not None:
+                self._add_path_(FILL, item.path, trafo,
+                                apply_styles(path_state, item.fillstyles, stroke=False))
+            if item.strokestyles is not None:
+                self._add_path_(STROKE, item.strokepath(), trafo,
+                                apply_styles(path_state, item.strokestyles, fill=False))
+            self._add_canvas_(item.ornaments, trafo, path_state)
+        elif isinstance(item, Symbol_Instances):
+            for x_pt, y_pt in item.points_pt:
+                self._add_canvas_(item.symbol.drawing, trafo * pyx.trafo.translate_pt(x_pt, y_pt), state)
+        elif isinstance(item, Drawn_Text_Box):
+            self._add_text_(item, item.glyphs, trafo, state)
+        elif hasattr(item, 'textpath'):  # typeset text
+            self._add_text_(item, None, trafo, state)
+        else:
+            print("display list: item %s is ignored" % item.__class__.__name__)
+
+    def _add_text_(self, box, glyphs, trafo, state):
+        """
+        adds text box as outline (or glyphs canvas) and its box
+        """
+        first_item = len(self.items)
+        if glyphs is not None:
+            self._add_canvas_(glyphs, trafo, state)
+        else:
+            try:
+                self._add_path_(TEXT, box.textpath(), trafo, state)
+            except Exception:  # for example fonts without outlines
+                print("display list: text without outline, only box is stored")
+        bbox = box.bbox().transformed(trafo)
+        if bbox and all(math.isfinite(value) for value in bbox.highrestuple_pt()):
+            self.texts.append([first_item] + list(bbox.highrestuple_pt()))
+
+    def _add_path_(self, kind, path, trafo, state):
+        """
+        adds path (in canvas coordinates) as item
+        """
+        try:
+            normpath = finite_path(path).normpath().transformed(trafo)
+        except AssertionError:  # PyX could not normalize path
+            print("display list: path that can not be normalized is ignored")
+            return
+        first_subpath = len(self.subpaths)
+        for normsubpath in normpath.normsubpaths:
+            if not all(_finite_item_(item) for item in normsubpath.normsubpathitems):
+                continue  # for example text placed at nan
+            first_segment = len(self.segments)
+            for segment in normsubpath.normsubpathitems:
+                if isinstance(segment, pyx.normpath.normcurve_pt):
+                    self.segments.append([segment.x0_pt, segment.y0_pt, segment.x1_pt, segment.y1_pt,
+                                          segment.x2_pt, segment.y2_pt, segment.x3_pt, segment.y3_pt])
+                else:
+                    self.segments.append([segment.x0_pt, segment.y0_pt, segment.x0_pt, segment.y0_pt,
+                                          segment.x1_pt, segment.y1_pt, segment.x1_pt, segment.y1_pt])
+            self.subpaths.append([first_segment, len(self.segments) - first_segment,
+                                  int(normsubpath.closed)])
+        if len(self.subpaths) > first_subpath:
+            self.items.append([kind, first_subpath, len(self.subpaths) - first_subpath,
+                               self._style_(kind, state)])
+
+    def _style_(self, kind, state):
+        """
+        index of style of item of kind drawn with graphics state
+        """
+        if kind == STROKE:
+            dash = state['dash']
+            if state['dash_relative']:
+                dash = [length * state['linewidth'] / pyx.style._defaultlinewidth_pt for length in dash]
+            style = {'stroke': state['stroke'], 'linewidth': state['linewidth'],
+                     'dash': dash, 'dash_offset': state['dash_offset'],
+                     'linecap': state['linecap'], 'linejoin': state['linejoin'],
+                     'miterlimit': state['miterlimit'], 'opacity': state['opacity']}
+        else:
+            style = {'fill': state['fill'], 'opacity': state['opacity']}
+        key = json.dumps(style, sort_keys=True)
+        if key not in self.style_index:
+            self.style_index[key] = len(self.styles)
+            self.styles.append(style)
+        return self.style_index[key]
+
+    def arrays(self):
+        """
+        display list as dict of numpy arrays (styles as json string)
+        """
+        return {'segments': numpy.array(self.segments, dtype=float).reshape(-1, 8),
+                'subpaths': numpy.array(self.subpaths, dtype=int).reshape(-1, 3),
+                'items': numpy.array(self.items, dtype=int).reshape(-1, 4),
+                'texts': numpy.array(self.texts, dtype=float).reshape(-1, 5),
+                'bbox': numpy.array(self.bbox, dtype=float),
+                'styles': numpy.array(json.dumps(self.styles))}
+
+    def save(self, filename):
+        """
+        saves display list to filename, numpy .npz file if filename ends
+        with .npz, otherwise json
+        """
+        if filename.endswith('.npz'):
+            numpy.savez_compressed(filename, **self.arrays())
+        else:
+            with open(filename, 'w') as f:
+                json.dump({'bbox': self.bbox, 'styles': self.styles, 'segments': self.segments,
+                           'subpaths': self.subpaths, 'items': self.items, 'texts': self.texts}, f)
+
+    def item_path(self, idx):
+        """
+        pyx normpath of item idx
+        """
+        kind, first_subpath, n_subpaths, style_idx = self.items[idx]
+        normsubpaths = []
+        for first_segment, n_segments, closed in self.subpaths[first_subpath:first_subpath + n_subpaths]:
+            segments = []
+            for segment in self.segments[first_segment:first_segment + n_segments]:
+                if is_line(segment):
+                    segments.append(pyx.normpath.normline_pt(segment[0], segment[1], segment[6], segment[7]))
+                else:
+                    segments.append(pyx.normpath.normcurve_pt(*segment))
+            normsubpaths.append(pyx.normpath.normsubpath(segments, closed=bool(closed)))
+        return pyx.normpath.normpath(normsubpaths)
+
+    def to_canvas(self):
+        """
+        pyx canvas drawn from display list
+        """
+        c = pyx.canvas.canvas()
+        for idx, (kind, first_subpath, n_subpaths, style_idx) in enumerate(self.items):
+            style = self.styles[style_idx]
+            if kind == STROKE:
+                c.stroke(self.item_path(idx), stroke_attrs(style))
+            else:
+                c.fill(self.item_path(idx), fill_attrs(style))
+        return c
+
+
+def load_display_list(filename):
+    """
+    reads display list saved with Display_List.save
+    """
+    display_list = Display_List()
+    if filename.endswith('.npz'):
+        data = numpy.load(filename)
+        display_list.segments = data['segments'].tolist()
+        display_list.subpaths = data['subpaths'].tolist()
+        display_list.items = data['items'].tolist()
+        display_list.texts = data['texts'].tolist()
+        display_list.bbox = data['bbox'].tolist()
+        display_list.styles = json.loads(str(data['styles']))
+    else:
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        for key in ['bbox', 'styles', 'segments', 'subpaths', 'items', 'texts']:
+            setattr(display_list, key, data[key])
+    return display_list
+
+
+def is_line(segment):
+    """
+    True if segment [x0,y0,x1,y1,x2,y2,x3,y3] is straight line stored
+    with control points at its ends
+    """
+    return segment[2] == segment[0] and segment[3] == segment[1] and \
+        segment[4] == segment[6] and segment[5] == segment[7]
+
+
+def finite_path(path):
+    """
+    path without subpaths having non-finite (nan, inf) coordinates, for
+    example from log of negative value. PyX writes such paths to PDF as
+    they are but can not normalize them.
+    """
+    if not isinstance(path, pyx.path.path) or is_finite_path(path):
+        return path
+    subpaths = []
+    for item in path.pathitems:
+        if isinstance(item, pyx.path.moveto_pt) or len(subpaths) == 0:
+            subpaths.append([])
+        subpaths[-1].append(item)
+    return pyx.path.path(*[item for subpath in subpaths if all(_finite_item_(item) for item in subpath)
+                           for item in subpath])
+
+
+def is_finite_path(path):
+    """
+    True if all coordinates of path (pyx path or normpath) are finite
+    """
+    if isinstance(path, pyx.normpath.normpath):
+        return all(_finite_item_(item) for normsubpath in path.normsubpaths
+                   for item in normsubpath.normsubpathitems)
+    return all(_finite_item_(item) for item in path.pathitems)
+
+
+def _finite_item_(item):
+    """
+    True if numbers of path item (slots such as x_pt, y_pt) are finite
+    """
+    for cls in type(item).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            value = getattr(item, name, None)
+            if isinstance(value, float) and not math.isfinite(value):
+                return False
+    return True
+
+
+def color_to_list(color):
+    """
+    pyx color as list [color space, components...]
+    """
+    if isinstance(color, pyx.color.cmyk):
+        return ['cmyk', color.c, color.m, color.y, color.k]
+    if isinstance(color, pyx.color.gray):
+        return ['gray', color.g]
+    rgb = color.rgb()
+    return ['rgb', rgb.r, rgb.g, rgb.b]
+
+
+def list_to_color(color_list):
+    """
+    inverse of color_to_list
+    """
+    if color_list[0] == 'cmyk':
+        return pyx.color.cmyk(*color_list[1:])
+    if color_list[0] == 'gray':
+        return pyx.color.gray(*color_list[1:])
+    return pyx.color.rgb(*color_list[1:])
+
+
+def color_to_rgb(color_list):
+    """
+    (r,g,b) of color list
+    """
+    rgb = list_to_color(color_list).rgb()
+    return rgb.r, rgb.g, rgb.b
+
+
+def apply_styles(state, attrs, stroke=True, fill=True):
+    """
+    new graphics state (dict) after pyx style attributes attrs
+    """
+    state = dict(state)
+    for attr in attrs or []:
+        if isinstance(attr, pyx.color.transparency):
+            state['opacity'] = attr.value
+        elif isinstance(attr, pyx.color.color):
+            if stroke:
+                state['stroke'] = color_to_list(attr)
+            if fill:
+                state['fill'] = color_to_list(attr)
+        elif isinstance(attr, pyx.style.linewidth):
+            state['linewidth'] = pyx.unit.topt(attr.width)
+        elif isinstance(attr, pyx.style.linestyle):
+            state = apply_styles(state, [attr.c, attr.d], stroke, fill)
+        elif isinstance(attr, pyx.style.linecap):
+            state['linecap'] = attr.value
+        elif isinstance(attr, pyx.style.linejoin):
+            state['linejoin'] = attr.value
+        elif isinstance(attr, pyx.style.miterlimit):
+            state['miterlimit'] = attr.value
+        elif isinstance(attr, pyx.style.dash):
+            state['dash'] = list(attr.pattern)
+            state['dash_offset'] = attr.offset
+            state['dash_relative'] = bool(attr.rellengths)
+    return state
+
+
+def stroke_attrs(style):
+    """
+    pyx stroke attributes of display list style
+    """
+    attrs = [list_to_color(style['stroke']),
+             pyx.style.linewidth(style['linewidth'] * pyx.unit.t_pt),
+             pyx.style.linecap(style['linecap']),
+             pyx.style.linejoin(style['linejoin']),
+             pyx.style.miterlimit(style['miterlimit']),
+             pyx.style.dash(style['dash'], style['dash_offset'], rellengths=0)]
+    if style['opacity'] != 1.0:
+        attrs.append(pyx.color.transparency(1.0 - style['opacity']))
+    return attrs
+
+
+def fill_attrs(style):
+    """
+    pyx fill attributes of display list style
+    """
+    attrs = [list_to_color(style['fill'])]
+    if style['opacity'] != 1.0:
+        attrs.append(pyx.color.transparency(1.0 - style['opacity']))
+    return attrs
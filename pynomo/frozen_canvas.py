@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Finished canvas prepared for writing many outputs. Bounding boxes of paths
+are the main shared work of pyx writers (each writer computes them again
+for page size and for every drawn item), they are computed only once here.
+Texts are resolved too: TeX boxes read their DVI file lazily at first
+output, which must not happen in many writer threads at once.
+"""
+
+import copy
+import pyx
+
+from .nomo_text import Deferred_Text_Box, flush_texts
+
+
+class Frozen_Path(pyx.path.path):
+    """
+    path with bounding box computed once. Path must not be changed afterwards.
+    """
+
+    def __init__(self, path):
+        pyx.path.path.__init__(self, *path.pathitems)
+        self.frozen_bbox = path.bbox()
+
+    def bbox(self):
+        return copy.copy(self.frozen_bbox)
+
+
+def freeze_canvas(c):
+    """
+    replaces paths of all decorated paths in canvas c (and sub canvases)
+    with frozen paths and finishes all texts. After this canvas is only
+    read while written. Returns number of frozen paths.
+    """
+    flush_texts(c)
+    count = 0
+    for item in c.items:
+        if isinstance(item, pyx.canvas.canvas):
+            count += freeze_canvas(item)
+        elif isinstance(item, pyx.deco.decoratedpath) and type(item.path) is pyx.path.path:
+            item.path = Frozen_Path(item.path)
+            count += 1
+        elif isinstance(item, Deferred_Text_Box):
+            _finish_text_(item.typeset())
+        else:
+            _finish_text_(item)
+    return count
+
+
+def _finish_text_(box):
+    """
+    reads DVI of TeX text box now (pyx does it at first output)
+    """
+    if isinstance(box, pyx.text.textextbox_pt):
+        box.dvicanvas
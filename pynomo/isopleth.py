@@ -24,6 +24,7 @@ import copy, re
 import scipy.optimize
 from numpy import arange
 import warnings
+from .symbols import Symbol_Batch, circle_symbol
 
 
 class Isopleth_Wrapper(object):
@@ -143,13 +144,38 @@ class Isopleth_Wrapper(object):
         """
         solves isopleths and draws them
         """
+        self.solve()
+        self.draw_solved(canvas)
+
+    def solve(self):
+        """
+        calculates atoms and solves unknown values (self.solutions)
+        """
         for isopleth in self.isopleth_list:
             isopleth.calc_atoms()
         self._solve_()
+
+    def draw_solved(self, canvas):
+        """
+        draws isopleths solved with solve()
+        """
         for idx, isopleth in enumerate(self.isopleth_list):
             p = self.nomographer_params
             isopleth.draw(canvas, p)
 
+    def draw_overlay(self, canvas):
+        """
+        solves isopleths and draws them over finished nomogram. Atom lines
+        are calculated only if missing.
+        """
+        for isopleth in self.isopleth_list:
+            for atom in isopleth.atom_stack:
+                if not hasattr(atom, 'line'):
+                    atom.calc_line_and_sections()
+        self._solve_()
+        for idx, isopleth in enumerate(self.isopleth_list):
+            isopleth.draw(canvas, self.nomographer_params)
+
     def _solve_(self):
         """
         solves unknown values
@@ -378,6 +404,7 @@ class Isopleth_Block(object):
         """
         draws the isopleth
         """
+        markers = Symbol_Batch()  # circles are drawn last, over all lines
         for idx, (x1, y1, x2, y2, x3, y3) in enumerate(self.draw_coordinates):
             xx1, yy1, xx2, yy2 = self.find_farthest_pair_extra(x1, y1, x2, y2, x3, y3, idx)
             # print xx1,yy1,xx2,yy2
@@ -395,9 +422,9 @@ class Isopleth_Block(object):
             #                                                    pyx.style.linestyle.dashed])
             canvas.stroke(pyx.path.line(xx1, yy1, xx2, yy2), draw_params_list)
             circle_radius = self.parse_circle_size(p)
-            self._draw_circle_(canvas, x1, y1, circle_radius, color_param)
-            self._draw_circle_(canvas, x2, y2, circle_radius, color_param)
-            self._draw_circle_(canvas, x3, y3, circle_radius, color_param)
+            self._draw_circle_(markers, x1, y1, circle_radius, color_param)
+            self._draw_circle_(markers, x2, y2, circle_radius, color_param)
+            self._draw_circle_(markers, x3, y3, circle_radius, color_param)
         for idx, line_points in enumerate(self.other_points):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -408,14 +435,14 @@ class Isopleth_Block(object):
             color_param = draw_params_list[0]
             for points in line_points:
                 for (x, y) in points:
-                    self._draw_circle_(canvas, x, y, circle_radius, color_param)
+                    self._draw_circle_(markers, x, y, circle_radius, color_param)
+        markers.insert(canvas)
 
-    def _draw_circle_(self, canvas, x, y, r, circle_color=pyx.color.cmyk.Black):
+    def _draw_circle_(self, markers, x, y, r, circle_color=pyx.color.cmyk.Black):
         """
-        draws marker circle
+        adds marker circle to markers (Symbol_Batch)
         """
-        canvas.fill(pyx.path.circle(x, y, r), [pyx.color.rgb.white])
-        canvas.stroke(pyx.path.circle(x, y, r), [circle_color])
+        markers.add(circle_symbol(r, circle_color, pyx.color.rgb.white), x, y)
 
     def solve(self, solutions):
         """
@@ -951,6 +978,7 @@ class Isopleth_Block_Type_5(Isopleth_Block):
         """
         draws the isopleth
         """
+        markers = Symbol_Batch()  # circles are drawn last, over all lines
         for idx, (x1, y1, x2, y2, x3, y3) in enumerate(self.draw_coordinates):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -961,9 +989,9 @@ class Isopleth_Block_Type_5(Isopleth_Block):
             circle_radius = self.parse_circle_size(p)
             canvas.stroke(pyx.path.line(x1, y1, x2, y2), draw_params_list)
             canvas.stroke(pyx.path.line(x2, y2, x3, y3), draw_params_list)
-            self._draw_circle_(canvas, x1, y1, circle_radius, color_param)
-            self._draw_circle_(canvas, x2, y2, circle_radius, color_param)
-            self._draw_circle_(canvas, x3, y3, circle_radius, color_param)
+            self._draw_circle_(markers, x1, y1, circle_radius, color_param)
+            self._draw_circle_(markers, x2, y2, circle_radius, color_param)
+            self._draw_circle_(markers, x3, y3, circle_radius, color_param)
         for idx, line_points in enumerate(self.other_points):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -974,7 +1002,8 @@ class Isopleth_Block_Type_5(Isopleth_Block):
             circle_radius = self.parse_circle_size(p)
             for points in line_points:
                 for (x, y) in points:
-                    self._draw_circle_(canvas, x, y, circle_radius)
+                    self._draw_circle_(markers, x, y, circle_radius)
+        markers.insert(canvas)
 
     def solve(self, solutions):
         """
@@ -1325,6 +1354,7 @@ class Isopleth_Block_Type_6(Isopleth_Block):
         """
         draws the isopleth
         """
+        markers = Symbol_Batch()  # circles are drawn last, over all lines
         for idx, (x1, y1, x2, y2) in enumerate(self.draw_coordinates):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -1339,8 +1369,8 @@ class Isopleth_Block_Type_6(Isopleth_Block):
             y_offset2 = self.atom_stack[1].params['align_y_offset']
             canvas.stroke(pyx.path.line(x1 - x_offset1, y1 - y_offset1, x2 - x_offset2, y2 - y_offset2),
                           draw_params_list)
-            self._draw_circle_(canvas, x1, y1, circle_radius, color_param)
-            self._draw_circle_(canvas, x2, y2, circle_radius, color_param)
+            self._draw_circle_(markers, x1, y1, circle_radius, color_param)
+            self._draw_circle_(markers, x2, y2, circle_radius, color_param)
         for idx, line_points in enumerate(self.other_points):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -1351,7 +1381,8 @@ class Isopleth_Block_Type_6(Isopleth_Block):
             circle_radius = self.parse_circle_size(p)
             for points in line_points:
                 for (x, y) in points:
-                    self._draw_circle_(canvas, x, y, circle_radius, color_param)
+                    self._draw_circle_(markers, x, y, circle_radius, color_param)
+        markers.insert(canvas)
 
 
 class Isopleth_Block_Type_7(Isopleth_Block_Type_1):
@@ -1428,6 +1459,7 @@ class Isopleth_Block_Type_8(Isopleth_Block):
         """
         draws the isopleth
         """
+        markers = Symbol_Batch()  # circles are drawn last, over all lines
         for idx, (x1, y1) in enumerate(self.draw_coordinates):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -1440,7 +1472,7 @@ class Isopleth_Block_Type_8(Isopleth_Block):
             y_offset = self.atom_stack[0].params['align_y_offset']
             if x_offset != 0 or y_offset != 0:
                 canvas.stroke(pyx.path.line(x1, y1, x1 - x_offset, y1 - y_offset), draw_params_list)
-            self._draw_circle_(canvas, x1, y1, circle_radius, color_param)
+            self._draw_circle_(markers, x1, y1, circle_radius, color_param)
         for idx, line_points in enumerate(self.other_points):
             if len(draw_params) > idx:
                 p = draw_params[idx]
@@ -1451,7 +1483,8 @@ class Isopleth_Block_Type_8(Isopleth_Block):
             circle_radius = self.parse_circle_size(p)
             for points in line_points:
                 for (x, y) in points:
-                    self._draw_circle_(canvas, x, y, circle_radius, color_param)
+                    self._draw_circle_(markers, x, y, circle_radius, color_param)
+        markers.insert(canvas)
 
 
 class Isopleth_Block_Type_9(Isopleth_Block_Type_1):
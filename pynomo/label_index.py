@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import math
+import pyx
+
+
+class Label_Index(object):
+    """
+    Grid index of bounding boxes of labels drawn into nomogram. Used to
+    find labels that collide with labels drawn earlier. Titles (added with
+    add_item before texts of their axis or nomogram) are always drawn, other
+    labels drawn first (major tick texts, earlier axes) have priority.
+
+    mode: 'drop'  = colliding label is not drawn
+          'shift' = colliding label is moved outwards, dropped if no room found
+    cell_size: grid cell size in cm
+    padding: minimum gap between labels in cm
+    """
+
+    def __init__(self, mode='drop', cell_size=1.0, padding=0.02, shift_steps=3):
+        self.mode = mode
+        self.cell_size_pt = pyx.unit.topt(cell_size)
+        self.padding_pt = pyx.unit.topt(padding)
+        self.shift_steps = shift_steps
+        self.cells = {}  # (i,j) -> list of box indices
+        self.boxes = []  # (llx,lly,urx,ury) in pt
+        self.dropped = []  # texts that were not drawn
+        self.shifted = []  # texts that were moved
+
+    def _cell_range_(self, box):
+        """
+        grid cells covered by box
+        """
+        llx, lly, urx, ury = box
+        i_min = int(math.floor(llx / self.cell_size_pt))
+        i_max = int(math.floor(urx / self.cell_size_pt))
+        j_min = int(math.floor(lly / self.cell_size_pt))
+        j_max = int(math.floor(ury / self.cell_size_pt))
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                yield i, j
+
+    def collides(self, box):
+        """
+        True if box (llx,lly,urx,ury) in pt overlaps any box in index
+        """
+        llx, lly, urx, ury = box
+        p = self.padding_pt
+        for cell in self._cell_range_(box):
+            for idx in self.cells.get(cell, []):
+                llx2, lly2, urx2, ury2 = self.boxes[idx]
+                if llx < urx2 + p and llx2 < urx + p and lly < ury2 + p and lly2 < ury + p:
+                    return True
+        return False
+
+    def add(self, box):
+        """
+        adds box (llx,lly,urx,ury) in pt to index
+        """
+        self.boxes.append(box)
+        idx = len(self.boxes) - 1
+        for cell in self._cell_range_(box):
+            self.cells.setdefault(cell, []).append(idx)
+
+    def state_key(self):
+        """
+        digest of settings and labels of index. Same drawing on index with
+        same state drops and shifts same labels.
+        """
+        state = (self.mode, self.cell_size_pt, self.padding_pt, self.shift_steps, self.boxes)
+        return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()
+
+    def mark(self):
+        """
+        current position in labels of index, see labels_since
+        """
+        return len(self.boxes), len(self.dropped), len(self.shifted)
+
+    def labels_since(self, mark):
+        """
+        boxes added and texts dropped and shifted after mark
+        """
+        return self.boxes[mark[0]:], self.dropped[mark[1]:], self.shifted[mark[2]:]
+
+    def replay(self, labels):
+        """
+        adds again labels given by labels_since (drawing that is reused as it is)
+        """
+        boxes, dropped, shifted = labels
+        for box in boxes:
+            self.add(box)
+        self.dropped.extend(dropped)
+        self.shifted.extend(shifted)
+
+    def add_item(self, item):
+        """
+        adds bounding box of canvas item (for example title text) to index
+        """
+        bbox = item.bbox()
+        if bbox:
+            self.add(_bbox_tuple_(bbox))
+
+    def place_text(self, c, x, y, text, attrs):
+        """
+        typesets text and inserts it into canvas c if it does not collide
+        with earlier labels. Returns inserted item or None if dropped.
+        """
+        textbox = c.textengine.text(x, y, text, attrs)
+        bbox = textbox.bbox()
+        if not bbox:
+            return c.insert(textbox)
+        box = _bbox_tuple_(bbox)
+        if not self.collides(box):
+            self.add(box)
+            return c.insert(textbox)
+        if self.mode == 'shift':
+            dir_x, dir_y = _outward_direction_(attrs)
+            step = bbox.height_pt() + self.padding_pt
+            for n in range(1, self.shift_steps + 1):
+                dx, dy = n * step * dir_x, n * step * dir_y
+                shifted_box = (box[0] + dx, box[1] + dy, box[2] + dx, box[3] + dy)
+                if not self.collides(shifted_box):
+                    self.add(shifted_box)
+                    self.shifted.append(text)
+                    return c.insert(textbox, [pyx.trafo.translate_pt(dx, dy)])
+        self.dropped.append(text)
+        return None
+
+
+class Label_Canvas(object):
+    """
+    canvas given to user draw functions (text_draw_func etc.) so that their
+    texts go through label index. Other methods are those of canvas c.
+    """
+
+    def __init__(self, c, label_index):
+        self.canvas = c
+        self.label_index = label_index
+
+    def text(self, x, y, text, attrs=[]):
+        return self.label_index.place_text(self.canvas, x, y, text, attrs)
+
+    def __getattr__(self, name):
+        if name in ('canvas', 'label_index'):
+            raise AttributeError(name)
+        return getattr(self.canvas, name)
+
+
+def draw_label(c, x, y, text, attrs, label_index=None):
+    """
+    draws text into canvas c, through label_index if given (colliding
+    text is dropped or shifted). Returns inserted item or None if dropped.
+    """
+    if label_index is None:
+        return c.text(x, y, text, attrs)
+    return label_index.place_text(c, x, y, text, attrs)
+
+
+def label_canvas(c, label_index=None):
+    """
+    c or, if label_index is given, Label_Canvas placing texts of c through it
+    """
+    if label_index is None:
+        return c
+    return Label_Canvas(c, label_index)
+
+
+def _bbox_tuple_(bbox):
+    """
+    pyx bbox as tuple (llx,lly,urx,ury) in pt
+    """
+    return bbox.llx_pt, bbox.lly_pt, bbox.urx_pt, bbox.ury_pt
+
+
+def _outward_direction_(attrs):
+    """
+    unit vector pointing away from the tick for tick text with attrs.
+    Tick texts are aligned so that they grow outwards from their anchor.
+    """
+    angle = 0.0
+    for attr in attrs:
+        if isinstance(attr, pyx.trafo.trafo_pt):
+            angle = math.atan2(attr.matrix[1][0], attr.matrix[0][0])
+    if pyx.text.halign.center in attrs:  # text below anchor
+        return math.sin(angle), -math.cos(angle)
+    if pyx.text.halign.right in attrs:
+        return -math.cos(angle), -math.sin(angle)
+    return math.cos(angle), math.sin(angle)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Nomogram is composed of layers: one sub canvas for each block, one for
+isopleths and one for titles and extra texts. Each layer has a fingerprint
+of everything it is drawn from (parameters, functions, transformations).
+A Layer_Cache given to next nomogram (main param 'layer_cache') reuses the
+layers whose fingerprint did not change and draws only the changed ones:
+
+    nomo = Nomographer(params)
+    params['layer_cache'] = nomo.layer_cache
+    params['block_params'][3]['f2_params']['tick_levels'] = 4
+    Nomographer(params)  # only block 3 is drawn again
+
+Functions are identified by their code, constants, default values and
+closure values. Global variables used inside functions are not followed.
+
+With label collisions (see label_index.py) state of shared Label_Index is
+part of layer fingerprint, and labels of reused layer are added to index
+again. Texts of reused layer are counted in text report as cache hits.
+"""
+
+import hashlib
+import types
+import numpy
+import pyx
+
+from .nomo_text import Text_Engine
+
+
+class Uncacheable(Exception):
+    """
+    object that can not be identified by its contents
+    """
+    pass
+
+
+class Layer_Cache(object):
+    """
+    layers of nomogram by name: name -> (fingerprint, sub canvas, labels, text counts)
+    """
+
+    def __init__(self):
+        self.layers = {}
+        self.drawn = []  # names of layers drawn in last nomogram
+        self.reused = []  # names of layers reused in last nomogram
+
+    def reset_stats(self):
+        self.drawn = []
+        self.reused = []
+
+    def insert(self, c, name, fingerprint, draw_func, label_index=None):
+        """
+        inserts layer name into canvas c. draw_func(layer_canvas) is called
+        only if fingerprint differs from cached one. Fingerprint None = layer
+        is always drawn and not cached.
+        label_index: Label_Index shared with other layers or None
+        """
+        engine = c.textengine if isinstance(c.textengine, Text_Engine) else None
+        if fingerprint is not None and label_index is not None:
+            fingerprint = (fingerprint, label_index.state_key())  # placement of labels depends on it
+        cached = self.layers.get(name)
+        if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+            dummy, layer, labels, text_counts = cached
+            if label_index is not None:
+                label_index.replay(labels)
+            if engine is not None:
+                engine.record_reused(text_counts)
+            self.reused.append(name)
+            return c.insert(layer)
+        layer = pyx.canvas.canvas()
+        layer.settextengine(c.textengine)
+        label_mark = label_index.mark() if label_index is not None else None
+        counts_before = engine.count_texts() if engine is not None else {}
+        draw_func(layer)
+        self.drawn.append(name)
+        if fingerprint is not None:
+            labels = label_index.labels_since(label_mark) if label_index is not None else None
+            text_counts = {}
+            if engine is not None:
+                for origin, count in engine.count_texts().items():
+                    if count > counts_before.get(origin, 0):
+                        text_counts[origin] = count - counts_before.get(origin, 0)
+            self.layers[name] = (fingerprint, layer, labels, text_counts)
+        else:
+            self.layers.pop(name, None)
+        return c.insert(layer)
+
+
+def fingerprint(*objects, **kwargs):
+    """
+    hex digest of contents of objects, None if some object can not be identified.
+    known: dict id(object) -> key for objects identified otherwise
+    """
+    known = kwargs.get('known', {})
+    try:
+        key = tuple(content_key(obj, known) for obj in objects)
+    except Uncacheable:
+        return None
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+
+def block_fingerprint(block, signature):
+    """
+    fingerprint of block layer: block params (without isopleth values),
+    params of atoms and numbers of block and atoms after transformations.
+    signature: text engine signature, see nomo_text.engine_signature
+    """
+    block_params = dict((name, value) for name, value in block.ref_block_params.items()
+                        if name != 'isopleth_values')
+    atoms = [(atom.params, _numbers_(atom)) for atom in block.atom_stack]
+    # functions of block and atoms refer to themselves, contents are in params
+    known = dict((id(atom), ('atom', idx)) for idx, atom in enumerate(block.atom_stack))
+    known[id(block)] = ('block',)
+    return fingerprint(block.__class__.__name__, block_params, _numbers_(block), atoms, signature,
+                       known=known)
+
+
+def _numbers_(obj):
+    """
+    numeric attributes of object (transformation coefficients etc.)
+    """
+    return sorted((name, value) for name, value in vars(obj).items()
+                  if isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def content_key(obj, known={}, _active=None):
+    """
+    hashable key of contents of obj (params dict, list, function, pyx attribute ...).
+    known: dict id(object) -> key for objects identified otherwise.
+    Raises Uncacheable for objects that can not be identified by contents.
+    """
+    if _active is None:
+        _active = []  # ids of enclosing objects
+    if id(obj) in known:
+        return known[id(obj)]
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        return obj
+    if isinstance(obj, pyx.unit.length):
+        return ('length', pyx.unit.topt(obj))
+    if isinstance(obj, numpy.ndarray):
+        return ('array', obj.dtype.str, obj.shape, hashlib.sha1(obj.tobytes()).hexdigest())
+    if isinstance(obj, numpy.generic):
+        return obj.item()
+    if isinstance(obj, type):
+        return ('type', obj.__module__, obj.__name__)
+    if isinstance(obj, types.ModuleType):
+        return ('module', obj.__name__)
+    if isinstance(obj, (types.BuiltinFunctionType, numpy.ufunc)):
+        return ('builtin', getattr(obj, '__module__', None), obj.__name__)
+    if id(obj) in _active:  # recursive structure, refer to enclosing object
+        return ('ref', _active.index(id(obj)))
+    _active.append(id(obj))
+    try:
+        if isinstance(obj, dict):
+            return ('dict',) + tuple(sorted((repr(name), content_key(value, known, _active))
+                                            for name, value in obj.items()))
+        if isinstance(obj, (list, tuple)):
+            return (obj.__class__.__name__,) + tuple(content_key(item, known, _active) for item in obj)
+        if isinstance(obj, (set, frozenset)):
+            return ('set',) + tuple(sorted(repr(content_key(item, known, _active)) for item in obj))
+        if isinstance(obj, types.FunctionType):
+            closure = [cell.cell_contents for cell in obj.__closure__ or []]
+            return ('function', _code_key_(obj.__code__), content_key(obj.__defaults__, known, _active),
+                    content_key(closure, known, _active))
+        if isinstance(obj, types.MethodType):
+            return ('method', content_key(obj.__func__, known, _active), content_key(obj.__self__, known, _active))
+        if obj.__class__.__module__.split('.')[0] in ('pyx', 'pynomo'):
+            return (obj.__class__.__name__,) + content_key(vars(obj), known, _active)
+    except (AttributeError, TypeError):
+        raise Uncacheable(obj)
+    finally:
+        _active.pop()
+    raise Uncacheable(obj)
+
+
+def _code_key_(code):
+    """
+    key of compiled code of function (nested code of lambdas included)
+    """
+    consts = tuple(_code_key_(const) if isinstance(const, types.CodeType) else repr(const)
+                   for const in code.co_consts)
+    return (code.co_code, consts, code.co_names)
@@ -24,7 +24,18 @@ import numpy
 import random
 import copy #, re, pprint
 import six  # for python 2 and 3 compatibility
-
+from .tick_plan import make_tick_plan, is_tick_plan, plan_ticks, plan_labels, \
+    plan_to_lists, plan_directions, plan_tick_segments, plan_text_positions, evaluate_array
+from .text_metrics import estimate_text_bboxes, boxes_overlap, boxes_overlap_each_other
+from .nomo_text import set_text_origin
+from .label_index import label_canvas
+from .stroke_batch import Stroke_Batch
+from .symbols import Symbol_Batch, circle_symbol
+
+# computed tick layouts shared between identical axes, see Nomo_Axis._find_tick_plan_.
+# Used only for axes with axis_appear 'tick_cache': True, empty with clear_tick_layout_cache()
+_tick_layout_cache = {}
+_tick_layout_cache_max_size = 256  # oldest layouts are dropped after this
 
 class Nomo_Axis:
     """
@@ -83,6 +94,7 @@ class Nomo_Axis:
             'title_absolute_offset': (0, 0),  # absolute (dx,dy)
             'text_format': "$%4.4g$",
             'text_format_func': None,  # can be used to define f(u) that gives out str
+            'text_skip_duplicates': False,  # drop texts equal to an earlier (higher level) text
             'full_angle': False,
             'extra_angle': 0.0,
             'text_horizontal_align_center': False,
@@ -122,6 +134,10 @@ class Nomo_Axis:
             'make_default_main_line': True,  # to draw normal main_line
             # 'level_text_color':None, # list of text pyx.colors for each level
             'level_text_size': None,  # list of text sizes for each level
+            'tick_cache': False,  # reuse tick layouts of axes with same sampled curve, see _find_tick_plan_
+            'label_index': None,  # Label_Index to drop/shift colliding texts, see label_index.py
+            'text_extent_smart': False,  # use estimated text sizes to thin texts and place top title
+            'text_extent_padding': 0.05,  # minimum estimated gap between texts (cm)
         }
         self.axis_appear = axis_appear_default_values
         self.axis_appear.update(axis_appear)
@@ -137,41 +153,56 @@ class Nomo_Axis:
         else:
             base_stop_1 = base_stop
 
+        set_text_origin(canvas, 'axis texts')  # all draw paths, also user text_draw_func
         if type == 'log':
             self._make_log_axis_(start=start, stop=stop, f=func_f, g=func_g, turn=turn)
-            self.draw_axis(canvas)
         if type == 'linear':
             self._make_linear_axis_(start=start, stop=stop, f=func_f, g=func_g, turn=turn,
                                     base_start=base_start_1, base_stop=base_stop_1)
-            self.draw_axis(canvas)
         if type == 'linear smart':
             self._make_linear_axis_smart_(start=start, stop=stop, f=func_f, g=func_g, turn=turn,
                                           base_start=base_start_1, base_stop=base_stop_1)
-            self.draw_axis(canvas)
         if type == 'log smart':
             self._make_log_axis_smart_(start=start, stop=stop, f=func_f, g=func_g, turn=turn,
                                        base_start=base_start_1, base_stop=base_stop_1)
-            self.draw_axis(canvas)
         if type == 'manual point':
             self._make_manual_axis_circle_(manual_axis_data)
-            self.draw_axis(canvas)
         if type == 'manual line':
             self._make_manual_axis_line_(manual_axis_data)
-            self.draw_axis(canvas)
         if type == 'manual arrow':
             self._make_manual_axis_arrow_(manual_axis_data)
-            self.draw_axis(canvas)
+        if self.axis_appear['label_index'] is None:
+            titles_canvas = canvas
+        else:
+            # titles go to label index before texts of axis, so that texts give way
+            # to them. Titles are still drawn on top of axis.
+            titles_canvas = pyx.canvas.canvas()
+            titles_canvas.settextengine(canvas.textengine)
+            self._draw_titles_(titles_canvas)
+            set_text_origin(canvas, 'axis texts')
         if type == 'general':
             self._make_general_axis_()
-        # self.draw_axis(canvas)
+        elif type in ('log', 'linear', 'linear smart', 'log smart',
+                      'manual point', 'manual line', 'manual arrow'):
+            self.draw_axis(canvas)
+        if titles_canvas is canvas:
+            self._draw_titles_(canvas)
+        else:
+            canvas.insert(titles_canvas)
+
+    def _draw_titles_(self, c):
+        """
+        draws axis title and extra titles
+        """
+        set_text_origin(c, 'axis titles')
         if self.axis_appear['title_draw_center']:
-            self._draw_title_center_(canvas)
+            self._draw_title_center_(c)
         else:
             if self.axis_appear['title_rotate_text']:
-                self._draw_title_rotate_(canvas)
+                self._draw_title_rotate_(c)
             else:
-                self._draw_title_top_(canvas)
-        self._draw_extra_titles_(canvas)
+                self._draw_title_top_(c)
+        self._draw_extra_titles_(c)
 
     def _make_general_axis_(self):
         """
@@ -184,33 +215,32 @@ class Nomo_Axis:
             ticker_func = core_ticker
         else:
             ticker_func = ti['ticker_func']
-        ticks, texts = ticker_func(start=self.start, stop=self.stop, f=self.func_f, g=self.func_g,
-                                   tick_levels=self.tick_levels, text_levels=self.tick_text_levels,
-                                   distance_limit_tick=ti['tick_distance_smart'],
-                                   distance_limit_text=ti['text_distance_smart'], tick_info=ti)
-        # import pprint
-        # pprint.pprint(ticks)
-        # pprint.pprint(texts)
+        ticks_info = ticker_func(start=self.start, stop=self.stop, f=self.func_f, g=self.func_g,
+                                 tick_levels=self.tick_levels, text_levels=self.tick_text_levels,
+                                 distance_limit_tick=ti['tick_distance_smart'],
+                                 distance_limit_text=ti['text_distance_smart'], tick_info=ti)
+        # ticker_func gives either tick plan or lists ticks, texts
+        if is_tick_plan(ticks_info):
+            plan = ticks_info
+            tick_levels, text_levels = self.tick_levels, self.tick_text_levels
+        else:
+            ticks, texts = ticks_info
+            tick_levels, text_levels = len(ticks), len(texts)
+            turn = _determine_turn_(f=self.func_f, g=self.func_g, start=self.start, stop=self.stop,
+                                    side=self.side, turn_relative=ti['turn_relative'])
+            plan = make_tick_plan(ticks, texts, self.func_f, self.func_g, turn, self.start, self.stop,
+                                  full_angle=ti['full_angle'], extra_angle=ti['extra_angle'])
+        self.tick_plan = plan
+        ticks, texts = plan_to_lists(plan)
+        ticks = ticks[:tick_levels]
+        texts = texts[:text_levels]
         # find directions
         tick_directions = []  # (dx_unit,dy_unit,angle)
-        for tick in ticks:
-            dx_units, dy_units, angles = find_tick_directions(tick, self.func_f, self.func_g, self.side,
-                                                              start=self.start, stop=self.stop,
-                                                              full_angle=ti['full_angle'],
-                                                              extra_angle=ti['extra_angle'],
-                                                              turn_relative=ti['turn_relative'])
-            tick_directions.append((dx_units, dy_units, angles))
+        for level in range(len(ticks)):
+            tick_directions.append(plan_directions(plan_ticks(plan, level)))
         text_directions = []  # (dx_units[],dy_units[],angle[])
-        for text in texts:
-            dx_units, dy_units, angles = find_tick_directions(text, self.func_f, self.func_g, self.side,
-                                                              start=self.start, stop=self.stop,
-                                                              full_angle=ti['full_angle'],
-                                                              extra_angle=ti['extra_angle'],
-                                                              turn_relative=ti['turn_relative'])
-            text_directions.append((dx_units, dy_units, angles))
-        # import pprint
-        # pprint.pprint(tick_directions)
-        # pprint.pprint(text_directions)
+        for level in range(len(texts)):
+            text_directions.append(plan_directions(plan_labels(plan, level)))
 
         # make actual drawing
         # select tick draw functions
@@ -229,6 +259,8 @@ class Nomo_Axis:
         else:
             mainline_draw_func = ti['mainline_func']
 
+        # user draw functions draw texts through label index (if any)
+        c = label_canvas(self.canvas, ti['label_index'])
         # ticks
         for i, tick in enumerate(ticks):
             dx_units, dy_units, angles = tick_directions[i]
@@ -241,7 +273,7 @@ class Nomo_Axis:
                            tick_length=ti['tick_lenghts'][i],
                            text_distance=0,  # dummy
                            text_attr=[],  # dummy here
-                           c=self.canvas, tick_info=ti)
+                           c=c, tick_info=ti)
 
         for i, text in enumerate(texts):
             if len(ticks) > i:
@@ -251,13 +283,14 @@ class Nomo_Axis:
             dx_units, dy_units, angles = text_directions[i]
             text_attrs = _find_text_attr(text, dx_units, dy_units, angles,
                                          ti['text_sizes'][i], ti)
+            set_text_origin(self.canvas, 'axis texts level %i' % i)
             text_draw_func(ticks=tick, texts=text, level=i,
                            f=self.func_f, g=self.func_g,
                            dx_units=dx_units, dy_units=dy_units, angles=angles,
                            tick_lenght=0.0,
                            text_distance=ti['text_distances'][i],
                            text_attrs=text_attrs,
-                           c=self.canvas, tick_info=ti)
+                           c=c, tick_info=ti)
         # main line
         main_line_coords = calc_main_line_coords(self.start, self.stop, self.func_f, self.func_g, sections=350.0)
         if ti['make_default_main_line'] is True:
@@ -267,7 +300,7 @@ class Nomo_Axis:
                                tick_directions=tick_directions,
                                texts=texts,
                                text_directions=text_directions,
-                               c=self.canvas, tick_info=ti)
+                               c=c, tick_info=ti)
 
     def _test_tick_(self, u, tick, scale_max):
         """ tests if it is time to put a tick
@@ -410,76 +443,10 @@ class Nomo_Axis:
         thin_line = pyx.path.path(pyx.path.moveto(f(start), g(start)))
         # text list
         texts = []
-        # let's find tick positions
-        tick_0_list, tick_1_list, tick_2_list, tick_3_list, tick_4_list, start_ax, stop_ax = \
-            find_linear_ticks(start, stop, base_start, base_stop, self.axis_appear['scale_max'])
-        # let's find tick angles
-        dx_units_0, dy_units_0, angles_0 = find_tick_directions(tick_0_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_1, dy_units_1, angles_1 = find_tick_directions(tick_1_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_2, dy_units_2, angles_2 = find_tick_directions(tick_2_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_3, dy_units_3, angles_3 = find_tick_directions(tick_3_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_4, dy_units_4, angles_4 = find_tick_directions(tick_4_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-
-        # tick level 0
-        if self.tick_levels > 0:
-            self._make_tick_lines_(tick_0_list, line, f, g, dx_units_0, dy_units_0,
-                                   self.axis_appear['grid_length_0'])
-        # text level 0
-        if self.tick_text_levels > 0:
-            self._make_texts_(tick_0_list, texts, f, g, dx_units_0, dy_units_0, angles_0,
-                              self.axis_appear['text_distance_0'],
-                              self.axis_appear['text_size_0'])
-        # tick level 1
-        if self.tick_levels > 1:
-            self._make_tick_lines_(tick_1_list, line, f, g, dx_units_1, dy_units_1,
-                                   self.axis_appear['grid_length_1'])
-        # text level 1
-        if self.tick_text_levels > 1:
-            self._make_texts_(tick_1_list, texts, f, g, dx_units_1, dy_units_1, angles_1,
-                              self.axis_appear['text_distance_1'],
-                              self.axis_appear['text_size_1'])
-        # tick level 2
-        if self.tick_levels > 2:
-            self._make_tick_lines_(tick_2_list, line, f, g, dx_units_2, dy_units_2,
-                                   self.axis_appear['grid_length_2'])
-        # text level 2
-        if self.tick_text_levels > 2:
-            self._make_texts_(tick_2_list, texts, f, g, dx_units_2, dy_units_2, angles_2,
-                              self.axis_appear['text_distance_2'],
-                              self.axis_appear['text_size_2'])
-        # tick level 3
-        if self.tick_levels > 3:
-            self._make_tick_lines_(tick_3_list, thin_line, f, g, dx_units_3, dy_units_3,
-                                   self.axis_appear['grid_length_3'])
-        # text level 3
-        if self.tick_text_levels > 3:
-            self._make_texts_(tick_3_list, texts, f, g, dx_units_3, dy_units_3, angles_3,
-                              self.axis_appear['text_distance_3'],
-                              self.axis_appear['text_size_3'])
-        # tick level 4
-        if self.tick_levels > 4:
-            self._make_tick_lines_(tick_4_list, thin_line, f, g, dx_units_4, dy_units_4,
-                                   self.axis_appear['grid_length_4'])
-        # text level 4
-        if self.tick_text_levels > 4:
-            self._make_texts_(tick_4_list, texts, f, g, dx_units_4, dy_units_4, angles_4,
-                              self.axis_appear['text_distance_4'],
-                              self.axis_appear['text_size_4'])
+        # let's find tick positions and angles
+        plan = self._find_tick_plan_('linear', start, stop, f, g, base_start, base_stop)
+        self._make_tick_levels_(plan, 5, line, thin_line, texts,
+                                ['text_size_0', 'text_size_1', 'text_size_2', 'text_size_3', 'text_size_4'])
         # make main line
         self._make_main_line_(start, stop, main_line, f, g)
 
@@ -487,17 +454,7 @@ class Nomo_Axis:
         self.thin_line = thin_line
         self.main_line = main_line
         self.texts = texts
-        self.tick_0_list = tick_0_list
-        self.tick_1_list = tick_1_list
-        self.tick_2_list = tick_2_list
-        self.tick_3_list = tick_3_list
-        self.tick_4_list = tick_4_list
-
-        self.text_0_list = tick_0_list
-        self.text_1_list = tick_1_list
-        self.text_2_list = tick_2_list
-        self.text_3_list = tick_3_list
-        self.text_4_list = tick_4_list
+        self._save_tick_lists_(plan, 5)
 
     def _make_linear_axis_smart_(self, start, stop, f, g, turn=1, base_start=None, base_stop=None):
         """
@@ -510,113 +467,10 @@ class Nomo_Axis:
         main_line = pyx.path.path(pyx.path.moveto(f(start), g(start)))
         # text list
         texts = []
-        # let's find tick positions
-        #        tick_0_list,tick_1_list,tick_2_list,tick_3_list,tick_4_list,start_ax,stop_ax=\
-        #        find_linear_ticks(start,stop,base_start,base_stop,self.axis_appear['scale_max'])
-        tick_0_list, tick_1_list, tick_2_list, tick_3_list, tick_4_list = \
-            find_linear_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
-                                    base_stop=base_stop, scale_max_0=self.axis_appear['scale_max'],
-                                    distance_limit=self.axis_appear['tick_distance_smart'])
-        text_0_list, text_1_list, text_2_list, text_3_list, text_4_list = \
-            find_linear_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
-                                    base_stop=base_stop, scale_max_0=self.axis_appear['scale_max'],
-                                    distance_limit=self.axis_appear['text_distance_smart'])
-        remove_text_if_not_tick(tick_0_list, text_0_list)
-        remove_text_if_not_tick(tick_1_list, text_1_list)
-        remove_text_if_not_tick(tick_2_list, text_2_list)
-        remove_text_if_not_tick(tick_3_list, text_3_list)
-        remove_text_if_not_tick(tick_4_list, text_4_list)
-
-        #        pprint.pprint("text_list %s"%text_0_list)
-        #        pprint.pprint("tick_list %s"%tick_0_list)
-        # let's find tick angles
-        dx_units_0, dy_units_0, angles_0 = find_tick_directions(tick_0_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_1, dy_units_1, angles_1 = find_tick_directions(tick_1_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_2, dy_units_2, angles_2 = find_tick_directions(tick_2_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_3, dy_units_3, angles_3 = find_tick_directions(tick_3_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_4, dy_units_4, angles_4 = find_tick_directions(tick_4_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        # let's find text angles
-        dx_units_0_text, dy_units_0_text, angles_0_text = find_tick_directions(text_0_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_1_text, dy_units_1_text, angles_1_text = find_tick_directions(text_1_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_2_text, dy_units_2_text, angles_2_text = find_tick_directions(text_2_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_3_text, dy_units_3_text, angles_3_text = find_tick_directions(text_3_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_4_text, dy_units_4_text, angles_4_text = find_tick_directions(text_4_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-
-        # tick level 0
-        if self.tick_levels > 0:
-            self._make_tick_lines_(tick_0_list, line, f, g, dx_units_0, dy_units_0,
-                                   self.axis_appear['grid_length_0'])
-        # text level 0
-        if self.tick_text_levels > 0:
-            self._make_texts_(text_0_list, texts, f, g, dx_units_0_text, dy_units_0_text, angles_0_text,
-                              self.axis_appear['text_distance_0'],
-                              self.axis_appear['text_size_0'])
-        # tick level 1
-        if self.tick_levels > 1:
-            self._make_tick_lines_(tick_1_list, line, f, g, dx_units_1, dy_units_1,
-                                   self.axis_appear['grid_length_1'])
-        # text level 1
-        if self.tick_text_levels > 1:
-            self._make_texts_(text_1_list, texts, f, g, dx_units_1_text, dy_units_1_text, angles_1_text,
-                              self.axis_appear['text_distance_1'],
-                              self.axis_appear['text_size_1'])
-        # tick level 2
-        if self.tick_levels > 2:
-            self._make_tick_lines_(tick_2_list, line, f, g, dx_units_2, dy_units_2,
-                                   self.axis_appear['grid_length_2'])
-        # text level 2
-        if self.tick_text_levels > 2:
-            self._make_texts_(text_2_list, texts, f, g, dx_units_2_text, dy_units_2_text, angles_2_text,
-                              self.axis_appear['text_distance_2'],
-                              self.axis_appear['text_size_2'])
-        # tick level 3
-        if self.tick_levels > 3:
-            self._make_tick_lines_(tick_3_list, thin_line, f, g, dx_units_3, dy_units_3,
-                                   self.axis_appear['grid_length_3'])
-        # text level 3
-        if self.tick_text_levels > 3:
-            self._make_texts_(text_3_list, texts, f, g, dx_units_3_text, dy_units_3_text, angles_3_text,
-                              self.axis_appear['text_distance_3'],
-                              self.axis_appear['text_size_3'])
-        # tick level 4
-        if self.tick_levels > 4:
-            self._make_tick_lines_(tick_4_list, thin_line, f, g, dx_units_4, dy_units_4,
-                                   self.axis_appear['grid_length_4'])
-        # text level 4
-        if self.tick_text_levels > 4:
-            self._make_texts_(text_4_list, texts, f, g, dx_units_4_text, dy_units_4_text, angles_4_text,
-                              self.axis_appear['text_distance_4'],
-                              self.axis_appear['text_size_4'])
+        # let's find tick positions and angles
+        plan = self._find_tick_plan_('linear smart', start, stop, f, g, base_start, base_stop)
+        self._make_tick_levels_(plan, 5, line, thin_line, texts,
+                                ['text_size_0', 'text_size_1', 'text_size_2', 'text_size_3', 'text_size_4'])
         # make main line
         self._make_main_line_(start, stop, main_line, f, g)
 
@@ -624,17 +478,7 @@ class Nomo_Axis:
         self.thin_line = thin_line
         self.main_line = main_line
         self.texts = texts
-        self.tick_0_list = tick_0_list
-        self.tick_1_list = tick_1_list
-        self.tick_2_list = tick_2_list
-        self.tick_3_list = tick_3_list
-        self.tick_4_list = tick_4_list
-
-        self.text_0_list = text_0_list
-        self.text_1_list = text_1_list
-        self.text_2_list = text_2_list
-        self.text_3_list = text_3_list
-        self.text_4_list = text_4_list
+        self._save_tick_lists_(plan, 5)
 
     def _make_log_axis_smart_(self, start, stop, f, g, turn=1, base_start=None, base_stop=None):
         """
@@ -647,228 +491,16 @@ class Nomo_Axis:
         main_line = pyx.path.path(pyx.path.moveto(f(start), g(start)))
         # text list
         texts = []
-        # let's find tick positions
-        #        tick_0_list,tick_1_list,tick_2_list,tick_3_list,tick_4_list,start_ax,stop_ax=\
-        #        find_linear_ticks(start,stop,base_start,base_stop,self.axis_appear['scale_max'])
         if start > stop:
             start, stop = stop, start
-        if start > 0 and stop > 0:
-            tick_0_list, tick_1_list, tick_2_list, tick_3_list, tick_4_list = \
-                find_log_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
-                                     base_stop=base_stop,
-                                     distance_limit=self.axis_appear['tick_distance_smart'])
-            text_0_list, text_1_list, text_2_list, text_3_list, text_4_list = \
-                find_log_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
-                                     base_stop=base_stop,
-                                     distance_limit=self.axis_appear['text_distance_smart'])
-        if start < 0 and stop < 0:
-            tick_0_list, tick_1_list, tick_2_list, tick_3_list, tick_4_list = \
-                find_log_ticks_negative_smart(start, stop, f, g, turn=1, base_start=base_start,
-                                              base_stop=base_stop,
-                                              distance_limit=self.axis_appear['tick_distance_smart'])
-            text_0_list, text_1_list, text_2_list, text_3_list, text_4_list = \
-                find_log_ticks_negative_smart(start, stop, f, g, turn=1, base_start=base_start,
-                                              base_stop=base_stop,
-                                              distance_limit=self.axis_appear['text_distance_smart'])
-
-        if start < 0 and stop > 0:
-            # negative side
-            start_decade = math.floor(math.log10(-start))
-            if 10 ** start_decade == -start:
-                start_decate = start_decade - 1
-            # initialize
-            distance = 2 * self.axis_appear['text_distance_smart']
-            while distance > self.axis_appear['text_distance_smart']:
-                start_decade = start_decade - 1
-                distance = calc_distance(f, g, -10 ** (start_decade), -10 ** (start_decade - 1))
-
-            # positive side
-            stop_decade = math.floor(math.log10(stop))
-            if 10 ** start_decade == stop:
-                stop_decate = stop_decade - 1
-            # initialize
-            distance = 2 * self.axis_appear['text_distance_smart']
-            while distance > self.axis_appear['text_distance_smart']:
-                stop_decade = stop_decade - 1
-                distance = calc_distance(f, g, 10 ** (stop_decade), 10 ** (stop_decade - 1))
-            # make the ticks
-            start_decade = start_decade + 1
-            stop_decade = stop_decade + 1
-            print("start_decade value %f" % -10 ** start_decade)
-            print("stop_decade value %f" % 10 ** stop_decade)
-            tick_0_list_n, tick_1_list_n, tick_2_list_n, tick_3_list_n, tick_4_list_n = \
-                find_log_ticks_negative_smart(start, -10 ** (start_decade) * 1.0001, f, g, turn=1, base_start=None,
-                                              base_stop=None,
-                                              distance_limit=self.axis_appear['tick_distance_smart'])
-            text_0_list_n, text_1_list_n, text_2_list_n, text_3_list_n, text_4_list_n = \
-                find_log_ticks_negative_smart(start, -10 ** (start_decade) * 1.0001, f, g, turn=1, base_start=None,
-                                              base_stop=None,
-                                              distance_limit=self.axis_appear['text_distance_smart'])
-
-            tick_0_list_p, tick_1_list_p, tick_2_list_p, tick_3_list_p, tick_4_list_p = \
-                find_log_ticks_smart(10 ** (stop_decade) * 1.0001, stop, f, g, turn=1, base_start=None,
-                                     base_stop=None,
-                                     distance_limit=self.axis_appear['tick_distance_smart'])
-            text_0_list_p, text_1_list_p, text_2_list_p, text_3_list_p, text_4_list_p = \
-                find_log_ticks_smart(10 ** (stop_decade) * 1.0001, stop, f, g, turn=1, base_start=None,
-                                     base_stop=None,
-                                     distance_limit=self.axis_appear['text_distance_smart'])
-            # middle
-            tick_0_list_mn, tick_1_list_mn, tick_2_list_mn, tick_3_list_mn, tick_4_list_mn = \
-                find_linear_ticks_smart(-10 ** (start_decade), 0, f, g, turn=1, base_start=None,
-                                        base_stop=None, scale_max_0=10 * 10 ** (start_decade),
-                                        distance_limit=self.axis_appear['tick_distance_smart'])
-            text_0_list_mn, text_1_list_mn, text_2_list_mn, text_3_list_mn, text_4_list_mn = \
-                find_linear_ticks_smart(-10 ** (start_decade), 0, f, g, turn=1, base_start=None,
-                                        base_stop=None, scale_max_0=10 * 10 ** (start_decade),
-                                        distance_limit=self.axis_appear['text_distance_smart'])
-            tick_0_list_mp, tick_1_list_mp, tick_2_list_mp, tick_3_list_mp, tick_4_list_mp = \
-                find_linear_ticks_smart(0, 10 ** (stop_decade), f, g, turn=1, base_start=None,
-                                        base_stop=None, scale_max_0=10 * 10 ** (stop_decade),
-                                        distance_limit=self.axis_appear['tick_distance_smart'])
-            text_0_list_mp, text_1_list_mp, text_2_list_mp, text_3_list_mp, text_4_list_mp = \
-                find_linear_ticks_smart(0, 10 ** (stop_decade), f, g, turn=1, base_start=None,
-                                        base_stop=None, scale_max_0=10 * 10 ** (stop_decade),
-                                        distance_limit=self.axis_appear['text_distance_smart'])
-
-            tick_0_list = tick_0_list_n + tick_0_list_p + tick_0_list_mn + tick_0_list_mp
-            tick_1_list = tick_1_list_n + tick_1_list_p + tick_1_list_mn + tick_1_list_mp
-            tick_2_list = tick_2_list_n + tick_2_list_p + tick_2_list_mn + tick_2_list_mp
-            tick_3_list = tick_3_list_n + tick_3_list_p + tick_3_list_mn + tick_3_list_mp
-            tick_4_list = tick_4_list_n + tick_4_list_p
-            text_0_list = text_0_list_n + text_0_list_p + text_0_list_mn + text_0_list_mp
-            text_1_list = text_1_list_n + text_1_list_p + text_1_list_mn + text_1_list_mp
-            text_2_list = text_2_list_n + text_2_list_p + text_2_list_mn + text_2_list_mp
-            text_3_list = text_3_list_n + text_3_list_p + text_3_list_mn + text_3_list_mp
-            text_4_list = text_4_list_n + text_4_list_p
-            remove_multiple_and_sort(tick_0_list)
-            remove_multiple_and_sort(tick_1_list)
-            remove_multiple_and_sort(tick_2_list)
-            remove_multiple_and_sort(tick_3_list)
-            remove_multiple_and_sort(tick_4_list)
-            remove_multiple_and_sort(text_0_list)
-            remove_multiple_and_sort(text_1_list)
-            remove_multiple_and_sort(text_2_list)
-            remove_multiple_and_sort(text_3_list)
-            remove_multiple_and_sort(text_4_list)
-            # manual removing of possible top clashes
-            if max(tick_0_list) == max(tick_1_list):
-                tick_1_list.remove(max(tick_1_list))
-            if max(text_0_list) == max(text_1_list):
-                text_1_list.remove(max(text_1_list))
-            if min(tick_0_list) == min(tick_1_list):
-                tick_1_list.remove(min(tick_1_list))
-            if min(text_0_list) == min(text_1_list):
-                text_1_list.remove(min(text_1_list))
-        ##pprint.pprint("text_list %s"%text_0_list)
-        ##pprint.pprint("tick_list %s"%tick_0_list)
-        # let's find tick angles
-        dx_units_0, dy_units_0, angles_0 = find_tick_directions(tick_0_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_1, dy_units_1, angles_1 = find_tick_directions(tick_1_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_2, dy_units_2, angles_2 = find_tick_directions(tick_2_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_3, dy_units_3, angles_3 = find_tick_directions(tick_3_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_4, dy_units_4, angles_4 = find_tick_directions(tick_4_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        # let's find text angles
-        dx_units_0_text, dy_units_0_text, angles_0_text = find_tick_directions(text_0_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_1_text, dy_units_1_text, angles_1_text = find_tick_directions(text_1_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_2_text, dy_units_2_text, angles_2_text = find_tick_directions(text_2_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_3_text, dy_units_3_text, angles_3_text = find_tick_directions(text_3_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-        dx_units_4_text, dy_units_4_text, angles_4_text = find_tick_directions(text_4_list, f, g, self.side, start,
-                                                                               stop, full_angle=self.axis_appear[
-                'full_angle'], extra_angle=self.axis_appear['extra_angle'], turn_relative=self.axis_appear[
-                'turn_relative'])
-
+        # let's find tick positions and angles
+        plan = self._find_tick_plan_('log smart', start, stop, f, g, base_start, base_stop)
         # let's save them
-        self.dx_units_0 = dx_units_0
-        self.dx_units_1 = dx_units_1
-        self.dx_units_2 = dx_units_2
-        self.dx_units_3 = dx_units_3
-        self.dx_units_4 = dx_units_4
-
-        self.tick_0_list = tick_0_list
-        self.tick_1_list = tick_1_list
-        self.tick_2_list = tick_2_list
-        self.tick_3_list = tick_3_list
-        self.tick_4_list = tick_4_list
-
-        self.text_0_list = text_0_list
-        self.text_1_list = text_1_list
-        self.text_2_list = text_2_list
-        self.text_3_list = text_3_list
-        self.text_4_list = text_4_list
-
-        # tick level 0
-        if self.tick_levels > 0:
-            self._make_tick_lines_(tick_0_list, line, f, g, dx_units_0, dy_units_0,
-                                   self.axis_appear['grid_length_0'])
-        # text level 0
-        if self.tick_text_levels > 0:
-            self._make_texts_(text_0_list, texts, f, g, dx_units_0_text, dy_units_0_text, angles_0_text,
-                              self.axis_appear['text_distance_0'],
-                              self.axis_appear['text_size_0'])
-        # tick level 1
-        if self.tick_levels > 1:
-            self._make_tick_lines_(tick_1_list, line, f, g, dx_units_1, dy_units_1,
-                                   self.axis_appear['grid_length_1'])
-        # text level 1
-        if self.tick_text_levels > 1:
-            self._make_texts_(text_1_list, texts, f, g, dx_units_1_text, dy_units_1_text, angles_1_text,
-                              self.axis_appear['text_distance_1'],
-                              self.axis_appear['text_size_1'])
-        # tick level 2
-        if self.tick_levels > 2:
-            self._make_tick_lines_(tick_2_list, line, f, g, dx_units_2, dy_units_2,
-                                   self.axis_appear['grid_length_2'])
-        # text level 2
-        if self.tick_text_levels > 2:
-            self._make_texts_(text_2_list, texts, f, g, dx_units_2_text, dy_units_2_text, angles_2_text,
-                              self.axis_appear['text_distance_2'],
-                              self.axis_appear['text_size_2'])
-        # tick level 3
-        if self.tick_levels > 3:
-            self._make_tick_lines_(tick_3_list, thin_line, f, g, dx_units_3, dy_units_3,
-                                   self.axis_appear['grid_length_3'])
-        # text level 3
-        if self.tick_text_levels > 3:
-            self._make_texts_(text_3_list, texts, f, g, dx_units_3_text, dy_units_3_text, angles_3_text,
-                              self.axis_appear['text_distance_3'],
-                              self.axis_appear['text_size_3'])
-        # tick level 4
-        if self.tick_levels > 4:
-            self._make_tick_lines_(tick_4_list, thin_line, f, g, dx_units_4, dy_units_4,
-                                   self.axis_appear['grid_length_4'])
-        # text level 4
-        if self.tick_text_levels > 4:
-            self._make_texts_(text_4_list, texts, f, g, dx_units_4_text, dy_units_4_text, angles_4_text,
-                              self.axis_appear['text_distance_4'],
-                              self.axis_appear['text_size_4'])
+        for level in range(5):
+            setattr(self, 'dx_units_%i' % level, plan_ticks(plan, level)['dx'].tolist())
+        self._make_tick_levels_(plan, 5, line, thin_line, texts,
+                                ['text_size_0', 'text_size_1', 'text_size_2', 'text_size_3', 'text_size_4'])
+        self._save_tick_lists_(plan, 5)  # after texts are thinned
         # make main line
         self._make_main_line_(start, stop, main_line, f, g)
 
@@ -887,51 +519,11 @@ class Nomo_Axis:
         main_line = pyx.path.path(pyx.path.moveto(f(start), g(start)))
         # text list
         texts = []
-        # let's find tick positions
-        tick_0_list, tick_1_list, tick_2_list, start_ax, stop_ax = \
-            find_log_ticks(start, stop)
-        # let's find tick angles
-        dx_units_0, dy_units_0, angles_0 = find_tick_directions(tick_0_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_1, dy_units_1, angles_1 = find_tick_directions(tick_1_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-        dx_units_2, dy_units_2, angles_2 = find_tick_directions(tick_2_list, f, g, self.side, start, stop,
-                                                                full_angle=self.axis_appear['full_angle'],
-                                                                extra_angle=self.axis_appear['extra_angle'],
-                                                                turn_relative=self.axis_appear['turn_relative'])
-
-        # tick level 0
-        if self.tick_levels > 0:
-            self._make_tick_lines_(tick_0_list, line, f, g, dx_units_0, dy_units_0,
-                                   self.axis_appear['grid_length_0'])
-        # text level 0
-        if self.tick_text_levels > 0:
-            self._make_texts_(tick_0_list, texts, f, g, dx_units_0, dy_units_0, angles_0,
-                              self.axis_appear['text_distance_0'],
-                              self.axis_appear['text_size_log_0'])
-        # tick level 1
-        if self.tick_levels > 1:
-            self._make_tick_lines_(tick_1_list, line, f, g, dx_units_1, dy_units_1,
-                                   self.axis_appear['grid_length_1'])
-        # text level 1
-        if self.tick_text_levels > 1:
-            self._make_texts_(tick_1_list, texts, f, g, dx_units_1, dy_units_1, angles_1,
-                              self.axis_appear['text_distance_1'],
-                              self.axis_appear['text_size_log_1'])  # smaller with log axis
-        # tick level 2
-        if self.tick_levels > 2:
-            self._make_tick_lines_(tick_2_list, line, f, g, dx_units_2, dy_units_2,
-                                   self.axis_appear['grid_length_2'])
-        # text level 2
-        if self.tick_text_levels > 2:
-            self._make_texts_(tick_2_list, texts, f, g, dx_units_2, dy_units_2, angles_2,
-                              self.axis_appear['text_distance_2'],
-                              self.axis_appear['text_size_log_2'])
-
+        # let's find tick positions and angles
+        plan = self._find_tick_plan_('log', start, stop, f, g)
+        # text levels 1 and 2 are smaller with log axis
+        self._make_tick_levels_(plan, 3, line, thin_line, texts,
+                                ['text_size_log_0', 'text_size_log_1', 'text_size_log_2'])
         # make main line
         self._make_main_line_(start, stop, main_line, f, g)
 
@@ -939,41 +531,186 @@ class Nomo_Axis:
         self.thin_line = thin_line
         self.main_line = main_line
         self.texts = texts
-        self.tick_0_list = tick_0_list
-        self.tick_1_list = tick_1_list
-        self.tick_2_list = tick_2_list
-        # self.tick_3_list=tick_3_list
-        # self.tick_4_list=tick_4_list
-
-        self.text_0_list = tick_0_list
-        self.text_1_list = tick_1_list
-        self.text_2_list = tick_2_list
-        # self.text_3_list=tick_3_list
-        # self.text_4_list=tick_4_list
+        self._save_tick_lists_(plan, 3)
+
+    def _find_tick_plan_(self, kind, start, stop, f, g, base_start=None, base_stop=None):
+        """
+        finds tick plan (see tick_plan.py) of tick and text values of all levels.
+        If axis_appear 'tick_cache' is True, identical axes (same type, range,
+        distance limits and curve geometry) share the result through module level
+        tick layout cache. Geometry is compared only at sampled points of the curve,
+        so two different curves that agree at those points get same ticks; use
+        the cache only for repeated renders of same nomogram and empty it with
+        clear_tick_layout_cache() between unrelated ones.
+        """
+        ai = self.axis_appear
+        key = None
+        if ai['tick_cache']:
+            fingerprint = _geometry_fingerprint_(f, g, start, stop)
+            if fingerprint is not None:
+                key = (kind, start, stop, base_start, base_stop,
+                       self.tick_levels, self.tick_text_levels, ai['scale_max'],
+                       ai['tick_distance_smart'], ai['text_distance_smart'],
+                       self.side, ai['full_angle'], ai['extra_angle'], ai['turn_relative'],
+                       fingerprint)
+                if key in _tick_layout_cache:
+                    # copy so that callers may modify plan
+                    return _tick_layout_cache[key].copy()
+        # let's find tick positions
+        ticks, texts = find_tick_values(kind, start, stop, f, g, base_start, base_stop,
+                                        scale_max=ai['scale_max'],
+                                        distance_limit_tick=ai['tick_distance_smart'],
+                                        distance_limit_text=ai['text_distance_smart'])
+        # let's find positions and angles
+        turn = _determine_turn_(f=f, g=g, start=start, stop=stop, side=self.side,
+                                turn_relative=ai['turn_relative'])
+        plan = make_tick_plan(ticks, texts, f, g, turn, start, stop,
+                              full_angle=ai['full_angle'], extra_angle=ai['extra_angle'])
+        if key is not None:
+            if len(_tick_layout_cache) >= _tick_layout_cache_max_size:
+                # remove oldest entry
+                del _tick_layout_cache[next(iter(_tick_layout_cache))]
+            _tick_layout_cache[key] = plan.copy()
+        return plan
+
+    def _make_tick_levels_(self, plan, levels, line, thin_line, texts, text_size_keys):
+        """
+        makes tick lines and texts of all levels in tick plan
+        """
+        if self.axis_appear['text_extent_smart']:
+            self._thin_plan_labels_(plan, levels, text_size_keys)
+        self.text_levels = []
+        for level in range(levels):
+            # levels 3 and 4 are thin
+            if level < 3:
+                tick_lines = line
+            else:
+                tick_lines = thin_line
+            # tick level
+            if self.tick_levels > level:
+                self._make_plan_tick_lines_(plan_ticks(plan, level), tick_lines,
+                                            self.axis_appear['grid_length_%i' % level])
+            # text level
+            if self.tick_text_levels > level:
+                count = self._make_plan_texts_(plan_labels(plan, level), texts,
+                                               self.axis_appear['text_distance_%i' % level],
+                                               self.axis_appear[text_size_keys[level]])
+                self.text_levels.extend([level] * count)
+
+    def _thin_plan_labels_(self, plan, levels, text_size_keys):
+        """
+        removes texts of levels whose estimated text boxes overlap each other
+        or texts of upper levels. Lower levels are removed as well. Texts of
+        level 0 are always kept.
+        """
+        padding = self.axis_appear['text_extent_padding']
+        accepted = numpy.zeros((0, 4))
+        for level in range(int(min(levels, self.tick_text_levels))):
+            level_defs = []
+            self._make_plan_texts_(plan_labels(plan, level), level_defs,
+                                   self.axis_appear['text_distance_%i' % level],
+                                   self.axis_appear[text_size_keys[level]])
+            boxes = estimate_text_bboxes(level_defs)
+            if level > 0 and (boxes_overlap_each_other(boxes, padding) or
+                              boxes_overlap(boxes, accepted, padding).any()):
+                plan['label'][plan['level'] >= level] = False
+                break
+            accepted = numpy.concatenate((accepted, boxes))
+
+    def _save_tick_lists_(self, plan, levels):
+        """
+        saves tick plan and tick and text values as attributes tick_0_list, text_0_list, ...
+        """
+        self.tick_plan = plan
+        ticks, texts = plan_to_lists(plan, levels)
+        for level in range(levels):
+            setattr(self, 'tick_%i_list' % level, ticks[level])
+            setattr(self, 'text_%i_list' % level, texts[level])
+
+    def _make_plan_tick_lines_(self, rows, tick_lines, tick_length):
+        """
+        appends tick markers of tick plan rows to path tick_lines
+        """
+        x1, y1, x2, y2 = plan_tick_segments(rows, tick_length)
+        for idx in range(len(rows)):
+            tick_lines.append(pyx.path.moveto(x1[idx], y1[idx]))
+            tick_lines.append(pyx.path.lineto(x2[idx], y2[idx]))
+
+    def _make_plan_texts_(self, rows, text_list, text_distance, text_size):
+        """
+        appends text definitions of tick plan rows to text_list, returns
+        number of texts appended
+        """
+        x, y = plan_text_positions(rows, text_distance)
+        strings = self._put_texts_(rows['value'])
+        skip = self._find_skipped_texts_(strings, text_list)
+        count = 0
+        for idx in range(len(rows)):
+            if skip[idx]:
+                continue
+            text_attr = self._find_text_attr_(rows['dy'][idx], rows['angle'][idx], text_size)
+            text_list.append((strings[idx], x[idx], y[idx], text_attr))
+            count += 1
+        return count
+
+    def _find_skipped_texts_(self, strings, text_list):
+        """
+        boolean array of strings that are not drawn because same text
+        is already in text_list or earlier in strings
+        """
+        if not self.axis_appear['text_skip_duplicates']:
+            return numpy.zeros(len(strings), dtype=bool)
+        return find_duplicate_texts(strings, [text_def[0] for text_def in text_list])
+
+    def _find_text_attr_(self, dy_unit, angle, text_size):
+        """
+        text attributes of a tick text
+        """
+        if dy_unit < 0:
+            text_attr = [pyx.text.valign.middle, pyx.text.halign.right, text_size, pyx.trafo.rotate(angle)]
+        else:
+            text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size, pyx.trafo.rotate(angle)]
+        if self.axis_appear['full_angle'] == True:
+            text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size, pyx.trafo.rotate(angle)]
+        if self.axis_appear['text_horizontal_align_center'] == True:
+            text_attr = [pyx.text.valign.top, pyx.text.halign.center, text_size, pyx.trafo.rotate(angle)]
+        return text_attr
 
     def _make_texts_(self, tick_list, text_list, f, g, dx_units, dy_units, angles,
                      text_distance, text_size, manual_texts=[]):
         """
         makes list of text definitions
         """
+        new_texts = []
+        if len(manual_texts) > 0:
+            strings = manual_texts
+        else:  # make numbers
+            strings = self._put_texts_(tick_list)
+        skip = self._find_skipped_texts_(strings, text_list)
         for idx, u in enumerate(tick_list):
-            if dy_units[idx] < 0:
-                text_attr = [pyx.text.valign.middle, pyx.text.halign.right, text_size, pyx.trafo.rotate(angles[idx])]
-            else:
-                text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size, pyx.trafo.rotate(angles[idx])]
-            if self.axis_appear['full_angle'] == True:
-                if self.axis_appear['angle_tick_direction'] == 'outer':
-                    text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size, pyx.trafo.rotate(angles[idx])]
-                else:  # 'inner'
-                    text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size, pyx.trafo.rotate(angles[idx])]
-            if self.axis_appear['text_horizontal_align_center'] == True:
-                text_attr = [pyx.text.valign.top, pyx.text.halign.center, text_size, pyx.trafo.rotate(angles[idx])]
-            if len(manual_texts) > 0:
-                text_list.append((manual_texts[idx], f(u) + text_distance * dy_units[idx], \
-                                  g(u) - text_distance * dx_units[idx], text_attr))
-            else:  # make a number
-                text_list.append((self._put_text_(u), f(u) + text_distance * dy_units[idx],
-                                  g(u) - text_distance * dx_units[idx], text_attr))
+            if skip[idx]:
+                continue
+            text_attr = self._find_text_attr_(dy_units[idx], angles[idx], text_size)
+            new_texts.append((strings[idx], f(u) + text_distance * dy_units[idx],
+                              g(u) - text_distance * dx_units[idx], text_attr))
+        if self.axis_appear['text_extent_smart']:
+            new_texts = self._thin_texts_(new_texts, text_list)
+        text_list.extend(new_texts)
+
+    def _thin_texts_(self, new_texts, text_list):
+        """
+        drops texts whose estimated boxes overlap earlier texts
+        """
+        padding = self.axis_appear['text_extent_padding']
+        accepted = estimate_text_bboxes(text_list)
+        boxes = estimate_text_bboxes(new_texts)
+        kept = []
+        for idx, text_def in enumerate(new_texts):
+            box = boxes[idx:idx + 1]
+            if not boxes_overlap(box, accepted, padding)[0]:
+                kept.append(text_def)
+                accepted = numpy.concatenate((accepted, box))
+        return kept
 
     def _make_tick_lines_(self, tick_list, tick_lines, f, g, dx_units, dy_units,
                           tick_length):
@@ -1187,26 +924,26 @@ class Nomo_Axis:
         """
         f = self.func_f
         g = self.func_g
-        # self._determine_turn_()
-        turn = _determine_turn_(f=self.func_f, g=self.func_g, start=self.start,
-                                stop=self.stop, side=self.side)
-        # turn=self.turn
         texts = list([])
         line = pyx.path.path(pyx.path.moveto(f(self.start), g(self.start)))
         thin_line = pyx.path.path(pyx.path.moveto(f(self.start), g(self.start)))
         main_line = pyx.path.path(pyx.path.moveto(f(self.start), g(self.start)))
-        for number, label_string in six.iteritems(manual_axis_data):
-            text_distance = 1.0 / 4
-            text_size = self.axis_appear['text_size_manual']
-            if self.side == 'left':
-                text_attr = [pyx.text.valign.middle, pyx.text.halign.right, text_size]
-                texts.append((label_string, f(number) - text_distance,
-                              g(number), text_attr))
-            else:
-                text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size]
-                texts.append((label_string, f(number) + text_distance,
-                              g(number), text_attr))
-            self.canvas.fill(pyx.path.circle(f(number), g(number), 0.02))
+        values, label_defs = sort_manual_axis_data(manual_axis_data)
+        x_values = evaluate_array(f, values)
+        y_values = evaluate_array(g, values)
+        text_distance = 1.0 / 4
+        text_size = self.axis_appear['text_size_manual']
+        if self.side == 'left':
+            text_attr = [pyx.text.valign.middle, pyx.text.halign.right, text_size]
+            text_distance = -text_distance
+        else:
+            text_attr = [pyx.text.valign.middle, pyx.text.halign.left, text_size]
+        for idx, label_string in enumerate(label_defs):
+            texts.append((label_string, x_values[idx] + text_distance, y_values[idx], text_attr))
+        markers = Symbol_Batch()  # circle is defined once in output file
+        for x, y in zip(x_values, y_values):
+            markers.add(circle_symbol(0.02, None, pyx.color.rgb.black), x, y)
+        markers.insert(self.canvas)
         self.line = line
         self.thin_line = thin_line
         self.main_line = main_line
@@ -1220,7 +957,6 @@ class Nomo_Axis:
         g = self.func_g
         start = self.start
         stop = self.stop
-        # self._determine_turn_()
         # line lists
         line = pyx.path.path(pyx.path.moveto(f(self.start), g(self.start)))
         thin_line = pyx.path.path(pyx.path.moveto(f(self.start), g(self.start)))
@@ -1228,37 +964,26 @@ class Nomo_Axis:
         arrows = []
         # text list
         texts = []  # pyx structure
-        text_strings = []
-        tick_list = []
-        # let's find tick positions'
-        #        manual_axis_data.sort()
-        #        for number, label_string in manual_axis_data.iteritems():
-        #            tick_list.append(number)
-        #            text_strings.append(label_string)
-
-        keys = manual_axis_data.keys()
-        # keys.sort()
-        keys = sorted(keys)  # to make work in python3
-        for key in keys:
-            tick_list.append(key)
-            text_strings.append(manual_axis_data[key])
-
-        # let's find tick angles
-        dx_units, dy_units, angles = find_tick_directions(tick_list, f, g, self.side, start, stop,
-                                                          full_angle=self.axis_appear['full_angle'],
-                                                          extra_angle=self.axis_appear['extra_angle'],
-                                                          turn_relative=self.axis_appear['turn_relative'])
-
+        # let's find tick positions and angles
+        tick_list, text_strings = sort_manual_axis_data(manual_axis_data)
+        turn = _determine_turn_(f=f, g=g, start=start, stop=stop, side=self.side,
+                                turn_relative=self.axis_appear['turn_relative'])
+        plan = make_tick_plan([tick_list], [tick_list], f, g, turn, start, stop,
+                              full_angle=self.axis_appear['full_angle'],
+                              extra_angle=self.axis_appear['extra_angle'])
         # ticks = arrows
         if self.tick_levels > 0:
-            self._make_arrows_(tick_list, arrows, f, g, dx_units, dy_units,
-                               self.axis_appear['arrow_length'])
+            x_start, y_start, x_end, y_end = plan_tick_segments(plan, self.axis_appear['arrow_length'])
+            x_head, y_head = plan_text_positions(plan, 0.02)
+            for idx in range(len(plan)):
+                arrows.append(pyx.path.line(x_end[idx], y_end[idx], x_head[idx], y_head[idx]))
         # texts
         if self.tick_text_levels > 0:
-            self._make_texts_(tick_list, texts, f, g, dx_units, dy_units, angles,
-                              self.axis_appear['arrow_length'] + 0.15,
-                              self.axis_appear['text_size_0'],
-                              manual_texts=text_strings)
+            x_texts, y_texts = plan_text_positions(plan, self.axis_appear['arrow_length'] + 0.15)
+            for idx in range(len(plan)):
+                text_attr = self._find_text_attr_(plan['dy'][idx], plan['angle'][idx],
+                                                  self.axis_appear['text_size_0'])
+                texts.append((text_strings[idx], x_texts[idx], y_texts[idx], text_attr))
         # make main line
         self._make_main_line_(start, stop, line, f, g)
 
@@ -1303,9 +1028,18 @@ class Nomo_Axis:
             delta_u = du * section_length / dl
             u += delta_u
             line.append(pyx.path.lineto(f(u), g(u)))
+        # positions and derivatives of all points in one go
+        values, label_defs = sort_manual_axis_data(manual_axis_data)
+        x_values = evaluate_array(f, values)
+        y_values = evaluate_array(g, values)
+        dx_values = evaluate_array(f, values + du) - x_values
+        dy_values = evaluate_array(g, values + du) - y_values
         # make lines and texts
         turn_original = turn
-        for number, label_def in six.iteritems(manual_axis_data):
+        for idx, label_def in enumerate(label_defs):
+            number = values[idx]
+            x_number = x_values[idx]
+            y_number = y_values[idx]
             turn = turn_original
             x_corr = 0.0  # shifts for labels
             y_corr = 0.0
@@ -1345,8 +1079,8 @@ class Nomo_Axis:
             else:
                 label_string = label_def
 
-            dx = (f(number + du) - f(number)) * turn
-            dy = (g(number + du) - g(number)) * turn
+            dx = dx_values[idx] * turn
+            dy = dy_values[idx] * turn
             dx_unit = dx / math.sqrt(dx ** 2 + dy ** 2)
             dy_unit = dy / math.sqrt(dx ** 2 + dy ** 2)
             #            if dy_unit!=0:
@@ -1363,9 +1097,9 @@ class Nomo_Axis:
                     angle = -math.atan(dx_unit / dy_unit) * 180 / math.pi
                 else:
                     angle = 0
-                if scipy.sign(dx_unit) < 0 and scipy.sign(dy_unit) < 0:
+                if numpy.sign(dx_unit) < 0 and numpy.sign(dy_unit) < 0:
                     angle = angle - 180
-                if scipy.sign(dy_unit) < 0 and scipy.sign(dx_unit) >= 0:
+                if numpy.sign(dy_unit) < 0 and numpy.sign(dx_unit) >= 0:
                     angle = angle + 180
             angle = angle + self.axis_appear['extra_angle']
 
@@ -1386,26 +1120,26 @@ class Nomo_Axis:
             # normal case (not range)
             if range_tick == False:
                 if manual_relative_text_pos == None:  # do default text positioning
-                    texts.append((label_string, f(number) - text_distance * dy_unit + x_corr,
-                                  g(number) + text_distance * dx_unit + y_corr, text_attr))
+                    texts.append((label_string, x_number - text_distance * dy_unit + x_corr,
+                                  y_number + text_distance * dx_unit + y_corr, text_attr))
                 else:  # do manual text position
                     if type(manual_relative_text_pos) is not tuple:
                         print("'manual_relative_text_pos' should be tuple (dx,dy)")
                     dx_rel = manual_relative_text_pos[0]
                     dy_rel = manual_relative_text_pos[1]
                     texts.append((label_string,
-                                  f(number) - (dy_rel * dy_unit) + (dx_rel * dx_unit) + x_corr,
-                                  g(number) + (dy_rel * dx_unit) + (dx_rel * dy_unit) + y_corr, text_attr))
+                                  x_number - (dy_rel * dy_unit) + (dx_rel * dx_unit) + x_corr,
+                                  y_number + (dy_rel * dx_unit) + (dx_rel * dy_unit) + y_corr, text_attr))
                 if manual_relative_line == None:  # default line tick drawing
-                    line.append(pyx.path.moveto(f(number), g(number)))
-                    line.append(pyx.path.lineto(f(number) - grid_length * dy_unit, g(number) + grid_length * dx_unit))
+                    line.append(pyx.path.moveto(x_number, y_number))
+                    line.append(pyx.path.lineto(x_number - grid_length * dy_unit, y_number + grid_length * dx_unit))
                 else:  # manual line tick drawing
                     if type(manual_relative_line) is not list:
                         print("'manual_relative_line' should be list [(x0,y0),(x1,y1),...]")
                         print(manual_relative_line)
-                    line.append(pyx.path.moveto(f(number), g(number)))
-                    x_orig = f(number)
-                    y_orig = g(number)
+                    line.append(pyx.path.moveto(x_number, y_number))
+                    x_orig = x_number
+                    y_orig = y_number
                     for coords in manual_relative_line:
                         x_curr = coords[0]  # current coordinates
                         y_curr = coords[1]
@@ -1424,16 +1158,16 @@ class Nomo_Axis:
                 dx_units[0], dx_units[1] = range_side * dx_units[0], range_side * dx_units[1]
                 dy_units[0], dy_units[1] = range_side * dy_units[0], range_side * dy_units[1]
                 # first tick
-                line.append(pyx.path.moveto(f(number), g(number)))
+                line.append(pyx.path.moveto(x_number, y_number))
                 line.append(
-                    pyx.path.lineto(f(number) - grid_length * dy_units[0], g(number) + grid_length * dx_units[0]))
+                    pyx.path.lineto(x_number - grid_length * dy_units[0], y_number + grid_length * dx_units[0]))
                 # second tick
                 line.append(pyx.path.moveto(f(range_end), g(range_end)))
                 line.append(
                     pyx.path.lineto(f(range_end) - grid_length * dy_units[1], g(range_end) + grid_length * dx_units[1]))
                 # text
-                x0 = (f(number) + f(range_end)) / 2.0
-                y0 = (g(number) + g(range_end)) / 2.0
+                x0 = (x_number + f(range_end)) / 2.0
+                y0 = (y_number + g(range_end)) / 2.0
                 dx_unit = (dx_units[0] + dx_units[1]) / 2.0  # tick directions is average of range end directions
                 dy_unit = (dy_units[0] + dy_units[1]) / 2.0
                 texts.append((
@@ -1442,8 +1176,8 @@ class Nomo_Axis:
                 self._make_main_line_(number, range_end, main_line, f, g, sections=35.0)
             if draw_extra_line:
                 line.append(
-                    pyx.path.lineto(f(number) - grid_length * dy_unit + x_corr,
-                                    g(number) + grid_length * dx_unit + y_corr))
+                    pyx.path.lineto(x_number - grid_length * dy_unit + x_corr,
+                                    y_number + grid_length * dx_unit + y_corr))
                 # self.canvas.fill(pyx.path.circle(f(number), g(number), 0.02))
         self._make_main_line_(min, max, main_line, f, g)
         self.line = line
@@ -1460,17 +1194,37 @@ class Nomo_Axis:
         linewidth_main = self.axis_appear['linewidth_main']
         # c.stroke(self.line, [pyx.style.linewidth.normal,axis_color])
         # c.stroke(self.thin_line, [pyx.style.linewidth.thin,axis_color])
-        c.stroke(self.line, [linewidth_ticks, axis_color, pyx.style.linecap.butt])
-        c.stroke(self.thin_line, [linewidth_ticks_thin, axis_color, pyx.style.linecap.butt])
-        c.stroke(self.main_line, [linewidth_main, axis_color, pyx.style.linecap.square])
+        lines = Stroke_Batch()  # empty paths (no ticks, reference axes) are not stroked
+        lines.path(self.line, [linewidth_ticks, axis_color, pyx.style.linecap.butt])
+        lines.path(self.thin_line, [linewidth_ticks_thin, axis_color, pyx.style.linecap.butt])
+        lines.path(self.main_line, [linewidth_main, axis_color, pyx.style.linecap.square])
+        lines.stroke(c)
         if self.arrows is not None:
             for arrow in self.arrows:
                 c.stroke(arrow,
                          [pyx.style.linewidth.thick, arrow_color,
                           pyx.deco.earrow([pyx.deco.stroked([arrow_color]),
                                        pyx.deco.filled([arrow_color])], size=self.axis_appear['arrow_size'])])
-        for ttext, x, y, attr in self.texts:
-            c.text(x, y, ttext, attr + [text_color])
+        label_index = self.axis_appear['label_index']
+        text_levels = getattr(self, 'text_levels', [])
+        if len(text_levels) != len(self.texts):
+            text_levels = [None] * len(self.texts)
+        for (ttext, x, y, attr), level in zip(self.texts, text_levels):
+            if level is None:
+                set_text_origin(c, 'axis texts')
+            else:
+                set_text_origin(c, 'axis texts level %i' % level)
+            if label_index is None:
+                c.text(x, y, ttext, attr + [text_color])
+            else:
+                label_index.place_text(c, x, y, ttext, attr + [text_color])
+
+    def _register_title_(self, title_box):
+        """
+        titles are always drawn, other labels give way
+        """
+        if self.axis_appear['label_index'] is not None:
+            self.axis_appear['label_index'].add_item(title_box)
 
     def _draw_title_top_(self, c):
         """
@@ -1487,14 +1241,33 @@ class Nomo_Axis:
             if y_value > y_max:
                 y_max = y_value
                 best_u = number
-        c.text(self.func_f(best_u) + self.title_x_shift,
-               self.func_g(best_u) + self.title_y_shift,
-               self.title, [pyx.text.halign.center, self.axis_appear['title_color']])
-
-        self.titles.append((self.title, self.func_f(best_u) + self.title_x_shift,
-                            self.func_g(best_u) + self.title_y_shift,
+        title_x = self.func_f(best_u) + self.title_x_shift
+        title_y = self.func_g(best_u) + self.title_y_shift
+        if self.axis_appear['text_extent_smart']:
+            title_y = self._clear_title_from_texts_(title_x, title_y)
+        title_box = c.text(title_x, title_y,
+                           self.title, [pyx.text.halign.center, self.axis_appear['title_color']])
+        self._register_title_(title_box)
+
+        self.titles.append((self.title, title_x, title_y,
                             [pyx.text.halign.center, self.axis_appear['title_color']]))
 
+    def _clear_title_from_texts_(self, title_x, title_y):
+        """
+        raises top title so that its estimated box does not overlap tick texts
+        """
+        padding = self.axis_appear['text_extent_padding']
+        title_box = estimate_text_bboxes([(self.title, title_x, title_y, [pyx.text.halign.center])])
+        text_boxes = estimate_text_bboxes(self.texts)
+        if len(text_boxes) == 0:
+            return title_y
+        below = (text_boxes[:, 0] < title_box[0, 2] + padding) & \
+                (title_box[0, 0] < text_boxes[:, 2] + padding) & \
+                (text_boxes[:, 3] + padding > title_box[0, 1])
+        if below.any():
+            title_y += (text_boxes[below, 3] + padding - title_box[0, 1]).max()
+        return title_y
+
     #        # find out if start or stop has higher y-value
     #        if self.func_g(self.stop)>self.func_g(self.start):
     #            c.text(self.func_f(self.stop)+self.title_x_shift,
@@ -1546,10 +1319,11 @@ class Nomo_Axis:
             angle = angle + 180.0
         angle += self.axis_appear['title_extra_angle']
         text_distance = self.axis_appear['title_distance_center']
-        c.text(center_x - text_distance * dy_unit + dx_absolute + dx_relative,
-               center_y + text_distance * dx_unit + dy_absolute + dy_relative,
-               self.title, [pyx.text.halign.center, pyx.trafo.rotate(angle),
-                            self.axis_appear['title_color']])
+        title_box = c.text(center_x - text_distance * dy_unit + dx_absolute + dx_relative,
+                           center_y + text_distance * dx_unit + dy_absolute + dy_relative,
+                           self.title, [pyx.text.halign.center, pyx.trafo.rotate(angle),
+                                        self.axis_appear['title_color']])
+        self._register_title_(title_box)
         
         self.titles.append((self.title, center_x - text_distance * dy_unit,
                             center_y + text_distance * dx_unit,
@@ -1594,9 +1368,11 @@ class Nomo_Axis:
         else:
             angle = -180.0
 
-        c.text(self.func_f(best_u) + self.title_x_shift,
-               self.func_g(best_u) + self.title_y_shift,
-               self.title, [pyx.trafo.rotate(angle), pyx.text.halign.center, self.axis_appear['title_color']])
+        title_box = c.text(self.func_f(best_u) + self.title_x_shift,
+                           self.func_g(best_u) + self.title_y_shift,
+                           self.title, [pyx.trafo.rotate(angle), pyx.text.halign.center,
+                                        self.axis_appear['title_color']])
+        self._register_title_(title_box)
 
         self.titles.append((self.title, self.func_f(best_u) + self.title_x_shift,
                             self.func_g(best_u) + self.title_y_shift,
@@ -1638,9 +1414,10 @@ class Nomo_Axis:
                 width = texts['width']
                 pyx_extra_defs = texts['pyx_extra_defs']
                 #                c.text(x,y,text_str,[pyx.text.parbox(width)]+pyx_extra_defs)
-                c.text(self.func_f(best_u) + dx,
-                       self.func_g(best_u) + dy,
-                       text_str, [pyx.text.parbox(width)] + pyx_extra_defs)
+                title_box = c.text(self.func_f(best_u) + dx,
+                                   self.func_g(best_u) + dy,
+                                   text_str, [pyx.text.parbox(width)] + pyx_extra_defs)
+                self._register_title_(title_box)
                 self.titles.append((self.func_f(best_u) + dx,
                                     self.func_g(best_u) + dy,
                                     text_str, [pyx.text.parbox(width)] + pyx_extra_defs))
@@ -1652,6 +1429,14 @@ class Nomo_Axis:
             # return r"$%3.2f$ " %u
             return self.axis_appear['text_format'] % u
 
+    def _put_texts_(self, values):
+        """
+        texts of array of values, same as _put_text_ for each value
+        """
+        if self.text_style == 'oldstyle':
+            return format_tick_texts(values, r"$\oldstylenums{%3.2f}$ ")
+        return format_tick_texts(values, self.axis_appear['text_format'])
+
 
 # def _determine_turn_(self):
 #        """
@@ -1922,6 +1707,107 @@ def find_log_ticks_negative_smart(start, stop, f, g, turn=1, base_start=None,
            tick_3_list_final, tick_4_list_final,
 
 
+def find_log_ticks_mixed_smart(start, stop, f, g, distance_limit_tick=0.05, distance_limit_text=0.25):
+    """
+    finds ticks and texts for log scale that crosses zero (start < 0 < stop).
+    Area near zero is made linear.
+    """
+    # negative side
+    start_decade = math.floor(math.log10(-start))
+    # initialize
+    distance = 2 * distance_limit_text
+    while distance > distance_limit_text:
+        start_decade = start_decade - 1
+        distance = calc_distance(f, g, -10 ** (start_decade), -10 ** (start_decade - 1))
+    # positive side
+    stop_decade = math.floor(math.log10(stop))
+    # initialize
+    distance = 2 * distance_limit_text
+    while distance > distance_limit_text:
+        stop_decade = stop_decade - 1
+        distance = calc_distance(f, g, 10 ** (stop_decade), 10 ** (stop_decade - 1))
+    # make the ticks
+    start_decade = start_decade + 1
+    stop_decade = stop_decade + 1
+    print("start_decade value %f" % -10 ** start_decade)
+    print("stop_decade value %f" % 10 ** stop_decade)
+    lists = []
+    for distance_limit in [distance_limit_tick, distance_limit_text]:
+        lists_n = find_log_ticks_negative_smart(start, -10 ** (start_decade) * 1.0001, f, g, turn=1,
+                                                base_start=None, base_stop=None,
+                                                distance_limit=distance_limit)
+        lists_p = find_log_ticks_smart(10 ** (stop_decade) * 1.0001, stop, f, g, turn=1,
+                                       base_start=None, base_stop=None,
+                                       distance_limit=distance_limit)
+        # middle
+        lists_mn = find_linear_ticks_smart(-10 ** (start_decade), 0, f, g, turn=1, base_start=None,
+                                           base_stop=None, scale_max_0=10 * 10 ** (start_decade),
+                                           distance_limit=distance_limit)
+        lists_mp = find_linear_ticks_smart(0, 10 ** (stop_decade), f, g, turn=1, base_start=None,
+                                           base_stop=None, scale_max_0=10 * 10 ** (stop_decade),
+                                           distance_limit=distance_limit)
+        level_lists = []
+        for level in range(5):
+            if level < 4:
+                level_list = lists_n[level] + lists_p[level] + lists_mn[level] + lists_mp[level]
+            else:
+                level_list = lists_n[level] + lists_p[level]
+            remove_multiple_and_sort(level_list)
+            level_lists.append(level_list)
+        # manual removing of possible top clashes
+        if max(level_lists[0]) == max(level_lists[1]):
+            level_lists[1].remove(max(level_lists[1]))
+        if min(level_lists[0]) == min(level_lists[1]):
+            level_lists[1].remove(min(level_lists[1]))
+        lists.append(level_lists)
+    ticks, texts = lists
+    return ticks, texts
+
+
+def find_tick_values(kind, start, stop, f, g, base_start=None, base_stop=None, scale_max=None,
+                     distance_limit_tick=0.05, distance_limit_text=0.25):
+    """
+    finds tick and text values of all levels for axis type kind
+    ('linear', 'linear smart', 'log' or 'log smart').
+    Returns ticks = [tick_0_list,...] and texts = [text_0_list,...]
+    """
+    if kind == 'linear':
+        ticks = list(find_linear_ticks(start, stop, base_start, base_stop, scale_max)[:5])
+        texts = ticks
+    elif kind == 'linear smart':
+        ticks = list(find_linear_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
+                                             base_stop=base_stop, scale_max_0=scale_max,
+                                             distance_limit=distance_limit_tick))
+        texts = list(find_linear_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
+                                             base_stop=base_stop, scale_max_0=scale_max,
+                                             distance_limit=distance_limit_text))
+        for tick_list, text_list in zip(ticks, texts):
+            remove_text_if_not_tick(tick_list, text_list)
+    elif kind == 'log smart':
+        if start > 0 and stop > 0:
+            ticks = list(find_log_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
+                                              base_stop=base_stop,
+                                              distance_limit=distance_limit_tick))
+            texts = list(find_log_ticks_smart(start, stop, f, g, turn=1, base_start=base_start,
+                                              base_stop=base_stop,
+                                              distance_limit=distance_limit_text))
+        if start < 0 and stop < 0:
+            ticks = list(find_log_ticks_negative_smart(start, stop, f, g, turn=1, base_start=base_start,
+                                                       base_stop=base_stop,
+                                                       distance_limit=distance_limit_tick))
+            texts = list(find_log_ticks_negative_smart(start, stop, f, g, turn=1, base_start=base_start,
+                                                       base_stop=base_stop,
+                                                       distance_limit=distance_limit_text))
+        if start < 0 and stop > 0:
+            ticks, texts = find_log_ticks_mixed_smart(start, stop, f, g,
+                                                      distance_limit_tick=distance_limit_tick,
+                                                      distance_limit_text=distance_limit_text)
+    else:  # 'log'
+        ticks = list(find_log_ticks(start, stop)[:3])
+        texts = ticks
+    return ticks, texts
+
+
 def find_tick_directions(list, f, g, side, start, stop, full_angle=False, extra_angle=0, turn_relative=False):
     """
     finds tick directions and angles
@@ -2210,11 +2096,70 @@ def calc_distance(f, g, u1, u2):
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
 
+def sort_manual_axis_data(manual_axis_data):
+    """
+    sorts manual axis data {value: label,...} into array of values
+    and list of corresponding labels (or [label, ex_params] definitions)
+    """
+    keys = sorted(manual_axis_data.keys())
+    values = numpy.array(keys, dtype=float)
+    label_defs = [manual_axis_data[key] for key in keys]
+    return values, label_defs
+
+
 def make_array_to_dict_for_manual_ticks(array_in, format='%3.2f'):
-    array_out = {}
-    for x in array_in:
-        array_out[x] = format % x
-    return array_out
+    return dict(zip(array_in, format_tick_texts(array_in, format)))
+
+
+def format_tick_texts(values, text_format='$%4.4g$', text_format_func=None):
+    """
+    list of texts of values formatted with text_format (as text_format % u)
+    or with function text_format_func(u) if given
+    """
+    if len(values) == 0:
+        return []
+    if text_format_func is not None:
+        return [text_format_func(u) for u in values]
+    return numpy.char.mod(text_format, numpy.asarray(values)).tolist()
+
+
+def find_duplicate_texts(texts, earlier_texts=()):
+    """
+    boolean array, True for texts that are in earlier_texts or that
+    appear earlier in texts (for example equal after rounding)
+    """
+    texts = numpy.asarray(texts, dtype=object)
+    duplicate = numpy.zeros(len(texts), dtype=bool)
+    if len(texts) == 0:
+        return duplicate
+    first_index = numpy.unique(texts.astype(str), return_index=True)[1]
+    duplicate[:] = True
+    duplicate[first_index] = False
+    if len(earlier_texts) > 0:
+        duplicate |= numpy.isin(texts.astype(str), numpy.asarray(list(earlier_texts), dtype=str))
+    return duplicate
+
+
+def _geometry_fingerprint_(f, g, start, stop, samples=33):
+    """
+    fingerprint of axis curve (x,y) = (f(u),g(u)) to identify identical axes.
+    Curve is only sampled at evenly spaced points, so fingerprint is not unique.
+    Returns None if curve cannot be sampled.
+    """
+    fingerprint = []
+    try:
+        for u in numpy.linspace(start, stop, samples):
+            fingerprint.append((round(float(f(u)), 10), round(float(g(u)), 10)))
+    except (ValueError, TypeError, ZeroDivisionError, OverflowError):
+        return None
+    return tuple(fingerprint)
+
+
+def clear_tick_layout_cache():
+    """
+    empties the cache of tick layouts shared between identical axes
+    """
+    _tick_layout_cache.clear()
 
 
 def calc_main_line_coords(start, stop, f, g, sections=350.0):
@@ -2325,22 +2270,23 @@ def core_tick_draw_func_basic(ticks, texts, level, f, g, dx_units, dy_units,
     if len(dx_units) < n_ticks: print("too few dx_units !")
     if len(dy_units) < n_ticks: print("too few dy_units !")
     if len(angles) < n_ticks: print("too few angles !")
+    # pyx.color
+    tick_color = ti['tick_color']
+    if ti['tick_colors'] != None:
+        tick_color = ti['tick_colors'][level]
+    # tick linewidth
+    if level > 3:
+        linewidth_tick = ti['linewidth_ticks_thin']
+    else:
+        linewidth_tick = ti['linewidth_ticks']
+    if ti['tick_linewidths'] != None:
+        linewidth_tick = ti['tick_linewidths'][level]
+    # all ticks of level are drawn as one path
+    tick_lines = Stroke_Batch()
     for i, tick in enumerate(ticks):
-        # draw actual tick
         x1, y1, x2, y2 = calc_tick_coords(tick, f, g, dx_units[i], dy_units[i], tick_length)
-        # pyx.color
-        tick_color = ti['tick_color']
-        if ti['tick_colors'] != None:
-            tick_color = ti['tick_colors'][level]
-        # tick linewidth
-        if level > 3:
-            linewidth_tick = ti['linewidth_ticks_thin']
-        else:
-            linewidth_tick = ti['linewidth_ticks']
-        if ti['tick_linewidths'] != None:
-            linewidth_tick = ti['tick_linewidths'][level]
-        # draw the tick
-        c.stroke(pyx.path.line(x1, y1, x2, y2), [linewidth_tick, tick_color, pyx.style.linecap.butt])
+        tick_lines.line(x1, y1, x2, y2, [linewidth_tick, tick_color, pyx.style.linecap.butt])
+    tick_lines.stroke(c)
 
 
 def example_tick_draw_func(ticks, texts, level, f, g, dx_units, dy_units,
@@ -2362,12 +2308,14 @@ def example_tick_draw_func(ticks, texts, level, f, g, dx_units, dy_units,
     if len(dx_units) < n_ticks: print("too few dx_units !")
     if len(dy_units) < n_ticks: print("too few dy_units !")
     if len(angles) < n_ticks: print("too few angles !")
+    tick_color = tick_info['tick_colors'][level]
+    linewidth_ticks = tick_info['tick_linewidths'][level]
+    tick_lines = Stroke_Batch()
     for i, tick in enumerate(ticks):
         # draw actual tick
         x1, y1, x2, y2 = calc_tick_coords(tick, f, g, dx_units[i], dy_units[i], tick_length)
-        tick_color = tick_info['tick_colors'][level]
-        linewidth_ticks = tick_info['tick_linewidths'][level]
-        c.stroke(pyx.path.line(x1, y1, x2, y2), [linewidth_ticks, tick_color, pyx.style.linecap.butt])
+        tick_lines.line(x1, y1, x2, y2, [linewidth_ticks, tick_color, pyx.style.linecap.butt])
+    tick_lines.stroke(c)
 
 
 def core_text_draw_func_basic(ticks, texts, level, f, g, dx_units, dy_units, angles,
@@ -2394,6 +2342,7 @@ def core_text_draw_func_basic(ticks, texts, level, f, g, dx_units, dy_units, ang
         print("too few dy_units !")
     if len(angles) < n_texts:
         print("too few angles !")
+    text_strings = format_tick_texts(texts, ti['text_format'], ti['text_format_func'])
     for i, text_value in enumerate(texts):
         # draw actual text
         x = f(text_value) + text_distance * dy_units[i]
@@ -2405,12 +2354,7 @@ def core_text_draw_func_basic(ticks, texts, level, f, g, dx_units, dy_units, ang
         text_size = ti['text_sizes'][level]
         # if ti['level_text_size']!=None:
         #    text_size=ti['level_text_size'][level]
-        if ti['text_format_func'] is None:
-            text = ti['text_format'] % text_value
-        else:
-            text = ti['text_format_func'](text_value)
-
-        c.text(x, y, text, text_attrs[i] + [text_color, text_size])
+        c.text(x, y, text_strings[i], text_attrs[i] + [text_color, text_size])
 
 
 def example_text_draw_func(ticks, texts, level, f, g, dx_units, dy_units, angles,
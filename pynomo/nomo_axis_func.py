@@ -652,16 +652,12 @@ class Axes_Wrapper:
         x3d, y3d = x3, self.paper_height
         x4d, y4d = x4, 0.0
 
-        c = pyx.canvas.canvas()
-        self._plot_axes_(c)
-        c.fill(pyx.path.circle(x1, y1, 0.02))
-        c.text(x1 + 1, y1, '1')
-        c.fill(pyx.path.circle(x2, y2, 0.03))
-        c.text(x2 + 1, y2, '2')
-        c.fill(pyx.path.circle(x3, y3, 0.04))
-        c.text(x3 + 1, y3, '3')
-        c.fill(pyx.path.circle(x4, y4, 0.05))
-        c.text(x4 + 1, y4, '4')
+        # debug plot of polygon (texts would need TeX even with draft backend):
+        # c = pyx.canvas.canvas()
+        # self._plot_axes_(c)
+        # c.fill(pyx.path.circle(x1, y1, 0.02))
+        # c.text(x1 + 1, y1, '1')
+        # ... same for points 2, 3 and 4
         # c.writePDFfile('poly_debug.pdf')
         # print "polygon coords:"
         # print x1,y1,x2,y2,x3,y3,x4,y4
@@ -18,6 +18,8 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .nomo_axis import Nomo_Axis
+from .nomo_text import set_text_origin
+from .label_index import draw_label
 import math
 import numpy as np
 import pyx
@@ -57,6 +59,7 @@ class Nomo_Grid:
                                'text_format_u': "$%4.4g$",
                                'text_format_v': "$%4.4g$",
                                'iterator_factor': 1.001,
+                               'label_index': None,  # Label_Index to drop/shift colliding texts
                                }
         self.grid_data = data_default_values
         self.grid_data.update(data)
@@ -267,9 +270,10 @@ class Nomo_Grid:
         """
         text_distance = self.grid_data['text_distance']
         text_attr = text_attr + [text_color]
-        self.canvas.text(f(u) - text_distance * dx_unit,
-                         g(u) - text_distance * dy_unit,
-                         title, text_attr)
+        set_text_origin(self.canvas, 'grid texts')
+        draw_label(self.canvas, f(u) - text_distance * dx_unit,
+                   g(u) - text_distance * dy_unit,
+                   title, text_attr, self.grid_data['label_index'])
         # self.canvas.fill(pyx.path.circle(f(u), g(u), 0.03),[axis_color])
 
 
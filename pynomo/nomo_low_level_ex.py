@@ -23,6 +23,7 @@ Also Latex is used with oldstyle fonts that should be installed.
 
 from nomo_axis import *
 from nomograph3 import *
+from nomo_text import Text_Engine
 import pyx
 
 def f1(u):
@@ -69,8 +70,8 @@ def g4(x):
     return 4 * math.log10(x)
 
 
-pyx.text.set(mode="latex")
-pyx.text.set(mode="latex", texmessagesdocclass=[pyx.text.texmessage.ignore])
+# one explicit LaTeX engine instead of global pyx.text.set calls
+text_engine = Text_Engine(pyx.text.LatexEngine(texmessages_docclass=[pyx.text.texmessage.ignore]))
 nomograph = Nomograph3(f1=f1, f2=f2, f3=f3, g1=g1, g2=g2, g3=g3, h1=h1, h2=h2, h3=h3,
                        vk=[['u', 0.5, 'x', -5.0],
                            ['u', 0.5, 'y', 0.0],
@@ -83,12 +84,12 @@ nomograph = Nomograph3(f1=f1, f2=f2, f3=f3, g1=g1, g2=g2, g3=g3, h1=h1, h2=h2, h
 # nomograph._make_transformation_matrix_()
 # \usepackage[T1]{fontenc}
 # \usepackage[math]{anttor}
-pyx.text.set(mode="latex")
-# text.preamble(r"\usepackage[T1]{fontenc}")
-# text.preamble(r"\usepackage[math]{anttor}")
-# text.preamble(r"\oldstyle")
+# text_engine.preamble(r"\usepackage[T1]{fontenc}")
+# text_engine.preamble(r"\usepackage[math]{anttor}")
+# text_engine.preamble(r"\oldstyle")
 
 ccc = pyx.canvas.canvas()
+ccc.settextengine(text_engine)
 gg3 = Nomo_Axis(func_f=nomograph.give_x3, func_g=nomograph.give_y3, start=1.0, stop=0.5,
                 turn=-1, title='L', canvas=ccc, text_style='oldstyle')
 gg1 = Nomo_Axis(func_f=nomograph.give_x1, func_g=nomograph.give_y1, start=0.5, stop=1.0,
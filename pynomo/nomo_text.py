@@ -0,0 +1,674 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pyx
+from . import text_metrics
+
+
+class Text_Engine(object):
+    """
+    Text engine for nomogram canvas. Wraps a pyx text engine
+    (default pyx.text.defaulttextengine, see pyx.text.set) and is set with
+    canvas.settextengine so that every c.text call goes through it.
+
+    Each unique text (string and text attributes such as size and align)
+    is typeset only once. Repeated texts are inserted as transformed
+    copies of the first box. Same Text_Engine can be given to many
+    nomograms (main param 'text_engine'), then texts of earlier nomograms
+    are reused and preamble is set only once:
+
+        engine = Text_Engine(pyx.text.LatexEngine())
+        engine.preamble(r'\\usepackage{...}')
+        for params in all_params:
+            params['text_engine'] = engine
+            Nomographer(params)
+
+    store: optional Text_Store. Texts found in store are not typeset at all,
+    new texts are added to store with save().
+    deferred: new texts are recorded as placeholders and typeset by flush()
+    (or one by one when size of placeholder is needed). flush() sends all
+    pending texts to TeX in one run and reads its DVI output once. Needs cache.
+    workers: number of TeX processes used by flush(). Pending texts are
+    dealt to copies of engine (same settings and preamble) and typeset
+    concurrently. Result does not depend on number of workers.
+    max_boxes: number of typeset boxes kept for reuse. Least recently used
+    boxes are dropped after this (None keeps all). clear() drops all of them,
+    for example between unrelated runs of long-lived engine.
+    """
+
+    def __init__(self, engine=None, cache=True, store=None, deferred=False, workers=1,
+                 max_boxes=4096):
+        if engine is None:
+            engine = pyx.text.defaulttextengine
+        self.engine = engine
+        self.cache = cache
+        self.store = store
+        self.deferred = deferred
+        self.workers = workers
+        self.max_boxes = max_boxes
+        self.boxes = OrderedDict()  # typeset boxes at origin, least recently used first
+        self.sources = {}  # key -> (expr, text attributes) of text not yet typeset
+        self.pending = OrderedDict()  # texts waiting for flush()
+        self.new_boxes = {}  # store key -> typeset box not yet in store
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.origin = 'other'  # where texts come from, see set_text_origin
+        self.stats = OrderedDict()  # origin -> counters and time
+
+    def preamble(self, expr, texmessages=[]):
+        self.engine.preamble(expr, texmessages)
+
+    def reset(self, *args, **kwargs):
+        self.boxes.clear()
+        self.sources.clear()
+        self.pending.clear()
+        self.engine.reset(*args, **kwargs)
+
+    def clear(self):
+        """
+        drops typeset boxes kept for reuse (pending texts are kept).
+        Engine settings, preamble and store are not changed.
+        """
+        self.boxes.clear()
+
+    def warm_up(self):
+        """
+        starts TeX process and processes preamble so that next text is fast.
+        Call for example between nomograms when engine is reused.
+        """
+        if isinstance(self.engine, (pyx.text.MultiEngine, pyx.text.SingleEngine)):
+            self.engine.text_pt(0, 0, r'\relax')
+
+    def text(self, x, y, *args, **kwargs):
+        return self.text_pt(pyx.unit.topt(x), pyx.unit.topt(y), *args, **kwargs)
+
+    def text_pt(self, x_pt, y_pt, expr, textattrs=[], texmessages=[], fontmap=None, singlecharmode=False):
+        """
+        gives typeset text at (x_pt,y_pt), same interface as pyx text engines
+        """
+        start_time = time.time()
+        if not self.cache or not isinstance(expr, str) or len(texmessages) > 0:
+            box = self.engine.text_pt(x_pt, y_pt, expr, textattrs, texmessages,
+                                      fontmap=fontmap, singlecharmode=singlecharmode)
+            self._record_(self.origin, start_time)
+            return box
+        trafos, fillstyles, tex_attrs = split_text_attrs(textattrs)
+        key = (text_key(expr, tex_attrs), fontmap, singlecharmode)
+        if key in self.boxes:
+            self.hits += 1
+            self._record_(self.origin, None, hits=1)
+            self.boxes.move_to_end(key)
+            box = self.boxes[key]
+        elif key in self.pending:
+            self.hits += 1
+            self._record_(self.origin, None, hits=1)
+            box = self.pending[key]
+        else:
+            self.misses += 1
+            self._record_(self.origin, None, misses=1)
+            self.sources[key] = (expr, tex_attrs)
+            if self.deferred:
+                box = Deferred_Text_Box(self, key)
+                self.pending[key] = box
+            else:
+                box = self._typeset_(key)
+                self._keep_box_(key, box)
+        placed = place_box(box, x_pt, y_pt, trafos, fillstyles)
+        self._record_(self.origin, start_time)
+        return placed
+
+    def _record_(self, origin, start_time, hits=0, misses=0):
+        """
+        adds to statistics of origin. Text is counted when start_time is given.
+        """
+        if origin not in self.stats:
+            self.stats[origin] = {'texts': 0, 'hits': 0, 'misses': 0, 'time': 0.0}
+        stats = self.stats[origin]
+        stats['hits'] += hits
+        stats['misses'] += misses
+        if start_time is not None:
+            stats['texts'] += 1
+            stats['time'] += time.time() - start_time
+
+    def reset_stats(self):
+        """
+        clears statistics of text origins
+        """
+        self.stats = OrderedDict()
+
+    def count_texts(self):
+        """
+        number of texts so far by origin
+        """
+        return dict((origin, stats['texts']) for origin, stats in self.stats.items())
+
+    def record_reused(self, counts):
+        """
+        adds texts of reused drawing (counts: origin -> number of texts) to
+        statistics as cache hits
+        """
+        for origin, count in counts.items():
+            self._record_(origin, None, hits=count)
+            self.stats[origin]['texts'] += count
+
+    def report(self):
+        """
+        table of text statistics by origin as string. Time of deferred texts
+        is given in row 'deferred typesetting'.
+        """
+        lines = ['%-28s %7s %7s %7s %9s' % ('origin', 'texts', 'hits', 'misses', 'time (s)')]
+        for origin, stats in self.stats.items():
+            lines.append('%-28s %7i %7i %7i %9.3f' % (origin, stats['texts'], stats['hits'],
+                                                      stats['misses'], stats['time']))
+        lines.append('typeset boxes %i, from store %i' % (len(self.boxes), self.store_hits))
+        return '\n'.join(lines)
+
+    def resolve(self, key):
+        """
+        typeset box of text with key (typesets pending text if needed)
+        """
+        if key in self.pending:
+            start_time = time.time()
+            box = self._typeset_(key)
+            self._finish_pending_(key, box)
+            self._record_('deferred typesetting', start_time)
+            return box
+        return self.boxes[key]
+
+    def _finish_pending_(self, key, box):
+        """
+        gives typeset box to placeholder of pending text and keeps it for reuse
+        """
+        self.pending.pop(key).box = box
+        self._keep_box_(key, box)
+
+    def _keep_box_(self, key, box):
+        """
+        keeps typeset box for reuse, dropping least recently used boxes above max_boxes
+        """
+        self.sources.pop(key, None)
+        self.boxes[key] = box
+        self.boxes.move_to_end(key)
+        if self.max_boxes is not None:
+            while len(self.boxes) > max(self.max_boxes, 1):
+                self.boxes.popitem(last=False)
+
+    def flush(self):
+        """
+        typesets all pending texts in order they were requested. Texts not
+        in store are typeset as one batch (see typeset_batch) by engine or,
+        with workers > 1, by pool of engines.
+        """
+        if len(self.pending) == 0:
+            return
+        start_time = time.time()
+        missing = []
+        for key in list(self.pending.keys()):
+            box = self._stored_box_(key)
+            if box is None:
+                missing.append(key)
+            else:
+                self._finish_pending_(key, box)
+        workers = 1
+        if isinstance(self.engine, pyx.text.MultiEngine):
+            workers = max(min(self.workers, len(missing)), 1)
+        if workers > 1:
+            self._flush_parallel_(missing, workers)
+            self._record_('parallel typesetting', start_time)
+        else:
+            batch = [self.sources[key] + key[1:] for key in missing]
+            for key, box in zip(missing, typeset_batch(self.engine, batch)):
+                self._add_new_box_(key, box)
+                self._finish_pending_(key, box)
+            self._record_('deferred typesetting', start_time)
+
+    def _flush_parallel_(self, keys, workers):
+        """
+        typesets texts of keys with pool of engines. Keys are dealt to workers
+        round robin and boxes are put back by key, so result is deterministic.
+        """
+        chunks = [keys[idx::workers] for idx in range(workers)]
+        batches = [[self.sources[key] + key[1:] for key in chunk] for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda batch: typeset_batch(copy_engine(self.engine), batch), batches))
+        for chunk, boxes in zip(chunks, results):
+            for key, box in zip(chunk, boxes):
+                self._add_new_box_(key, box)
+                self._finish_pending_(key, box)
+
+    def _typeset_(self, key):
+        """
+        box of text at origin, from store if found there
+        """
+        box = self._stored_box_(key)
+        if box is not None:
+            return box
+        expr, tex_attrs = self.sources[key]
+        box = self.engine.text_pt(0, 0, expr, tex_attrs, fontmap=key[1], singlecharmode=key[2])
+        self._add_new_box_(key, box)
+        return box
+
+    def _store_key_(self, key):
+        """
+        key of text in store or None if text is not stored
+        """
+        tex_expr, fontmap, singlecharmode = key
+        if self.store is None or fontmap is not None or isinstance(self.engine, Draft_Engine):
+            return None
+        return self.store.make_key(tex_expr, singlecharmode, engine_signature(self.engine))
+
+    def _stored_box_(self, key):
+        """
+        box from store or None
+        """
+        store_key = self._store_key_(key)
+        if store_key is None:
+            return None
+        box = self.store.get(store_key)
+        if box is not None:
+            self.store_hits += 1
+        return box
+
+    def _add_new_box_(self, key, box):
+        """
+        remembers typeset box to be saved to store
+        """
+        store_key = self._store_key_(key)
+        if store_key is not None:
+            self.new_boxes[store_key] = box
+
+    def save(self):
+        """
+        adds new typeset texts to store and writes it. Call after output is
+        written, then texts do not need extra TeX runs.
+        """
+        if self.store is None:
+            return
+        for store_key, box in self.new_boxes.items():
+            self.store.put(store_key, box)
+        self.new_boxes = {}
+        self.store.save()
+
+
+class Draft_Engine(object):
+    """
+    Text engine that does not use TeX. Texts are laid out with built-in font
+    metrics (see text_metrics) and drawn with simple stroke glyphs. TeX
+    markup is mostly dropped. Meant for drafts, previews and tests.
+    """
+
+    def __init__(self):
+        self.preambles = []
+
+    def preamble(self, expr, texmessages=[]):
+        self.preambles.append((expr, texmessages))  # not used
+
+    def reset(self, reinit=False):
+        if not reinit:
+            self.preambles = []
+
+    def text(self, x, y, *args, **kwargs):
+        return self.text_pt(pyx.unit.topt(x), pyx.unit.topt(y), *args, **kwargs)
+
+    def text_pt(self, x_pt, y_pt, expr, textattrs=[], texmessages=[], fontmap=None, singlecharmode=False):
+        """
+        gives drawn text at (x_pt,y_pt), same interface as pyx text engines
+        """
+        trafos, fillstyles, tex_attrs = split_text_attrs(textattrs)
+        return place_box(draft_text_box(expr, tex_attrs), x_pt, y_pt, trafos, fillstyles)
+
+
+class Null_Engine(Draft_Engine):
+    """
+    Text engine that neither typesets nor draws texts. Gives empty boxes
+    with extents estimated like Draft_Engine, so that layout depending on
+    text sizes still works. Used by main param 'geometry_only'.
+    """
+
+    def text_pt(self, x_pt, y_pt, expr, textattrs=[], texmessages=[], fontmap=None, singlecharmode=False):
+        """
+        gives empty text box at (x_pt,y_pt), same interface as pyx text engines
+        """
+        trafos, fillstyles, tex_attrs = split_text_attrs(textattrs)
+        return place_box(draft_text_box(expr, tex_attrs, draw=False), x_pt, y_pt, trafos, fillstyles)
+
+
+def draft_text_box(expr, tex_attrs, draw=True):
+    """
+    Drawn_Text_Box of expr at origin laid out according to pyx text attributes
+    (size, halign, valign, parbox, vshift). With draw=False only extents are
+    calculated and box is empty.
+    """
+    size_pt = text_metrics.font_size_pt('normalsize')
+    box_align, flush_align, v_align, par_width, shift_ratio = 0.0, 0.0, None, None, 0.0
+    for tex_attr in tex_attrs:
+        if isinstance(tex_attr, pyx.text.size):
+            size_pt = text_metrics.font_size_pt(tex_attr.size)
+        if isinstance(tex_attr, pyx.text.boxhalign):
+            box_align = tex_attr.boxhalign
+        if isinstance(tex_attr, pyx.text.flushhalign):
+            flush_align = tex_attr.flushhalign
+        if isinstance(tex_attr, pyx.text.valign):
+            v_align = tex_attr.valign
+        if isinstance(tex_attr, pyx.text.parbox_pt):
+            par_width = tex_attr.width
+        if isinstance(tex_attr, pyx.text.vshift):
+            shift_ratio = tex_attr.lowerratio * text_metrics.line_extent(tex_attr.heightstr)[1]
+    size_pt = size_pt * 72.0 / 72.27  # TeX pt to PostScript pt
+    if par_width is not None:
+        par_width = par_width * 72.0 / 72.27 / size_pt
+    lines = text_metrics.wrap_lines(text_metrics.clean_text(expr), par_width)
+    extents = [text_metrics.line_extent(line) for line in lines]
+    width = max(extent[0] for extent in extents)
+    if par_width is not None:
+        width = max(width, par_width)
+    height = extents[0][1]
+    depth = text_metrics.BASELINE_SKIP * (len(lines) - 1) + extents[-1][2]
+    shift = shift_ratio  # lowering of text in em
+    if v_align is not None:
+        shift += (1.0 - v_align) * height - v_align * depth
+    glyph_path = pyx.path.path()
+    glyph_scale = text_metrics.CAP_HEIGHT * size_pt
+    for idx, line in enumerate(lines if draw else []):
+        x = flush_align * (width - extents[idx][0])
+        y = -text_metrics.BASELINE_SKIP * idx - shift
+        for char in line:
+            advance = text_metrics.CHAR_WIDTHS.get(char, text_metrics.DEFAULT_CHAR_WIDTH)
+            for stroke in text_metrics.glyph_strokes(char):
+                points = [((x + px * advance) * size_pt, y * size_pt + py * glyph_scale)
+                          for px, py in stroke]
+                glyph_path.append(pyx.path.moveto_pt(*points[0]))
+                for point in points[1:]:
+                    glyph_path.append(pyx.path.lineto_pt(*point))
+            x += advance
+    left_pt = box_align * width * size_pt
+    glyphs = pyx.canvas.canvas([pyx.trafo.translate_pt(-left_pt, 0)])
+    if len(glyph_path) > 0:
+        glyphs.stroke(glyph_path, [pyx.style.linewidth(0.07 * size_pt * pyx.unit.t_pt),
+                                   pyx.style.linecap.round, pyx.style.linejoin.round])
+    return Drawn_Text_Box(left_pt, (1.0 - box_align) * width * size_pt,
+                          (height - shift) * size_pt, (depth + shift) * size_pt,
+                          glyphs, glyph_path.transformed(pyx.trafo.translate_pt(-left_pt, 0)))
+
+
+class Deferred_Text_Box(pyx.baseclasses.canvasitem):
+    """
+    placeholder of text at origin that is typeset later by Text_Engine.
+    Asking size (bbox etc.) or output typesets it immediately. Typeset box
+    is kept in placeholder, so it does not depend on boxes kept by engine.
+    """
+
+    def __init__(self, engine, key):
+        self.engine = engine
+        self.key = key
+        self.box = None
+
+    def __getattr__(self, name):
+        if name in ('engine', 'key', 'box'):
+            raise AttributeError(name)
+        return getattr(self.typeset(), name)
+
+    def typeset(self):
+        """
+        typeset box of text (typesets pending text if needed)
+        """
+        if self.box is None:
+            self.box = self.engine.resolve(self.key)
+        return self.box
+
+    def bbox(self):
+        return self.typeset().bbox()
+
+    def processPS(self, file, writer, context, registry, bbox):
+        self.typeset().processPS(file, writer, context, registry, bbox)
+
+    def processPDF(self, file, writer, context, registry, bbox):
+        self.typeset().processPDF(file, writer, context, registry, bbox)
+
+    def processSVG(self, xml, writer, context, registry, bbox):
+        self.typeset().processSVG(xml, writer, context, registry, bbox)
+
+
+class Text_Store(object):
+    """
+    On-disk store (json file) of typeset texts. One entry holds box metrics
+    (left, right, height, depth in pt) and outline of text as path.
+    Entries are keyed by TeX expression, TeX engine settings and preamble.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = {}
+        self.modified = False
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    self.entries = json.load(f)
+            except (IOError, ValueError):
+                print("Could not read text store %s, starting empty store" % filename)
+
+    def make_key(self, tex_expr, singlecharmode, signature):
+        """
+        key of text typeset with engine having given signature
+        """
+        key_text = json.dumps([tex_expr, singlecharmode, signature])
+        return hashlib.sha1(key_text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        box of stored text or None if not in store
+        """
+        if key not in self.entries:
+            return None
+        entry = self.entries[key]
+        outline = list_to_normpath(entry['path'])
+        glyphs = pyx.canvas.canvas()
+        glyphs.fill(outline)
+        return Drawn_Text_Box(entry['left'], entry['right'], entry['height'], entry['depth'],
+                              glyphs, outline)
+
+    def put(self, key, box):
+        """
+        stores typeset box (pyx textextbox_pt at origin)
+        """
+        try:
+            outline = box.textpath().normpath()
+        except Exception:  # for example fonts without outlines
+            return
+        left_pt = pyx.unit.topt(box.left)
+        depth_pt = pyx.unit.topt(box.depth)
+        self.entries[key] = {'left': left_pt,
+                             'right': pyx.unit.topt(box.right),
+                             'height': pyx.unit.topt(box.height),
+                             'depth': depth_pt,
+                             'path': normpath_to_list(outline)}
+        self.modified = True
+
+    def save(self):
+        """
+        writes store to file if modified
+        """
+        if not self.modified:
+            return
+        with open(self.filename, 'w') as f:
+            json.dump(self.entries, f)
+        self.modified = False
+
+
+class Drawn_Text_Box(pyx.box.rect_pt, pyx.baseclasses.canvasitem):
+    """
+    text at origin drawn without TeX (from Text_Store or Draft_Engine).
+    Has same box (bbox, extents) as typeset text at origin.
+    glyphs: canvas with drawing of text
+    outline: path of text
+    """
+
+    def __init__(self, left_pt, right_pt, height_pt, depth_pt, glyphs, outline):
+        self.left = left_pt * pyx.unit.t_pt
+        self.right = right_pt * pyx.unit.t_pt
+        self.width = self.left + self.right
+        self.height = height_pt * pyx.unit.t_pt
+        self.depth = depth_pt * pyx.unit.t_pt
+        pyx.box.rect_pt.__init__(self, -left_pt, -depth_pt,
+                                 left_pt + right_pt, depth_pt + height_pt,
+                                 abscenter_pt=(left_pt, depth_pt))
+        self.outline = outline
+        self.glyphs = glyphs
+
+    def textpath(self):
+        return self.outline
+
+    def processPS(self, file, writer, context, registry, bbox):
+        self.glyphs.processPS(file, writer, context, registry, pyx.bbox.empty())
+        bbox += pyx.box.rect.bbox(self)
+
+    def processPDF(self, file, writer, context, registry, bbox):
+        self.glyphs.processPDF(file, writer, context, registry, pyx.bbox.empty())
+        bbox += pyx.box.rect.bbox(self)
+
+    def processSVG(self, xml, writer, context, registry, bbox):
+        self.glyphs.processSVG(xml, writer, context, registry, pyx.bbox.empty())
+        bbox += pyx.box.rect.bbox(self)
+
+
+def engine_signature(engine):
+    """
+    description of TeX engine settings and preamble that affect typeset text
+    """
+    if isinstance(engine, pyx.text.MultiEngine):
+        return [engine.cls.__name__, repr(engine.args),
+                repr(sorted(engine.kwargs.items())),
+                [expr for expr, texmessages in engine.preambles]]
+    return [engine.__class__.__name__,
+            [expr for expr, texmessages in getattr(engine, 'preambles', [])]]
+
+
+def normpath_to_list(outline):
+    """
+    normpath as list of subpaths [closed, [segment coordinates in pt, ...]]
+    """
+    subpaths = []
+    for normsubpath in outline.normsubpaths:
+        segments = []
+        for item in normsubpath.normsubpathitems:
+            if isinstance(item, pyx.normpath.normcurve_pt):
+                segments.append([item.x0_pt, item.y0_pt, item.x1_pt, item.y1_pt,
+                                 item.x2_pt, item.y2_pt, item.x3_pt, item.y3_pt])
+            else:
+                segments.append([item.x0_pt, item.y0_pt, item.x1_pt, item.y1_pt])
+        subpaths.append([bool(normsubpath.closed), segments])
+    return subpaths
+
+
+def list_to_normpath(subpaths):
+    """
+    inverse of normpath_to_list
+    """
+    normsubpaths = []
+    for closed, segments in subpaths:
+        items = []
+        for segment in segments:
+            if len(segment) == 8:
+                items.append(pyx.normpath.normcurve_pt(*segment))
+            else:
+                items.append(pyx.normpath.normline_pt(*segment))
+        normsubpaths.append(pyx.normpath.normsubpath(items, closed=closed))
+    return pyx.normpath.normpath(normsubpaths)
+
+
+def copy_engine(engine):
+    """
+    new pyx MultiEngine with same settings and preamble as engine
+    """
+    new_engine = pyx.text.MultiEngine(engine.cls, *engine.args, **engine.kwargs)
+    for expr, texmessages in engine.preambles:
+        new_engine.preamble(expr, texmessages)
+    return new_engine
+
+
+def typeset_batch(engine, batch):
+    """
+    typesets texts of batch [(expr, text attributes, fontmap, singlecharmode),...]
+    at origin with engine, one after another in same TeX run, and finishes
+    the run so that DVI output of all boxes is read once. Returns list of boxes.
+    """
+    boxes = [engine.text_pt(0, 0, expr, tex_attrs, fontmap=fontmap, singlecharmode=singlecharmode)
+             for expr, tex_attrs, fontmap, singlecharmode in batch]
+    if len(boxes) > 0 and isinstance(boxes[-1], pyx.text.textextbox_pt):
+        boxes[-1].dvicanvas  # reads dvi output of all boxes
+    return boxes
+
+
+def set_text_origin(c, origin):
+    """
+    tells Text_Engine of canvas c where following texts come from (for statistics)
+    """
+    if isinstance(c.textengine, Text_Engine):
+        c.textengine.origin = origin
+
+
+def flush_texts(c):
+    """
+    typesets pending texts of canvas c if it uses a deferred Text_Engine
+    """
+    if isinstance(c.textengine, Text_Engine):
+        c.textengine.flush()
+
+
+def split_text_attrs(textattrs):
+    """
+    splits text attributes into transformations, fill styles (colors)
+    and attributes that change typeset text (size, align, ...)
+    """
+    textattrs = pyx.attr.mergeattrs(textattrs)
+    pyx.attr.checkattrs(textattrs, [pyx.text.textattr, pyx.trafo.trafo_pt, pyx.style.fillstyle])
+    trafos = pyx.attr.getattrs(textattrs, [pyx.trafo.trafo_pt])
+    fillstyles = pyx.attr.getattrs(textattrs, [pyx.style.fillstyle])
+    tex_attrs = pyx.attr.getattrs(textattrs, [pyx.text.textattr])
+    return trafos, fillstyles, tex_attrs
+
+
+def text_key(expr, tex_attrs):
+    """
+    TeX expression that is typeset for expr with given text attributes
+    """
+    for tex_attr in tex_attrs[::-1]:
+        expr = tex_attr.apply(expr)
+    return expr
+
+
+def place_box(box, x_pt, y_pt, trafos, fillstyles):
+    """
+    inserts box typeset at origin to (x_pt,y_pt) after transformations
+    (applied in given order around origin, like pyx text engines do)
+    """
+    trafo = pyx.trafo.translate_pt(x_pt, y_pt)
+    for reltrafo in trafos[::-1]:
+        trafo = trafo * reltrafo
+    placed = pyx.canvas.canvas([trafo] + fillstyles)
+    placed.insert(box)
+    return placed
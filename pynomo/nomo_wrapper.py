@@ -25,13 +25,26 @@ from .nomo_grid import Nomo_Grid
 from .nomograph3 import Nomograph3
 from .nomo_axis import find_linear_ticks, find_log_ticks
 from .nomo_axis import find_tick_directions, find_linear_ticks_smart
+from .nomo_axis import find_tick_values, _determine_turn_
+from .tick_plan import evaluate_array, find_plan_directions
+from .nomo_text import flush_texts, set_text_origin
+from .stroke_batch import Stroke_Batch
+from .display_list import Display_List
+from .svg_stream import write_svg
+from .frozen_canvas import freeze_canvas
+from .layers import fingerprint
+from .label_index import draw_label
+from .tiles import Tiling, write_tiles
+from .path_compaction import compact_canvas
 
 import math
 import numpy as np
 import scipy
 import pyx
 
+import concurrent.futures
 import copy
+import io
 import re
 import pprint
 import random
@@ -51,7 +64,13 @@ class Nomo_Wrapper:
             'title_y': paper_height,
             'title_color': pyx.color.rgb.black,
             'title_box_width': paper_width / 2.2,
-            'extra_texts': []}
+            'extra_texts': [],
+            'svg_writer': 'pyx',
+            'output_format': None,
+            'write_workers': 1,
+            'tiles': None,
+            'quantize': None,
+            'label_index': None}
         self.params = self.params_default
         self.params.update(params)
         self.block_stack = []
@@ -241,45 +260,159 @@ class Nomo_Wrapper:
         """
         self.axes_wrapper.matrix_trafo(params)
 
-    def draw_nomogram(self, canvas, post_func=None):
+    def draw_nomogram(self, canvas, post_func=None, write_files=True, layer_cache=None, fingerprints=None):
         """
         draws the nomogram = draws blocks, titles, etc.
         post_func is a function(canvas) to be draws after all
-        """
-        for block in self.block_stack:
-            block.draw(canvas)
-        self._draw_title_(canvas)
-        self._draw_extra_texts_(canvas)
+        write_files: False = canvas is not written to filename
+        layer_cache: Layer_Cache, blocks ('block 0', 'block 1', ...) and 'titles'
+        are drawn as layers, fingerprints = layer name -> fingerprint
+        """
+        if fingerprints is None:
+            fingerprints = {}
+        if self.params['label_index'] is None:
+            titles_canvas = canvas
+        else:
+            # titles go to label index before texts of blocks, so that texts give way
+            # to them. Titles are still drawn on top of blocks.
+            titles_canvas = pyx.canvas.canvas()
+            titles_canvas.settextengine(canvas.textengine)
+            self._draw_layer_(titles_canvas, layer_cache, 'titles', fingerprints, self._draw_titles_)
+        for idx, block in enumerate(self.block_stack):
+            self._draw_layer_(canvas, layer_cache, 'block %i' % idx, fingerprints, block.draw)
+        if titles_canvas is canvas:
+            self._draw_layer_(canvas, layer_cache, 'titles', fingerprints, self._draw_titles_)
+        else:
+            canvas.insert(titles_canvas)
         if post_func is not None:
+            set_text_origin(canvas, 'other')
             post_func(canvas)
+        flush_texts(canvas)
+        if not write_files:
+            return
+        if self.filename is None:  # output is taken with write_output
+            return
         if isinstance(self.filename, list):
-            for filename_this in self.filename:
-                if not re.compile(".eps$").search(filename_this, 1) is None:
-                    canvas.writeEPSfile(filename_this)
-                else:
-                    if not re.compile(".svg$").search(filename_this, 1) is None:
-                        canvas.writeSVGfile(filename_this)
-                    else:
-                        canvas.writePDFfile(filename_this)
+            self.write_outputs(canvas, self.filename, self.params['write_workers'])
         else:
-            if not re.compile(".eps$").search(self.filename, 1) is None:
-                canvas.writeEPSfile(self.filename)
-            else:
-                if not re.compile(".svg$").search(self.filename, 1) is None:
-                    canvas.writeSVGfile(self.filename)
-                else:
-                    canvas.writePDFfile(self.filename)
+            self.write_output(canvas, self.filename)
+
+    def write_output(self, canvas, file=None, output_format=None):
+        """
+        writes canvas to file as 'pdf', 'eps' or 'svg'
+        file: file name, binary file-like object or None = bytes are returned
+        output_format: None = from file name or param 'output_format' (default 'pdf')
+        """
+        if output_format is None:
+            output_format = self._output_format_(file)
+        if file is None:
+            buffer = io.BytesIO()
+            self.write_output(canvas, buffer, output_format)
+            return buffer.getvalue()
+        canvas = self._output_canvas_(canvas)
+        if self.params['tiles'] is not None:  # poster tiles, see tiles.Tiling
+            write_tiles(Tiling(canvas, **self.params['tiles']), file, output_format)
+        elif output_format == 'eps':
+            canvas.writeEPSfile(file)
+        elif output_format == 'svg':
+            self._write_svg_(canvas, file)
+        elif output_format == 'pdf':
+            canvas.writePDFfile(file)
+        else:
+            raise ValueError("unknown output format '%s', use 'pdf', 'eps' or 'svg'" % output_format)
+        return None
+
+    def write_outputs(self, canvas, files, workers=1):
+        """
+        writes finished canvas to many files. Shared work (path bounding
+        boxes) is done once and texts are finished (TeX boxes read their DVI)
+        before writing, see freeze_canvas. With workers > 1 files are then
+        written concurrently in threads, canvas is only read while writing.
+        """
+        canvas = self._output_canvas_(canvas)
+        if len(files) > 1:
+            freeze_canvas(canvas)
+        if workers <= 1 or len(files) < 2:
+            for file in files:
+                self.write_output(canvas, file)
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            futures = [executor.submit(self.write_output, canvas, file) for file in files]
+            for future in futures:
+                future.result()  # raises errors of writers
+
+    def _output_canvas_(self, canvas):
+        """
+        canvas to be written: compacted copy if param 'quantize' is set
+        """
+        if self.params['quantize'] is not None:
+            return compact_canvas(canvas, self.params['quantize'])
+        return canvas
+
+    def _output_format_(self, file):
+        """
+        output format of file from file name, param 'output_format' for other files
+        """
+        if not isinstance(file, str):
+            return self.params['output_format'] or 'pdf'
+        if not re.compile(".eps$").search(file, 1) is None:
+            return 'eps'
+        if not re.compile(".svg$").search(file, 1) is None:
+            return 'svg'
+        return 'pdf'
+
+    def _write_svg_(self, canvas, file):
+        """
+        writes canvas to SVG file with writer of param 'svg_writer'
+        'pyx' = pyx.canvas.writeSVGfile, 'stream' = paths written from display list
+        """
+        if self.params['svg_writer'] == 'stream':
+            write_svg(Display_List().from_canvas(canvas), file)
+        else:
+            canvas.writeSVGfile(file)
+
+    def _draw_layer_(self, canvas, layer_cache, name, fingerprints, draw_func):
+        """
+        draws with draw_func(canvas) directly or as cached layer
+        """
+        if layer_cache is None:
+            draw_func(canvas)
+        else:
+            layer_cache.insert(canvas, name, fingerprints.get(name), draw_func, self.params['label_index'])
+
+    def titles_fingerprint(self, signature):
+        """
+        fingerprint of title and extra texts layer
+        """
+        return fingerprint([self.params[name] for name in ['title_str', 'title_x', 'title_y', 'title_color',
+                                                           'title_box_width', 'extra_texts']], signature)
+
+    def _draw_titles_(self, c):
+        """
+        draws title and extra texts
+        """
+        self._draw_title_(c)
+        self._draw_extra_texts_(c)
 
     def _draw_title_(self, c):
         """
         draws title
         """
         # print self.params
-        c.text(self.params['title_x'], self.params['title_y'],
-               self.params['title_str'],
-               [pyx.text.parbox(self.params['title_box_width']),
-                pyx.text.halign.boxcenter, pyx.text.halign.flushcenter,
-                self.params['title_color']])
+        set_text_origin(c, 'title')
+        title_box = c.text(self.params['title_x'], self.params['title_y'],
+                           self.params['title_str'],
+                           [pyx.text.parbox(self.params['title_box_width']),
+                            pyx.text.halign.boxcenter, pyx.text.halign.flushcenter,
+                            self.params['title_color']])
+        self._register_title_(title_box)
+
+    def _register_title_(self, title_box):
+        """
+        titles are always drawn, other labels give way
+        """
+        if self.params['label_index'] is not None:
+            self.params['label_index'].add_item(title_box)
 
     def _draw_extra_texts_(self, c):
         """
@@ -291,6 +424,7 @@ class Nomo_Wrapper:
                         'width': 5,
                         'pyx_extra_defs': []
                         }
+        set_text_origin(c, 'extra texts')
         if len(self.params['extra_texts']) > 0:
             for texts in self.params['extra_texts']:
                 for key in text_default:
@@ -301,8 +435,9 @@ class Nomo_Wrapper:
                 text_str = texts['text']
                 width = texts['width']
                 pyx_extra_defs = texts['pyx_extra_defs']
-                c.text(x, y, text_str, [
+                text_box = c.text(x, y, text_str, [
                     pyx.text.parbox(width)] + pyx_extra_defs)
+                self._register_title_(text_box)
 
     def align_blocks_old(self):
         """
@@ -712,6 +847,7 @@ class Nomo_Block(object):
         self.ref_block_texts = []  # handle for additional texts in block
         self.ref_block_lines = []  # handle for additional lines in block
         self.ref_block_params = {}  # handle for params that define the block
+        self.label_index = None  # Label_Index of texts drawn by block itself, see label_index.py
         self.add_transformation()  # adds initial unit transformation
         self.aligned = False  # block is not aligned, and should be aligned only once
 
@@ -1558,6 +1694,7 @@ class Nomo_Block_Type_5(Nomo_Block):
         median_v = len(self.grid_box.v_lines) / 2
         if median_v == 0:
             median_v = 1
+        v_text_lines = Stroke_Batch()  # lines from v-contours to their titles
         for index, v_line in enumerate(self.grid_box.v_lines):
             x0, y0 = v_line[0]
             x0t = self._give_trafo_x_(x0, y0)
@@ -1621,7 +1758,8 @@ class Nomo_Block_Type_5(Nomo_Block):
             dy = yt_1 - yt
             if self.grid_box.params['allow_additional_v_scale'] == False:
                 self._draw_v_text_(xt, yt, dx, dy, canvas, title,
-                                   title_title, x_corr, y_corr, draw_line)
+                                   title_title, x_corr, y_corr, draw_line, v_text_lines)
+        v_text_lines.stroke(canvas)
         canvas.stroke(u_line_list, [
             pyx.style.linewidth.normal, self.grid_box.params['u_axis_color']])
         canvas.stroke(v_line_list, [
@@ -1635,9 +1773,10 @@ class Nomo_Block_Type_5(Nomo_Block):
         # self._draw_box_around_(canvas)
 
     def _draw_v_text_(self, x, y, dx, dy, canvas, title, title_title='', x_corr=0.0, y_corr=0.0,
-                      draw_line=False):
+                      draw_line=False, line_batch=None):
         """"
-        draws titles to v-contours
+        draws titles to v-contours. Lines to titles are added to line_batch
+        (Stroke_Batch) if given.
         """
         title_text = ""
         text_attr = []  # to be filled
@@ -1676,19 +1815,21 @@ class Nomo_Block_Type_5(Nomo_Block):
                              pyx.trafo.rotate(angle + 90), para_v['text_color']]
                 title_text = title + ' ' + title_title
         text_distance = self.grid_box.params['v_text_distance']
-        canvas.text(x - text_distance * dx_unit + x_corr,
-                    y - text_distance * dy_unit + y_corr,
-                    title_text, text_attr)
+        set_text_origin(canvas, 'grid texts')
+        draw_label(canvas, x - text_distance * dx_unit + x_corr,
+                   y - text_distance * dy_unit + y_corr,
+                   title_text, text_attr, self.label_index)
         # take handle
         self.ref_block_texts.append([title_text, x - text_distance * dx_unit + x_corr,
                                      y - text_distance * dy_unit + y_corr,
                                      text_attr])
         # draw line if needed
         if draw_line:
-            canvas.stroke(
-                pyx.path.line(x, y, x - text_distance * dx_unit +
-                              x_corr, y - text_distance * dy_unit + y_corr),
-                [pyx.style.linewidth.normal, para_v['axis_color']])
+            lines = Stroke_Batch() if line_batch is None else line_batch
+            lines.line(x, y, x - text_distance * dx_unit + x_corr, y - text_distance * dy_unit + y_corr,
+                       [pyx.style.linewidth.normal, para_v['axis_color']])
+            if line_batch is None:
+                lines.stroke(canvas)
         # take handle
         line_handle = pyx.path.path()
         line_handle.append(pyx.path.moveto(x, y))
@@ -1933,242 +2074,67 @@ class Nomo_Block_Type_6(Nomo_Block):
 
     def _do_ladder_lines_(self, canvas_given):
         """
-        finds points and derivatives for ladder
-        1. find points (according to F1 or given)
-        -linear
-        -log
-        -given (manual axis)
-        2. find derivatives at points
-        - delta_x and delta_y unit vector
+        draws ladder lines between same values of F1 and F2.
+        Values are ticks of F1 (or given for manual axis):
+        level 0 ticks with solid lines, level 1 ticks with dotted lines.
+        """
+        params1 = self.atom_F1.params
+        start = params1['u_min']
+        stop = params1['u_max']
+        scale_type = params1['scale_type']
+        if scale_type == 'linear':
+            tick_lists = find_linear_ticks(start, stop)[:2]
+        elif scale_type == 'linear smart':
+            tick_lists = find_linear_ticks_smart(start, stop, self.atom_F1.give_x, self.atom_F1.give_y, turn=1,
+                                                 base_start=params1['base_start'],
+                                                 base_stop=params1['base_stop'],
+                                                 scale_max_0=params1['scale_max'],
+                                                 distance_limit=params1['tick_distance_smart'])[:2]
+        elif scale_type == 'log smart':
+            ticks, texts = find_tick_values('log smart', min(start, stop), max(start, stop),
+                                            self.atom_F1.give_x, self.atom_F1.give_y,
+                                            base_start=params1['base_start'],
+                                            base_stop=params1['base_stop'],
+                                            distance_limit_tick=params1['tick_distance_smart'],
+                                            distance_limit_text=params1.get('text_distance_smart', 0.25))
+            tick_lists = ticks[:2]
+        elif scale_type == 'log':
+            tick_lists = find_log_ticks(start, stop)[:2]
+        elif scale_type in ['manual point', 'manual arrow', 'manual line']:
+            tick_lists = [sorted(params1['manual_axis_data'].keys())]
+        else:
+            tick_lists = []
+        line_styles = [pyx.style.linestyle.solid, pyx.style.linestyle.dotted]
+        for tick_list, line_style in zip(tick_lists, line_styles):
+            if len(tick_list) > 0:
+                canvas_given.stroke(self._make_ladder_path_(tick_list, start, stop),
+                                    [pyx.style.linewidth.normal, line_style, self.ladder_color])
+
+    def _make_ladder_path_(self, tick_list, start, stop):
+        """
+        one path of bezier curves from F1(u) to F2(u) for all u in tick_list.
+        Curves leave scales along their tick directions.
         """
         f1 = self.atom_F1.give_x
         g1 = self.atom_F1.give_y
         f2 = self.atom_F2.give_x
         g2 = self.atom_F2.give_y
-        start = self.atom_F1.params['u_min']
-        stop = self.atom_F1.params['u_max']
-        side1 = self.atom_F1.params['tick_side']
-        side2 = self.atom_F2.params['tick_side']
-
-        # Linear
-        if self.atom_F1.params['scale_type'] == 'linear':
-            tick_0_list, tick_1_list, tick_2_list, tick_3_list, tick_4_list, start_ax, stop_ax = \
-                find_linear_ticks(start, stop)
-
-            dx_units_0_1, dy_units_0_1, angles_0_1 = \
-                find_tick_directions(tick_0_list, f1, g1, side1, start, stop)
-
-            dx_units_0_2, dy_units_0_2, angles_0_2 = \
-                find_tick_directions(tick_0_list, f2, g2, side2, start, stop)
-
-            dx_units_1_1, dy_units_1_1, angles_1_1 = \
-                find_tick_directions(tick_1_list, f1, g1, side1, start, stop)
-
-            dx_units_1_2, dy_units_1_2, angles_1_2 = \
-                find_tick_directions(tick_1_list, f2, g2, side2, start, stop)
-
-            self._draw_ladder_lines_(dx_units_0_1, dy_units_0_1, dx_units_0_2, dy_units_0_2,
-                                     tick_0_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.solid)
-            self._draw_ladder_lines_(dx_units_1_1, dy_units_1_1, dx_units_1_2, dy_units_1_2,
-                                     tick_1_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.dotted)
-
-        # Linear smart
-        if self.atom_F1.params['scale_type'] == 'linear smart':
-            tick_0_list, tick_1_list, tick_2_list, tick_3_list, tick_4_list = \
-                find_linear_ticks_smart(start, stop, f1, g1, turn=1,
-                                        base_start=self.atom_F1.params['base_start'],
-                                        base_stop=self.atom_F1.params['base_stop'],
-                                        scale_max_0=self.atom_F1.params['scale_max'],
-                                        distance_limit=self.atom_F1.params['tick_distance_smart'])
-
-            #            tick_0_list,tick_1_list,tick_2_list,tick_3_list,tick_4_list,start_ax,stop_ax=\
-            #            find_linear_ticks(start,stop)
-
-            dx_units_0_1, dy_units_0_1, angles_0_1 = find_tick_directions(tick_0_list, f1, g1, side1, start, stop,
-                                                                          full_angle=self.atom_F1.params['full_angle'],
-                                                                          extra_angle=self.atom_F1.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F1.params[
-                                                                              'turn_relative'])
-            #            dx_units_0_1,dy_units_0_1,angles_0_1=\
-            #            find_tick_directions(tick_0_list,f1,g1,side1,start,stop)
-
-            dx_units_0_2, dy_units_0_2, angles_0_2 = find_tick_directions(tick_0_list, f2, g2, side2, start, stop,
-                                                                          full_angle=self.atom_F2.params['full_angle'],
-                                                                          extra_angle=self.atom_F2.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F2.params[
-                                                                              'turn_relative'])
-            #            dx_units_0_2,dy_units_0_2,angles_0_2=\
-            #            find_tick_directions(tick_0_list,f2,g2,side2,start,stop)
-            #
-            dx_units_1_1, dy_units_1_1, angles_1_1 = find_tick_directions(tick_1_list, f1, g1, side1, start, stop,
-                                                                          full_angle=self.atom_F1.params['full_angle'],
-                                                                          extra_angle=self.atom_F1.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F1.params[
-                                                                              'turn_relative'])
-
-            #            dx_units_1_1,dy_units_1_1,angles_1_1=\
-            #            find_tick_directions(tick_1_list,f1,g1,side1,start,stop)
-            #
-            dx_units_1_2, dy_units_1_2, angles_1_2 = find_tick_directions(tick_1_list, f2, g2, side2, start, stop,
-                                                                          full_angle=self.atom_F2.params['full_angle'],
-                                                                          extra_angle=self.atom_F2.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F2.params[
-                                                                              'turn_relative'])
-            #            dx_units_1_2,dy_units_1_2,angles_1_2=\
-            #            find_tick_directions(tick_1_list,f2,g2,side2,start,stop)
-
-            self._draw_ladder_lines_(dx_units_0_1, dy_units_0_1, dx_units_0_2, dy_units_0_2,
-                                     tick_0_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.solid)
-            self._draw_ladder_lines_(dx_units_1_1, dy_units_1_1, dx_units_1_2, dy_units_1_2,
-                                     tick_1_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.dotted)
-
-        # np.log smart
-        if self.atom_F1.params['scale_type'] == 'log smart':
-            c = pyx.canvas.canvas()
-            dummy_axis = Nomo_Axis(f1, g1, start, stop, turn=1, title='', canvas=c, type='log smart',
-                                   text_style='normal', title_x_shift=0, title_y_shift=0.25,
-                                   tick_levels=4, tick_text_levels=3,
-                                   text_color=pyx.color.rgb.black, axis_color=pyx.color.rgb.black,
-                                   manual_axis_data={},
-                                   axis_appear=self.atom_F1.params, side=self.atom_F1.params['tick_side'],
-                                   base_start=self.atom_F1.params['base_start'],
-                                   base_stop=self.atom_F1.params['base_stop'])
-            tick_0_list = dummy_axis.tick_0_list
-            tick_1_list = dummy_axis.tick_1_list
-            tick_2_list = dummy_axis.tick_2_list
-            tick_3_list = dummy_axis.tick_3_list
-            tick_4_list = dummy_axis.tick_4_list
-            find_linear_ticks_smart(start, stop, f1, g1, turn=1,
-                                    base_start=self.atom_F1.params['base_start'],
-                                    base_stop=self.atom_F1.params['base_stop'],
-                                    scale_max_0=self.atom_F1.params['scale_max'],
-                                    distance_limit=self.atom_F1.params['tick_distance_smart'])
-
-            #            tick_0_list,tick_1_list,tick_2_list,tick_3_list,tick_4_list,start_ax,stop_ax=\
-            #            find_linear_ticks(start,stop)
-
-            dx_units_0_1, dy_units_0_1, angles_0_1 = find_tick_directions(tick_0_list, f1, g1, side1, start, stop,
-                                                                          full_angle=self.atom_F1.params['full_angle'],
-                                                                          extra_angle=self.atom_F1.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F1.params[
-                                                                              'turn_relative'])
-            #            dx_units_0_1,dy_units_0_1,angles_0_1=\
-            #            find_tick_directions(tick_0_list,f1,g1,side1,start,stop)
-
-            dx_units_0_2, dy_units_0_2, angles_0_2 = find_tick_directions(tick_0_list, f2, g2, side2, start, stop,
-                                                                          full_angle=self.atom_F2.params['full_angle'],
-                                                                          extra_angle=self.atom_F2.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F2.params[
-                                                                              'turn_relative'])
-            #            dx_units_0_2,dy_units_0_2,angles_0_2=\
-            #            find_tick_directions(tick_0_list,f2,g2,side2,start,stop)
-            #
-            dx_units_1_1, dy_units_1_1, angles_1_1 = find_tick_directions(tick_1_list, f1, g1, side1, start, stop,
-                                                                          full_angle=self.atom_F1.params['full_angle'],
-                                                                          extra_angle=self.atom_F1.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F1.params[
-                                                                              'turn_relative'])
-
-            #            dx_units_1_1,dy_units_1_1,angles_1_1=\
-            #            find_tick_directions(tick_1_list,f1,g1,side1,start,stop)
-            #
-            dx_units_1_2, dy_units_1_2, angles_1_2 = find_tick_directions(tick_1_list, f2, g2, side2, start, stop,
-                                                                          full_angle=self.atom_F2.params['full_angle'],
-                                                                          extra_angle=self.atom_F2.params[
-                                                                              'extra_angle'],
-                                                                          turn_relative=self.atom_F2.params[
-                                                                              'turn_relative'])
-            #            dx_units_1_2,dy_units_1_2,angles_1_2=\
-            #            find_tick_directions(tick_1_list,f2,g2,side2,start,stop)
-
-            self._draw_ladder_lines_(dx_units_0_1, dy_units_0_1, dx_units_0_2, dy_units_0_2,
-                                     tick_0_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.solid)
-            self._draw_ladder_lines_(dx_units_1_1, dy_units_1_1, dx_units_1_2, dy_units_1_2,
-                                     tick_1_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.dotted)
-
-        # np.log
-        if self.atom_F1.params['scale_type'] == 'log':
-            tick_0_list, tick_1_list, tick_2_list, start_ax, stop_ax = \
-                find_log_ticks(start, stop)
-
-            dx_units_0_1, dy_units_0_1, angles_0_1 = \
-                find_tick_directions(tick_0_list, f1, g1, side1, start, stop)
-
-            dx_units_0_2, dy_units_0_2, angles_0_2 = \
-                find_tick_directions(tick_0_list, f2, g2, side2, start, stop)
-
-            dx_units_1_1, dy_units_1_1, angles_1_1 = \
-                find_tick_directions(tick_1_list, f1, g1, side1, start, stop)
-
-            dx_units_1_2, dy_units_1_2, angles_1_2 = \
-                find_tick_directions(tick_1_list, f2, g2, side2, start, stop)
-            self._draw_ladder_lines_(dx_units_0_1, dy_units_0_1, dx_units_0_2, dy_units_0_2,
-                                     tick_0_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.solid)
-            self._draw_ladder_lines_(dx_units_1_1, dy_units_1_1, dx_units_1_2, dy_units_1_2,
-                                     tick_1_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.dotted)
-
-        # manual point or manual arrow
-        if self.atom_F1.params['scale_type'] == 'manual point' or \
-                self.atom_F1.params['scale_type'] == 'manual arrow':
-            tick_0_list = self.atom_F1.params['manual_axis_data'].keys()
-            tick_0_list.sort()
-
-            dx_units_0_1, dy_units_0_1, angles_0_1 = \
-                find_tick_directions(tick_0_list, f1, g1, side1, start, stop)
-
-            dx_units_0_2, dy_units_0_2, angles_0_2 = \
-                find_tick_directions(tick_0_list, f2, g2, side2, start, stop)
-
-            self._draw_ladder_lines_(dx_units_0_1, dy_units_0_1, dx_units_0_2, dy_units_0_2,
-                                     tick_0_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.solid)
-
-        # manual line
-        if self.atom_F1.params['scale_type'] == 'manual line':
-            tick_0_list = self.atom_F1.params['manual_axis_data'].keys()
-            tick_0_list.sort()
-
-            dx_units_0_1, dy_units_0_1, angles_0_1 = \
-                find_tick_directions(tick_0_list, f1, g1, side1, start, stop)
-
-            dx_units_0_2, dy_units_0_2, angles_0_2 = \
-                find_tick_directions(tick_0_list, f2, g2, side2, start, stop)
-
-            self._draw_ladder_lines_(dx_units_0_1, dy_units_0_1, dx_units_0_2, dy_units_0_2,
-                                     tick_0_list, f1, g1, f2, g2, canvas_given, pyx.style.linestyle.solid)
-
-    def _draw_ladder_lines_(self, dx_units_1, dy_units_1, dx_units_2, dy_units_2,
-                            tick_list, f1, g1, f2, g2, canvas, line_style):
-        """
-        draws the lines
-        """
-        line = pyx.path.path(pyx.path.moveto(
-            f1(tick_list[0]), g1(tick_list[0])))
-        curves = []
-        for idx, u in enumerate(tick_list):
-            # line.append(pyx.path.moveto(f1(u), g1(u)))
-            # line.append(pyx.path.lineto(f2(u), g2(u)))
-            pyx.path_length = np.sqrt(
-                (f1(u) - f2(u)) ** 2 + (g1(u) - g2(u)) ** 2)
-            factor = self.curve_const * pyx.path_length
-            x1, y1 = f1(u), g1(u)
-            x2, y2 = f1(u) - dy_units_1[idx] * \
-                     factor, g1(u) + dx_units_1[idx] * factor
-            x3, y3 = f2(u) - dy_units_2[idx] * \
-                     factor, g2(u) + dx_units_2[idx] * factor
-            x4, y4 = f2(u), g2(u)
-            curves.append(pyx.path.curve(x1, y1, x2, y2, x3, y3, x4, y4))
-        for curve in curves:
-            canvas.stroke(
-                curve, [pyx.style.linewidth.normal, line_style, self.ladder_color])
-        canvas.stroke(line, [pyx.style.linewidth.normal,
-                             line_style, self.ladder_color])
+        turn1 = _determine_turn_(f1, g1, start, stop, self.atom_F1.params['tick_side'],
+                                 turn_relative=self.atom_F1.params['turn_relative'])
+        turn2 = _determine_turn_(f2, g2, start, stop, self.atom_F2.params['tick_side'],
+                                 turn_relative=self.atom_F2.params['turn_relative'])
+        x1, y1 = evaluate_array(f1, tick_list), evaluate_array(g1, tick_list)
+        x4, y4 = evaluate_array(f2, tick_list), evaluate_array(g2, tick_list)
+        dx_units_1, dy_units_1, angles_1 = find_plan_directions(tick_list, f1, g1, turn1, start, stop)
+        dx_units_2, dy_units_2, angles_2 = find_plan_directions(tick_list, f2, g2, turn2, start, stop)
+        factor = self.curve_const * np.sqrt((x1 - x4) ** 2 + (y1 - y4) ** 2)
+        x2, y2 = x1 - dy_units_1 * factor, y1 + dx_units_1 * factor
+        x3, y3 = x4 - dy_units_2 * factor, y4 + dx_units_2 * factor
+        path_items = []
+        for idx in range(len(x1)):
+            path_items.append(pyx.path.moveto(x1[idx], y1[idx]))
+            path_items.append(pyx.path.curveto(x2[idx], y2[idx], x3[idx], y3[idx], x4[idx], y4[idx]))
+        return pyx.path.path(*path_items)
 
 
 class Nomo_Block_Type_7(Nomo_Block):
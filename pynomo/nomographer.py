@@ -31,8 +31,16 @@ from .nomo_wrapper import Nomo_Block_Type_9
 from .nomo_wrapper import Nomo_Block_Type_10
 from .nomo_axis import Nomo_Axis
 from .nomo_axis import find_linear_ticks
+from .label_index import Label_Index
+from .nomo_text import Text_Engine, Text_Store, Draft_Engine, Null_Engine, set_text_origin
+from .nomo_text import engine_signature, flush_texts
+from .stroke_batch import Stroke_Batch
+from .symbols import Symbol_Batch, circle_symbol
+from .display_list import Display_List
+from .layers import Layer_Cache, fingerprint, block_fingerprint
 from pprint import pprint
 
+import copy
 import pyx
 import numpy as np
 
@@ -215,24 +223,71 @@ class Nomographer:
             else:
                 wrapper.do_transformation(method=trafo[0])
         # transformations done
+        if params['label_collisions'] is not None:
+            self._set_label_index_(params, wrapper, blocks)
+        else:
+            self.label_index = None
         c = pyx.canvas.canvas()
+        if params['geometry_only']:
+            self.text_engine = Text_Engine(engine=Null_Engine())  # texts are not typeset
+        elif params['text_engine'] is not None:
+            self.text_engine = params['text_engine']  # reused engine
+        else:
+            self.text_engine = self._make_text_engine_(params)
+        c.settextengine(self.text_engine)
+        self.text_engine.reset_stats()
         if params['make_grid']:
+            set_text_origin(c, 'helper grid')
             self._make_grid_(params, c)
+        set_text_origin(c, 'other')
         if params['pre_func'] is not None:
             params['pre_func'](c)
         if params['draw_lines']:
             self._draw_lines_(params, c)
+        if params['geometry_only']:
+            self.layer_cache = None
+            fingerprints = {}
+        else:
+            self.layer_cache = params['layer_cache'] or Layer_Cache()  # reused layers
+            self.layer_cache.reset_stats()
+            fingerprints = self._layer_fingerprints_(params, wrapper, blocks, c)
         if params['draw_isopleths']:
             # draw isopleths
-            isopleths.draw(c)
+            set_text_origin(c, 'isopleths')
+            if self.layer_cache is None:
+                # own sub canvas, so that overlay_isopleths can replace it
+                layer = pyx.canvas.canvas()
+                layer.settextengine(c.textengine)
+                isopleths.draw(layer)
+                self.isopleth_layer = c.insert(layer)
+            else:
+                isopleths.solve()  # solutions are needed also when drawing is reused
+                self.isopleth_layer = self.layer_cache.insert(c, 'isopleths', fingerprints['isopleths'],
+                                                              isopleths.draw_solved)
         else:  # calculate points
+            self.isopleth_layer = None
             for block in blocks:
                 for atom in block.atom_stack:
                     # calculates lines (list of coordinates)
                     atom.calc_line_and_sections()
                     # pass
         # draw the nomogram
-        wrapper.draw_nomogram(c, params['post_func'])
+        wrapper.draw_nomogram(c, params['post_func'], write_files=not params['geometry_only'],
+                              layer_cache=self.layer_cache, fingerprints=fingerprints)
+        self.text_engine.save()  # texts are typeset now, update text store
+        if params['geometry_only']:
+            self.geometry = self._make_geometry_(params, blocks, isopleths, c)
+        else:
+            self.geometry = None
+        if params['display_list']:
+            self.display_list = Display_List().from_canvas(c)
+            if not params['display_list'] is True:
+                self.display_list.save(params['display_list'])
+        else:
+            self.display_list = None
+        if params['text_report']:
+            print("##### TEXTS #######")
+            print(self.text_report())
         self.blocks = blocks  # save for debugging
         for block in params['block_params']:
             if block['debug']:
@@ -243,6 +298,154 @@ class Nomographer:
             pprint(params)
         self.wrapper = wrapper
         self.canvas = c
+        self.params = params
+
+    def _layer_fingerprints_(self, params, wrapper, blocks, c):
+        """
+        fingerprints of layers: 'block 0', 'block 1', ..., 'isopleths', 'titles'
+        """
+        engine = c.textengine
+        if isinstance(engine, Text_Engine):
+            engine = engine.engine
+        signature = engine_signature(engine)
+        fingerprints = {}
+        for idx, block in enumerate(blocks):
+            fingerprints['block %i' % idx] = block_fingerprint(block, signature)
+        block_fingerprints = [fingerprints['block %i' % idx] for idx in range(len(blocks))]
+        if None in block_fingerprints:
+            fingerprints['isopleths'] = None
+        else:
+            fingerprints['isopleths'] = fingerprint(block_fingerprints,
+                                                    [block.ref_block_params.get('isopleth_values') for block in blocks],
+                                                    params['isopleth_params'], signature)
+        fingerprints['titles'] = wrapper.titles_fingerprint(signature)
+        return fingerprints
+
+    def text_report(self):
+        """
+        statistics of texts of this nomogram by origin (axis texts per level,
+        titles, grid texts, ...) with text cache hits and misses and times
+        """
+        return self.text_engine.report()
+
+    def give_output(self, output_format='pdf', file=None):
+        """
+        nomogram as bytes of output_format ('pdf', 'eps' or 'svg') without
+        files. If file (binary file-like object) is given, output is written to it.
+        Use filename None in main params to write no files when nomogram is made.
+        """
+        return self.wrapper.write_output(self.canvas, file, output_format)
+
+    def overlay_isopleths(self, isopleth_values, file=None, output_format='pdf', isopleth_params=None):
+        """
+        draws new isopleths over finished nomogram. Blocks, texts and other
+        layers are reused as they are, only isopleths are solved and drawn.
+        Isopleths of nomogram (if any) are replaced by new ones.
+        isopleth_values: list of 'isopleth_values' of each block (same order as block_params)
+        isopleth_params: main param 'isopleth_params', None = same as nomogram
+        Returns output as bytes (or None if written to file), see give_output.
+        New canvas is self.overlay_canvas and solutions self.overlay_solutions.
+        """
+        if isopleth_params is None:
+            isopleth_params = self.params['isopleth_params']
+        isopleths = Isopleth_Wrapper({'isopleth_params': isopleth_params})
+        for block, values in zip(self.blocks, isopleth_values):
+            block_para = dict(block.ref_block_params)
+            block_para['isopleth_values'] = copy.deepcopy(values)  # solving fills in values
+            isopleths.add_isopleth_block(block, block_para)
+        layer = pyx.canvas.canvas()
+        layer.settextengine(self.canvas.textengine)
+        set_text_origin(layer, 'isopleths')
+        isopleths.draw_overlay(layer)
+        c = pyx.canvas.canvas()
+        c.settextengine(self.canvas.textengine)
+        for item in self.canvas.items:
+            if item is self.isopleth_layer:
+                c.insert(layer)
+            else:
+                c.insert(item)
+        if self.isopleth_layer is None:  # nomogram had no isopleths, draw on top
+            c.insert(layer)
+        flush_texts(c)
+        self.overlay_canvas = c
+        self.overlay_solutions = isopleths.solutions
+        return self.wrapper.write_output(c, file, output_format)
+
+    def give_geometry(self):
+        """
+        resolved geometry of nomogram made with main param 'geometry_only'
+        """
+        return self.geometry
+
+    def _make_geometry_(self, params, blocks, isopleths, c):
+        """
+        geometry of nomogram as dict of lists and numbers (cm):
+        {'bbox': [llx,lly,urx,ury],
+         'blocks': [{'block_type':..., 'axes': [{'tag':..., 'title':...,
+                     'u_min':..., 'u_max':..., 'line': [(x,y),...],
+                     'tick_plan': structured array or None}, ...]}, ...],
+         'isopleths': [{'block_type':..., 'isopleth_values': [...],
+                        'draw_coordinates': [[x1,y1,x2,y2,x3,y3],...]}, ...],
+         'solutions': [{tag: value,...}, ...]}
+        """
+        bbox = c.bbox()
+        geometry = {'paper_width': params['paper_width'],
+                    'paper_height': params['paper_height'],
+                    'bbox': [pyx.unit.tocm(bbox.left()), pyx.unit.tocm(bbox.bottom()),
+                             pyx.unit.tocm(bbox.right()), pyx.unit.tocm(bbox.top())],
+                    'blocks': [],
+                    'isopleths': [],
+                    'solutions': isopleths.solutions}
+        for block in blocks:
+            axes = []
+            for atom in block.atom_stack:
+                if not hasattr(atom, 'line'):
+                    atom.calc_line_and_sections()
+                nomo_axis = getattr(atom, 'nomo_axis_ref', None)
+                axes.append({'tag': atom.params.get('tag', 'none'),
+                             'title': atom.params.get('title', ''),
+                             'u_min': atom.params.get('u_min'),
+                             'u_max': atom.params.get('u_max'),
+                             'line': getattr(atom, 'line', []),
+                             'tick_plan': getattr(nomo_axis, 'tick_plan', None)})
+            geometry['blocks'].append({'block_type': block.ref_block_params['block_type'],
+                                       'axes': axes})
+        for isopleth in isopleths.isopleth_list:
+            geometry['isopleths'].append({'block_type': isopleth.params['block_type'],
+                                          'isopleth_values': isopleth.isopleth_values,
+                                          'draw_coordinates': isopleth.draw_coordinates})
+        return geometry
+
+    def _make_text_engine_(self, params):
+        """
+        text engine of canvas according to main params
+        """
+        if params['text_store'] is not None:
+            text_store = Text_Store(params['text_store'])
+        else:
+            text_store = None
+        if params['text_backend'] == 'draft':
+            base_engine = Draft_Engine()
+        else:
+            base_engine = None  # pyx.text.defaulttextengine
+        return Text_Engine(engine=base_engine, cache=params['text_cache'], store=text_store,
+                           deferred=params['text_deferred'], workers=params['text_workers'])
+
+    def _set_label_index_(self, params, wrapper, blocks):
+        """
+        shares one label index between all axes, grids, titles and extra texts
+        so that colliding texts are dropped or shifted ('label_collisions':
+        'drop' or 'shift'). Titles are always drawn.
+        """
+        self.label_index = Label_Index(mode=params['label_collisions'],
+                                       padding=params['label_collision_padding'])
+        wrapper.params['label_index'] = self.label_index
+        for block in blocks:
+            block.label_index = self.label_index
+            for atom in block.atom_stack:
+                atom.params['label_index'] = self.label_index
+                for extra_params in atom.params['extra_params']:
+                    extra_params['label_index'] = self.label_index
 
     def _make_grid_(self, params, c):
         """
@@ -288,24 +491,18 @@ class Nomographer:
         grid_color_0 = pyx.color.cmyk.Brown
         grid_color_1 = pyx.color.cmyk.Gray
         grid_color_2 = pyx.color.cmyk.Tan
-        for tick in tick_0_list_v:
-            c.stroke(pyx.path.line(-axis_offset, tick, params['paper_width'] + axis_offset, tick),
-                     [grid_color_0, pyx.style.linewidth.THin])
-        for tick in tick_1_list_v:
-            c.stroke(pyx.path.line(-axis_offset, tick, params['paper_width'] + axis_offset, tick),
-                     [grid_color_1, pyx.style.linewidth.THIN])
-        for tick in tick_2_list_v:
-            c.stroke(pyx.path.line(-axis_offset, tick, params['paper_width'] + axis_offset, tick),
-                     [grid_color_2, pyx.style.linewidth.THIN])
-        for tick in tick_0_list_h:
-            c.stroke(pyx.path.line(tick, -axis_offset, tick, params['paper_height'] + axis_offset),
-                     [grid_color_0, pyx.style.linewidth.THin])
-        for tick in tick_1_list_h:
-            c.stroke(pyx.path.line(tick, -axis_offset, tick, params['paper_height'] + axis_offset),
-                     [grid_color_1, pyx.style.linewidth.THIN])
-        for tick in tick_2_list_h:
-            c.stroke(pyx.path.line(tick, -axis_offset, tick, params['paper_height'] + axis_offset),
-                     [grid_color_2, pyx.style.linewidth.THIN])
+        grid_lines = Stroke_Batch()
+        for tick_list, grid_style in [(tick_0_list_v, [grid_color_0, pyx.style.linewidth.THin]),
+                                      (tick_1_list_v, [grid_color_1, pyx.style.linewidth.THIN]),
+                                      (tick_2_list_v, [grid_color_2, pyx.style.linewidth.THIN])]:
+            for tick in tick_list:
+                grid_lines.line(-axis_offset, tick, params['paper_width'] + axis_offset, tick, grid_style)
+        for tick_list, grid_style in [(tick_0_list_h, [grid_color_0, pyx.style.linewidth.THin]),
+                                      (tick_1_list_h, [grid_color_1, pyx.style.linewidth.THIN]),
+                                      (tick_2_list_h, [grid_color_2, pyx.style.linewidth.THIN])]:
+            for tick in tick_list:
+                grid_lines.line(tick, -axis_offset, tick, params['paper_height'] + axis_offset, grid_style)
+        grid_lines.stroke(c)
 
     def _draw_lines_(self, params, c):
         """
@@ -328,13 +525,13 @@ class Nomographer:
             else:
                 circle_color = self.line_defs_default['circle_color']
             # do lines and circles
+            markers = Symbol_Batch()
             for line in line_defs['coords']:
                 c.stroke(pyx.path.line(
                     line[0], line[1], line[2], line[3]), line_style)
-                c.fill(pyx.path.circle(
-                    line[0], line[1], circle_size), [circle_color])
-                c.fill(pyx.path.circle(
-                    line[2], line[3], circle_size), [circle_color])
+                markers.add(circle_symbol(circle_size, None, circle_color), line[0], line[1])
+                markers.add(circle_symbol(circle_size, None, circle_color), line[2], line[3])
+            markers.insert(c)
 
     def _check_params_(self, params):
         """
@@ -348,7 +545,7 @@ class Nomographer:
                                   'circle_color': pyx.color.cmyk.Black,
                                   }
         params_default = {
-            'filename': 'pynomo_default.pdf',
+            'filename': 'pynomo_default.pdf',  # name, list of names, file-like object or None
             'paper_height': 20.0,
             'paper_width': 20.0,
             # 'block_params':[test1_block1_params,test1_block2_params],
@@ -361,6 +558,23 @@ class Nomographer:
             'post_func': None,  # function(pyx.canvas) to draw last
             'debug': False,
             'draw_isopleths': True,  # draws isopleths
+            'label_collisions': None,  # None, 'drop' or 'shift' colliding texts (titles are kept)
+            'label_collision_padding': 0.02,  # minimum gap between texts (cm)
+            'text_engine': None,  # Text_Engine to reuse, overrides text_* params below
+            'text_backend': 'tex',  # 'tex' or 'draft' (no TeX, built-in metrics)
+            'text_cache': True,  # typeset each unique text only once
+            'text_store': None,  # file name of on-disk store of typeset texts
+            'text_deferred': False,  # typeset all new texts in one TeX run before output
+            'text_workers': 1,  # parallel TeX processes for deferred texts
+            'text_report': False,  # print statistics of texts, see text_report()
+            'geometry_only': False,  # no texts, no files, only self.geometry, see give_geometry()
+            'display_list': False,  # True or file name (.json or .npz) to make self.display_list
+            'svg_writer': 'pyx',  # 'pyx' or 'stream' (compact SVG written from display list)
+            'output_format': None,  # 'pdf', 'eps' or 'svg' if filename is file-like object
+            'write_workers': 1,  # threads writing files concurrently if filename is a list
+            'layer_cache': None,  # Layer_Cache of earlier nomogram, unchanged layers are reused
+            'tiles': None,  # dict of Tiling args (width, height, overlap, margin, marks, labels) for poster tiles
+            'quantize': None,  # resolution in cm (e.g. 0.001) to round and compact paths before output
             'isopleth_params': [{'color': 'Black',
                                  'linestyle': 'Dashed',
                                  'lineweight': 'thick',
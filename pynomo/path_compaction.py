@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Compaction of paths before output. Coordinates are rounded to a grid of
+given resolution, zero length segments are dropped and runs of nearly
+collinear line segments are merged to single segments. Every removed
+point stays within half resolution of the merged segment.
+"""
+
+import copy
+import math
+import pyx
+
+from .display_list import is_finite_path
+
+
+def compact_canvas(c, resolution=0.001):
+    """
+    copy of canvas c with all stroked and filled paths compacted, c is not
+    changed. resolution: grid in cm (0.001 = 0.01 mm)
+    Copy is kept in c (attribute compacted) and reused when c or its sub
+    canvas (for example a cached layer) is compacted again, so paths are
+    compacted only once. Canvas must not be changed after compaction.
+    """
+    compacted = getattr(c, 'compacted', None)
+    if compacted is not None and compacted[0] == resolution:
+        return compacted[1]
+    resolution_pt = pyx.unit.topt(resolution)
+    items = []
+    for item in c.items:
+        if isinstance(item, pyx.canvas.canvas):
+            item = compact_canvas(item, resolution)
+        elif isinstance(item, pyx.deco.decoratedpath) and not item.nostrokeranges:
+            item = copy.copy(item)
+            item.path = compact_path(item.path, resolution_pt)[0]
+        items.append(item)
+    copied = copy.copy(c)
+    copied.items = items
+    c.compacted = (resolution, copied)  # copy has it too, compacting copy gives copy
+    return copied
+
+
+def compact_path(path, resolution_pt):
+    """
+    compacted copy of path, returns (path, segments before, segments after).
+    Path with non-finite coordinates (nan from log of negative value etc.)
+    is returned unchanged.
+    """
+    if not is_finite_path(path):
+        return path, 0, 0
+    grid = resolution_pt
+    compacted = pyx.path.path()
+    before, after = 0, 0
+    for normsubpath in path.normpath().normsubpaths:
+        items = normsubpath.normsubpathitems
+        before += len(items)
+        if not items:
+            continue
+        x0, y0 = _round_(items[0].x0_pt, grid), _round_(items[0].y0_pt, grid)
+        subpath = [pyx.path.moveto_pt(x0, y0)]
+        line_points = [(x0, y0)]  # points of current run of lines
+        for item in items:
+            if isinstance(item, pyx.normpath.normcurve_pt):
+                subpath.extend(pyx.path.lineto_pt(x, y) for x, y in _merge_lines_(line_points, grid)[1:])
+                x_end, y_end = line_points[-1]
+                points = [_round_(value, grid) for value in
+                          [item.x1_pt, item.y1_pt, item.x2_pt, item.y2_pt, item.x3_pt, item.y3_pt]]
+                if points != [x_end, y_end] * 3:  # not a point
+                    subpath.append(pyx.path.curveto_pt(*points))
+                    x_end, y_end = points[4], points[5]
+                line_points = [(x_end, y_end)]
+            else:
+                point = _round_(item.x1_pt, grid), _round_(item.y1_pt, grid)
+                if point != line_points[-1]:  # zero length lines are dropped
+                    line_points.append(point)
+        subpath.extend(pyx.path.lineto_pt(x, y) for x, y in _merge_lines_(line_points, grid)[1:])
+        if normsubpath.closed:
+            subpath.append(pyx.path.closepath())
+        if len(subpath) > 1:
+            compacted.extend(subpath)
+            after += len(subpath) - 1
+    return compacted, before, after
+
+
+def _merge_lines_(points, grid):
+    """
+    points of polyline with nearly collinear runs merged. Run from anchor
+    is continued while there is a direction from anchor that passes all
+    points of run within grid/2 (intersection of angle intervals).
+    """
+    if len(points) < 3:
+        return points
+    tolerance = grid / 2.0
+    merged = [points[0]]
+    anchor = points[0]
+    last = points[1]
+    low, high, reference, last_distance = _start_run_(anchor, last, tolerance)
+    for point in points[2:]:
+        dx, dy = point[0] - anchor[0], point[1] - anchor[1]
+        distance = math.hypot(dx, dy)
+        angle = _angle_difference_(math.atan2(dy, dx), reference)
+        if distance >= last_distance and low <= angle <= high:
+            delta = math.asin(min(1.0, tolerance / distance))
+            low, high = max(low, angle - delta), min(high, angle + delta)
+            last, last_distance = point, distance
+        else:
+            merged.append(last)
+            anchor = last
+            low, high, reference, last_distance = _start_run_(anchor, point, tolerance)
+            last = point
+    merged.append(last)
+    return merged
+
+
+def _start_run_(anchor, point, tolerance):
+    """
+    angle interval (relative to direction anchor->point), direction and distance of new run
+    """
+    dx, dy = point[0] - anchor[0], point[1] - anchor[1]
+    distance = math.hypot(dx, dy)
+    delta = math.asin(min(1.0, tolerance / distance))
+    return -delta, delta, math.atan2(dy, dx), distance
+
+
+def _angle_difference_(angle, reference):
+    """
+    angle - reference in range -pi...pi
+    """
+    return (angle - reference + math.pi) % (2.0 * math.pi) - math.pi
+
+
+def _round_(value, grid):
+    """
+    value rounded to grid
+    """
+    return round(value / grid) * grid
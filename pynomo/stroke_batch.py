@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pyx
+from collections import OrderedDict
+
+
+class Stroke_Batch(object):
+    """
+    Collects lines to be stroked and groups them by stroke style (color,
+    linewidth, dash, ...). Each style is stroked once as one path with many
+    subpaths, so output has one path object per style instead of one
+    per tick or guide line. Styles are stroked in order of first use.
+
+        batch = Stroke_Batch()
+        for ...:
+            batch.line(x1, y1, x2, y2, [pyx.style.linewidth.thin, color])
+        batch.stroke(c)
+    """
+
+    def __init__(self):
+        self.paths = OrderedDict()  # style key -> (pyx.path.path, attrs)
+
+    def line(self, x1, y1, x2, y2, attrs=[]):
+        """
+        adds line from (x1,y1) to (x2,y2) with stroke attributes attrs
+        """
+        path = self._path_(attrs)
+        path.append(pyx.path.moveto(x1, y1))
+        path.append(pyx.path.lineto(x2, y2))
+
+    def lines(self, x1, y1, x2, y2, attrs=[]):
+        """
+        adds lines from coordinate lists (or arrays) x1, y1, x2, y2
+        """
+        path = self._path_(attrs)
+        for idx in range(len(x1)):
+            path.append(pyx.path.moveto(x1[idx], y1[idx]))
+            path.append(pyx.path.lineto(x2[idx], y2[idx]))
+
+    def path(self, path, attrs=[]):
+        """
+        adds subpaths of path
+        """
+        self._path_(attrs).extend(path.pathitems)
+
+    def stroke(self, c):
+        """
+        strokes collected lines to canvas c and empties batch
+        """
+        for path, attrs in self.paths.values():
+            if len(path) > 0:
+                c.stroke(path, attrs)
+        self.paths = OrderedDict()
+
+    def _path_(self, attrs):
+        """
+        path of lines having style attrs
+        """
+        key = style_key(attrs)
+        if key not in self.paths:
+            self.paths[key] = (pyx.path.path(), list(attrs))
+        return self.paths[key][0]
+
+
+def style_key(attrs):
+    """
+    hashable key of list of pyx stroke attributes. Equal styles made
+    as different objects, for example pyx.style.linewidth(0.01) twice,
+    give same key.
+    """
+    return tuple(_attr_key_(attr) for attr in attrs)
+
+
+def _attr_key_(attr):
+    """
+    hashable key of single attribute (or its member)
+    """
+    if isinstance(attr, pyx.unit.length):
+        return pyx.unit.topt(attr)
+    if attr is None or isinstance(attr, (bool, int, float, str)):
+        return attr
+    if isinstance(attr, (list, tuple)):
+        return tuple(_attr_key_(item) for item in attr)
+    if isinstance(attr, type):
+        return attr.__name__
+    if hasattr(attr, '__dict__'):
+        return (attr.__class__.__name__,) + \
+               tuple((name, _attr_key_(value)) for name, value in sorted(vars(attr).items()))
+    return id(attr)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+SVG writer for display lists. Paths are written directly to the output
+stream as compact path data, consecutive items of same style share one
+<g> element. No pyx objects are made.
+"""
+
+import io
+import math
+from .display_list import is_line, color_to_rgb
+
+LINECAPS = ['butt', 'round', 'square']
+LINEJOINS = ['miter', 'round', 'bevel']
+
+
+def write_svg(display_list, file, precision=2, bboxenlarge=1.0):
+    """
+    writes display list as SVG to file (file name, text or binary stream).
+    precision: number of decimals of coordinates (pt)
+    bboxenlarge: margin around drawing in pt as in pyx
+    """
+    if isinstance(file, str):
+        with open(file, 'w') as f:
+            write_svg(display_list, f, precision, bboxenlarge)
+        return
+    try:
+        file.write('')
+    except TypeError:  # binary stream
+        text_file = io.TextIOWrapper(file, encoding='utf-8')
+        write_svg(display_list, text_file, precision, bboxenlarge)
+        text_file.detach()  # flushes, file is left open
+        return
+    number_format = '%%.%if' % precision
+    llx, lly, urx, ury = drawing_bbox(display_list)
+    llx, lly, urx, ury = llx - bboxenlarge, lly - bboxenlarge, urx + bboxenlarge, ury + bboxenlarge
+    file.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    file.write('<svg xmlns="http://www.w3.org/2000/svg" version="1.1" fill="none" stroke-miterlimit="10" '
+               'viewBox="%g %g %g %g" width="%gpt" height="%gpt">\n'
+               % (llx, -ury, urx - llx, ury - lly, urx - llx, ury - lly))
+    current_style = None
+    for kind, first_subpath, n_subpaths, style_idx in display_list.items:
+        if style_idx != current_style:
+            if current_style is not None:
+                file.write('</g>\n')
+            file.write('<g %s>\n' % style_attributes(display_list.styles[style_idx]))
+            current_style = style_idx
+        file.write('<path d="')
+        for first_segment, n_segments, closed in display_list.subpaths[first_subpath:first_subpath + n_subpaths]:
+            file.write(path_data(display_list.segments[first_segment:first_segment + n_segments],
+                                 closed, number_format))
+        file.write('"/>\n')
+    if current_style is not None:
+        file.write('</g>\n')
+    file.write('</svg>\n')
+
+
+def drawing_bbox(display_list):
+    """
+    bbox [llx, lly, urx, ury] (pt) of display list. If bbox of canvas is not
+    finite (pyx gives nan bbox for canvas having paths with nan), bbox of
+    written segments and texts is used instead.
+    """
+    if all(math.isfinite(value) for value in display_list.bbox):
+        return list(display_list.bbox)
+    xs, ys = [], []
+    for segment in display_list.segments:
+        xs.extend(segment[0::2])
+        ys.extend(segment[1::2])
+    for text in display_list.texts:
+        xs.extend([text[1], text[3]])
+        ys.extend([text[2], text[4]])
+    if len(xs) == 0:
+        return [0.0, 0.0, 0.0, 0.0]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def path_data(segments, closed, number_format):
+    """
+    SVG path data of one subpath (y axis is turned as in SVG)
+    """
+    if len(segments) == 0:  # single point draws nothing
+        return ''
+    def num(value):
+        text = number_format % value
+        if '.' in text:
+            text = text.rstrip('0').rstrip('.')
+        return '0' if text == '-0' else text
+
+    parts = ['M%s %s' % (num(segments[0][0]), num(-segments[0][1]))]
+    for segment in segments:
+        if is_line(segment):
+            parts.append('L%s %s' % (num(segment[6]), num(-segment[7])))
+        else:
+            parts.append('C%s %s %s %s %s %s' % (num(segment[2]), num(-segment[3]), num(segment[4]),
+                                                 num(-segment[5]), num(segment[6]), num(-segment[7])))
+    if closed:
+        parts.append('Z')
+    return ''.join(parts)
+
+
+def style_attributes(style):
+    """
+    SVG attributes of display list style as string
+    """
+    if 'stroke' in style:
+        attributes = ['stroke="%s"' % hex_color(style['stroke']),
+                      'stroke-width="%g"' % style['linewidth']]
+        if style['dash']:
+            attributes.append('stroke-dasharray="%s"' % ' '.join('%g' % length for length in style['dash']))
+            if style['dash_offset']:
+                attributes.append('stroke-dashoffset="%g"' % style['dash_offset'])
+        if style['linecap'] != 0:
+            attributes.append('stroke-linecap="%s"' % LINECAPS[style['linecap']])
+        if style['linejoin'] != 0:
+            attributes.append('stroke-linejoin="%s"' % LINEJOINS[style['linejoin']])
+        if style['miterlimit'] != 10.0:
+            attributes.append('stroke-miterlimit="%g"' % style['miterlimit'])
+        if style['opacity'] != 1.0:
+            attributes.append('stroke-opacity="%g"' % style['opacity'])
+    else:
+        attributes = ['fill="%s"' % hex_color(style['fill'])]
+        if style['opacity'] != 1.0:
+            attributes.append('fill-opacity="%g"' % style['opacity'])
+    return ' '.join(attributes)
+
+
+def hex_color(color_list):
+    """
+    #rrggbb of display list color
+    """
+    return '#%02x%02x%02x' % tuple(int(round(255 * min(max(value, 0.0), 1.0)))
+                                   for value in color_to_rgb(color_list))
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import zlib
+from collections import OrderedDict
+import pyx
+from pyx import pdfwriter, pswriter, svgwriter
+from .stroke_batch import style_key
+
+
+class Symbol(object):
+    """
+    Marker (or any small drawing) that is defined once in output file and
+    placed by reference: as procedure in EPS prolog, as form XObject in PDF
+    and as <use> of element in <defs> in SVG. Output size and writing time
+    do not grow with the drawing for each placed copy.
+
+    drawing: pyx canvas with the marker drawn around origin (0,0)
+    """
+
+    count = 0  # for unique names
+
+    def __init__(self, drawing):
+        Symbol.count += 1
+        self.id = 'PyNomoSymbol%i' % Symbol.count
+        # marker starts from default graphics state, whatever is set where it is placed
+        self.drawing = pyx.canvas.canvas([pyx.style.linewidth.normal])
+        self.drawing.insert(drawing)
+        self.drawing_bbox = self.drawing.bbox()
+
+
+class Symbol_Instances(pyx.baseclasses.canvasitem):
+    """
+    canvas item placing copies of symbol to points [(x,y),...] (cm)
+    """
+
+    def __init__(self, symbol, points):
+        self.symbol = symbol
+        self.points_pt = [(pyx.unit.topt(x), pyx.unit.topt(y)) for x, y in points]
+
+    def bbox(self):
+        result = pyx.bbox.empty()
+        for x_pt, y_pt in self.points_pt:
+            result += self.symbol.drawing_bbox.transformed(pyx.trafo.translate_pt(x_pt, y_pt))
+        return result
+
+    def processPS(self, file, writer, context, registry, bbox):
+        body = pyx.writer.writer(io.BytesIO())
+        body.write("{\n")
+        self.symbol.drawing.processPS(body, writer, pswriter.context(), registry, pyx.bbox.empty())
+        body.write("}")
+        registry.add(pswriter.PSdefinition(self.symbol.id, body.file.getvalue()))
+        for x_pt, y_pt in self.points_pt:
+            file.write("gsave %f %f translate %s grestore\n" % (x_pt, y_pt, self.symbol.id))
+        bbox += self.bbox()
+
+    def processPDF(self, file, writer, context, registry, bbox):
+        form = PDF_Symbol(self.symbol, writer)
+        registry.add(form)
+        registry.mergeregistry(form.registry)
+        registry.addresource("XObject", self.symbol.id, form)
+        for x_pt, y_pt in self.points_pt:
+            file.write("q 1 0 0 1 %f %f cm /%s Do Q\n" % (x_pt, y_pt, self.symbol.id))
+        bbox += self.bbox()
+
+    def processSVG(self, xml, writer, context, registry, bbox):
+        registry.add(SVG_Symbol(self.symbol))
+        for x_pt, y_pt in self.points_pt:
+            xml.startSVGElement("use", {"xlink:href": "#%s" % self.symbol.id,
+                                        "x": "%f" % x_pt, "y": "%f" % -y_pt})
+            xml.endSVGElement("use")
+        bbox += self.bbox()
+
+
+class PDF_Symbol(pdfwriter.PDFobject):
+    """
+    symbol as PDF form XObject
+    """
+
+    def __init__(self, symbol, writer):
+        pdfwriter.PDFobject.__init__(self, "symbol", symbol.id)
+        self.registry = pdfwriter.PDFregistry()  # resources of form
+        content = pyx.writer.writer(io.BytesIO())
+        symbol.drawing.processPDF(content, writer, pdfwriter.context(), self.registry, pyx.bbox.empty())
+        self.content = content.file.getvalue()
+        self.bbox_pt = symbol.drawing_bbox.highrestuple_pt()
+
+    def write(self, file, writer, registry):
+        if writer.compress:
+            content = zlib.compress(self.content)
+        else:
+            content = self.content
+        file.write("<<\n"
+                   "/Type /XObject\n"
+                   "/Subtype /Form\n")
+        file.write("/BBox [%f %f %f %f]\n" % self.bbox_pt)
+        file.write("/Resources ")
+        self.registry.writeresources(file)
+        file.write("/Length %i\n" % len(content))
+        if writer.compress:
+            file.write("/Filter /FlateDecode\n")
+        file.write(">>\n"
+                   "stream\n")
+        file.write_bytes(content)
+        file.write("\n"
+                   "endstream\n")
+
+
+class SVG_Symbol(svgwriter.SVGresource):
+    """
+    symbol as SVG element in <defs>
+    """
+
+    def __init__(self, symbol):
+        svgwriter.SVGresource.__init__(self, "symbol", symbol.id)
+        self.symbol = symbol
+
+    def output(self, xml, writer, registry):
+        attrs = {"id": self.symbol.id, "fill": "none"}
+        xml.startSVGElement("g", attrs)
+        self.symbol.drawing.processSVG(xml, writer, svgwriter.context(), registry, pyx.bbox.empty())
+        xml.endSVGElement("g")
+
+
+class Symbol_Batch(object):
+    """
+    Collects places of symbols and inserts one Symbol_Instances item
+    per symbol to canvas. Symbols are inserted in order of first use.
+    """
+
+    def __init__(self):
+        self.points = OrderedDict()  # symbol id -> (symbol, [(x,y),...])
+
+    def add(self, symbol, x, y):
+        """
+        adds copy of symbol to (x,y)
+        """
+        self.points.setdefault(symbol.id, (symbol, []))[1].append((x, y))
+
+    def insert(self, c):
+        """
+        inserts collected symbols to canvas c and empties batch
+        """
+        for symbol, points in self.points.values():
+            c.insert(Symbol_Instances(symbol, points))
+        self.points = OrderedDict()
+
+
+circle_symbols = {}  # same circle markers are shared
+
+
+def circle_symbol(radius, stroke_color=pyx.color.cmyk.Black, fill_color=pyx.color.rgb.white):
+    """
+    circle marker of radius (cm) filled with fill_color and stroked with
+    stroke_color. Either color can be None (not filled or not stroked).
+    """
+    key = (radius, style_key([stroke_color]), style_key([fill_color]))
+    if key not in circle_symbols:
+        drawing = pyx.canvas.canvas()
+        if fill_color is not None:
+            drawing.fill(pyx.path.circle(0, 0, radius), [fill_color])
+        if stroke_color is not None:
+            drawing.stroke(pyx.path.circle(0, 0, radius), [stroke_color])
+        circle_symbols[key] = Symbol(drawing)
+    return circle_symbols[key]
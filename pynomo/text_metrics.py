@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Built-in font metrics (Computer Modern Roman, units of em) and simple
+stroke glyphs to handle texts without TeX.
+"""
+
+import math
+import re
+import numpy
+import pyx
+
+# LaTeX font sizes (article class, 10pt) in TeX pt
+FONT_SIZES = {'tiny': 5.0, 'scriptsize': 7.0, 'footnotesize': 8.0, 'small': 9.0,
+              'normalsize': 10.0, 'large': 12.0, 'Large': 14.4, 'LARGE': 17.28,
+              'huge': 20.74, 'Huge': 24.88}
+
+BASELINE_SKIP = 1.2  # line distance in em
+
+# character advance widths in em
+CHAR_WIDTHS = {
+    '0': 0.5, '1': 0.5, '2': 0.5, '3': 0.5, '4': 0.5,
+    '5': 0.5, '6': 0.5, '7': 0.5, '8': 0.5, '9': 0.5,
+    '.': 0.278, ',': 0.278, ':': 0.278, ';': 0.278, '!': 0.278, '?': 0.472,
+    '-': 0.778, '+': 0.778, '=': 0.778, '<': 0.778, '>': 0.778,
+    u'\u00b7': 0.278, u'\u00d7': 0.778, u'\u00b1': 0.778, u'\u00b0': 0.5,
+    ' ': 0.333, '(': 0.389, ')': 0.389, '[': 0.278, ']': 0.278,
+    '/': 0.5, '%': 0.833, '*': 0.5, "'": 0.278, '|': 0.278,
+    'a': 0.5, 'b': 0.556, 'c': 0.444, 'd': 0.556, 'e': 0.444, 'f': 0.306,
+    'g': 0.5, 'h': 0.556, 'i': 0.278, 'j': 0.306, 'k': 0.528, 'l': 0.278,
+    'm': 0.833, 'n': 0.556, 'o': 0.5, 'p': 0.556, 'q': 0.528, 'r': 0.392,
+    's': 0.394, 't': 0.389, 'u': 0.556, 'v': 0.528, 'w': 0.722, 'x': 0.528,
+    'y': 0.528, 'z': 0.444,
+    'A': 0.75, 'B': 0.708, 'C': 0.722, 'D': 0.764, 'E': 0.681, 'F': 0.653,
+    'G': 0.785, 'H': 0.75, 'I': 0.361, 'J': 0.514, 'K': 0.778, 'L': 0.625,
+    'M': 0.917, 'N': 0.75, 'O': 0.778, 'P': 0.681, 'Q': 0.778, 'R': 0.736,
+    'S': 0.556, 'T': 0.722, 'U': 0.75, 'V': 0.75, 'W': 1.028, 'X': 0.75,
+    'Y': 0.75, 'Z': 0.611,
+}
+DEFAULT_CHAR_WIDTH = 0.5
+
+# character heights and depths in em
+DIGIT_HEIGHT = 0.644
+CAP_HEIGHT = 0.683
+X_HEIGHT = 0.431
+ASCENDER_HEIGHT = 0.694
+DESCENDER_DEPTH = 0.194
+CHAR_HEIGHTS = {'(': 0.75, ')': 0.75, '[': 0.75, ']': 0.75, '/': 0.75, '|': 0.75,
+                '.': 0.106, ',': 0.106, '-': 0.583, '+': 0.583, '=': 0.367,
+                u'\u00b7': 0.31, u'\u00d7': 0.49, u'\u00b1': 0.583, u'\u00b0': 0.694,
+                ' ': 0.0, "'": 0.694, '*': 0.75, '%': 0.75}
+CHAR_DEPTHS = {'(': 0.25, ')': 0.25, '[': 0.25, ']': 0.25, '/': 0.25, '|': 0.25,
+               ',': 0.194, ';': 0.194, '-': 0.083, '+': 0.083, u'\u00b1': 0.083,
+               'g': DESCENDER_DEPTH, 'j': DESCENDER_DEPTH, 'p': DESCENDER_DEPTH,
+               'q': DESCENDER_DEPTH, 'y': DESCENDER_DEPTH, 'Q': DESCENDER_DEPTH}
+
+# TeX commands that are shown as a character
+TEX_SYMBOLS = {'cdot': u'\u00b7', 'times': u'\u00d7', 'pm': u'\u00b1', 'circ': u'\u00b0',
+               'degree': u'\u00b0', 'textdegree': u'\u00b0', '%': '%', ',': ' ',
+               ';': ' ', 'quad': '  ', 'qquad': '    ', ' ': ' ', '$': '$', '&': '&',
+               '{': '(', '}': ')', 'lbrace': '(', 'rbrace': ')'}
+
+# TeX commands whose argument is dropped (the command gives no text)
+TEX_DROP_ARGUMENT = ('hspace', 'vspace', 'color', 'textcolor', 'rule', 'raisebox', 'kern')
+
+# stroke glyphs: list of polylines, points (x,y) in units of glyph box
+# (x: 0...1 of advance width, y: 0...1 of cap height)
+GLYPH_STROKES = {
+    '0': [[(0.15, 0.0), (0.85, 0.0), (0.85, 1.0), (0.15, 1.0), (0.15, 0.0)]],
+    '1': [[(0.3, 0.8), (0.55, 1.0), (0.55, 0.0)], [(0.3, 0.0), (0.8, 0.0)]],
+    '2': [[(0.15, 1.0), (0.85, 1.0), (0.85, 0.5), (0.15, 0.5), (0.15, 0.0), (0.85, 0.0)]],
+    '3': [[(0.15, 1.0), (0.85, 1.0), (0.85, 0.0), (0.15, 0.0)], [(0.35, 0.5), (0.85, 0.5)]],
+    '4': [[(0.15, 1.0), (0.15, 0.45), (0.85, 0.45)], [(0.7, 0.75), (0.7, 0.0)]],
+    '5': [[(0.85, 1.0), (0.15, 1.0), (0.15, 0.55), (0.85, 0.55), (0.85, 0.0), (0.15, 0.0)]],
+    '6': [[(0.85, 1.0), (0.15, 1.0), (0.15, 0.0), (0.85, 0.0), (0.85, 0.5), (0.15, 0.5)]],
+    '7': [[(0.15, 1.0), (0.85, 1.0), (0.4, 0.0)]],
+    '8': [[(0.15, 0.0), (0.85, 0.0), (0.85, 1.0), (0.15, 1.0), (0.15, 0.0)],
+          [(0.15, 0.5), (0.85, 0.5)]],
+    '9': [[(0.85, 0.5), (0.15, 0.5), (0.15, 1.0), (0.85, 1.0), (0.85, 0.0), (0.15, 0.0)]],
+    '.': [[(0.4, 0.0), (0.6, 0.0), (0.6, 0.12), (0.4, 0.12), (0.4, 0.0)]],
+    ',': [[(0.55, 0.12), (0.4, -0.2)]],
+    ':': [[(0.5, 0.0), (0.5, 0.1)], [(0.5, 0.55), (0.5, 0.65)]],
+    '-': [[(0.15, 0.37), (0.85, 0.37)]],
+    '+': [[(0.15, 0.37), (0.85, 0.37)], [(0.5, 0.02), (0.5, 0.72)]],
+    u'\u00b1': [[(0.15, 0.5), (0.85, 0.5)], [(0.5, 0.2), (0.5, 0.8)], [(0.15, 0.0), (0.85, 0.0)]],
+    '=': [[(0.15, 0.25), (0.85, 0.25)], [(0.15, 0.5), (0.85, 0.5)]],
+    u'\u00b7': [[(0.45, 0.37), (0.55, 0.37)]],
+    u'\u00d7': [[(0.25, 0.15), (0.75, 0.65)], [(0.25, 0.65), (0.75, 0.15)]],
+    u'\u00b0': [[(0.3, 0.75), (0.7, 0.75), (0.7, 1.0), (0.3, 1.0), (0.3, 0.75)]],
+    '/': [[(0.15, -0.25), (0.85, 1.1)]],
+    '(': [[(0.75, 1.1), (0.35, 0.45), (0.75, -0.25)]],
+    ')': [[(0.25, 1.1), (0.65, 0.45), (0.25, -0.25)]],
+    '[': [[(0.75, 1.1), (0.35, 1.1), (0.35, -0.25), (0.75, -0.25)]],
+    ']': [[(0.25, 1.1), (0.65, 1.1), (0.65, -0.25), (0.25, -0.25)]],
+    '|': [[(0.5, 1.1), (0.5, -0.25)]],
+    "'": [[(0.5, 1.0), (0.45, 0.75)]],
+    '%': [[(0.15, 0.0), (0.85, 1.0)], [(0.15, 0.8), (0.3, 0.8)], [(0.7, 0.2), (0.85, 0.2)]],
+    'e': [[(0.15, 0.3), (0.85, 0.3), (0.85, 0.6), (0.15, 0.6), (0.15, 0.0), (0.85, 0.0)]],
+    'E': [[(0.85, 1.0), (0.15, 1.0), (0.15, 0.0), (0.85, 0.0)], [(0.15, 0.5), (0.7, 0.5)]],
+    ' ': [],
+}
+
+
+def font_size_pt(size_name):
+    """
+    font size in TeX pt of LaTeX size command name ('small', 'tiny',...)
+    """
+    return FONT_SIZES.get(size_name, FONT_SIZES['normalsize'])
+
+
+def char_height(char):
+    """
+    height of character in em
+    """
+    if char in CHAR_HEIGHTS:
+        return CHAR_HEIGHTS[char]
+    if char.isdigit():
+        return DIGIT_HEIGHT
+    if char.isupper():
+        return CAP_HEIGHT
+    if char in 'bdfhklt':
+        return ASCENDER_HEIGHT
+    if char.islower():
+        return X_HEIGHT
+    return CAP_HEIGHT
+
+
+def char_depth(char):
+    """
+    depth of character in em
+    """
+    return CHAR_DEPTHS.get(char, 0.0)
+
+
+def _replace_command_(match):
+    name = match.group(1)
+    if name in TEX_SYMBOLS:
+        return TEX_SYMBOLS[name]
+    return ''
+
+
+def clean_text(expr):
+    """
+    approximate plain text of TeX expression: math shifts, braces, sub- and
+    superscript marks and unknown commands are removed. Lines are separated
+    by newline characters.
+    """
+    text = re.sub(r'\\\\(\[[^\]]*\])?', '\n', expr)  # line breaks
+    text = re.sub(r'\\(%s)\s*(\[[^\]]*\])?\s*\{[^{}]*\}(\{[^{}]*\})?' % '|'.join(TEX_DROP_ARGUMENT), '', text)
+    text = text.replace(r'\$', '\x00')
+    text = text.replace('$', '').replace('\x00', '$')
+    text = re.sub(r'\\([A-Za-z]+|.)\s?', _replace_command_, text)
+    text = text.replace('~', ' ')
+    for char in '{}^_':
+        text = text.replace(char, '')
+    return text
+
+
+def line_extent(line):
+    """
+    width, height and depth (em) of line of plain text
+    """
+    if len(line) == 0:
+        return 0.0, 0.0, 0.0
+    width = sum(CHAR_WIDTHS.get(char, DEFAULT_CHAR_WIDTH) for char in line)
+    height = max(char_height(char) for char in line)
+    depth = max(char_depth(char) for char in line)
+    return width, height, depth
+
+
+def wrap_lines(text, width=None):
+    """
+    splits plain text into lines, words wrap at width (em) if given
+    """
+    lines = []
+    for paragraph in text.split('\n'):
+        if width is None:
+            lines.append(paragraph.strip())
+            continue
+        line = ''
+        for word in paragraph.split():
+            candidate = word if line == '' else line + ' ' + word
+            if line != '' and line_extent(candidate)[0] > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def glyph_strokes(char):
+    """
+    stroke polylines of character in units of glyph box. Characters without
+    own glyph are drawn as boxes of their size.
+    """
+    if char in GLYPH_STROKES:
+        return GLYPH_STROKES[char]
+    height = char_height(char) / CAP_HEIGHT
+    depth = -char_depth(char) / CAP_HEIGHT
+    return [[(0.15, depth), (0.85, depth), (0.85, height), (0.15, height), (0.15, depth)]]
+
+
+def text_extent(text, size_name='normalsize', par_width=None):
+    """
+    estimated width, height and depth (cm) of TeX text with LaTeX size
+    size_name. Lines (\\\\ or wrapped at par_width cm) are stacked.
+    """
+    size_cm = font_size_pt(size_name) / 72.27 * 2.54
+    if par_width is not None:
+        par_width = par_width / size_cm
+    lines = wrap_lines(clean_text(text), par_width)
+    extents = [line_extent(line) for line in lines]
+    width = max(extent[0] for extent in extents)
+    if par_width is not None:
+        width = max(width, par_width)
+    depth = BASELINE_SKIP * (len(lines) - 1) + extents[-1][2]
+    return width * size_cm, extents[0][1] * size_cm, depth * size_cm
+
+
+# estimated extents of texts, see estimate_text_extents
+_extent_memo = {}
+_extent_memo_max_size = 4096  # oldest extents are dropped after this
+
+
+def estimate_text_extents(texts, size_name='normalsize'):
+    """
+    estimated widths, heights and depths (cm, numpy arrays) of texts
+    """
+    extents = numpy.zeros((len(texts), 3))
+    for idx, text in enumerate(texts):
+        key = (text, size_name)
+        if key not in _extent_memo:
+            if len(_extent_memo) >= _extent_memo_max_size:
+                # remove oldest entry
+                del _extent_memo[next(iter(_extent_memo))]
+            _extent_memo[key] = text_extent(text, size_name)
+        extents[idx] = _extent_memo[key]
+    return extents[:, 0], extents[:, 1], extents[:, 2]
+
+
+def clear_extent_memo():
+    """
+    empties memo of estimated text extents
+    """
+    _extent_memo.clear()
+
+
+def size_name_of(text_attrs, default='normalsize'):
+    """
+    LaTeX size name of pyx text attributes (pyx.text.size.small -> 'small')
+    """
+    for text_attr in text_attrs:
+        if isinstance(text_attr, pyx.text.size):
+            default = text_attr.size
+    return default
+
+
+def estimate_text_bboxes(text_defs):
+    """
+    estimated bounding boxes of texts to be drawn with c.text(x, y, text, attrs).
+    text_defs: list of (text, x, y, attrs) as in Nomo_Axis.texts
+    Returns numpy array of rows (llx, lly, urx, ury) in cm. Alignment (halign,
+    valign) and rotations of attrs are taken into account.
+    """
+    count = len(text_defs)
+    boxes = numpy.zeros((count, 4))
+    if count == 0:
+        return boxes
+    corners_x = numpy.zeros((count, 4))
+    corners_y = numpy.zeros((count, 4))
+    matrices = numpy.zeros((count, 2, 2))
+    anchors = numpy.zeros((count, 2))
+    for idx, (text, x, y, attrs) in enumerate(text_defs):
+        width, height, depth = estimate_text_extents([text], size_name_of(attrs))
+        box_align, v_align = 0.0, None
+        matrix = numpy.identity(2)
+        for text_attr in attrs:
+            if isinstance(text_attr, pyx.text.boxhalign):
+                box_align = text_attr.boxhalign
+            if isinstance(text_attr, pyx.text.valign):
+                v_align = text_attr.valign
+            if isinstance(text_attr, pyx.trafo.trafo_pt):
+                matrix = numpy.dot(numpy.array(text_attr.matrix), matrix)
+        width, height, depth = width[0], height[0], depth[0]
+        shift = 0.0
+        if v_align is not None:
+            shift = (1.0 - v_align) * height - v_align * depth
+        left = -box_align * width
+        corners_x[idx] = [left, left + width, left + width, left]
+        corners_y[idx] = [-depth - shift, -depth - shift, height - shift, height - shift]
+        matrices[idx] = matrix
+        anchors[idx] = [x, y]
+    rotated_x = matrices[:, 0, 0:1] * corners_x + matrices[:, 0, 1:2] * corners_y + anchors[:, 0:1]
+    rotated_y = matrices[:, 1, 0:1] * corners_x + matrices[:, 1, 1:2] * corners_y + anchors[:, 1:2]
+    boxes[:, 0] = rotated_x.min(axis=1)
+    boxes[:, 1] = rotated_y.min(axis=1)
+    boxes[:, 2] = rotated_x.max(axis=1)
+    boxes[:, 3] = rotated_y.max(axis=1)
+    return boxes
+
+
+def boxes_overlap(boxes, other_boxes, padding=0.0):
+    """
+    boolean array: True for each row of boxes that overlaps any row
+    of other_boxes (rows llx, lly, urx, ury)
+    """
+    if len(boxes) == 0 or len(other_boxes) == 0:
+        return numpy.zeros(len(boxes), dtype=bool)
+    a = boxes[:, numpy.newaxis, :]
+    b = other_boxes[numpy.newaxis, :, :]
+    overlap = (a[..., 0] < b[..., 2] + padding) & (b[..., 0] < a[..., 2] + padding) & \
+              (a[..., 1] < b[..., 3] + padding) & (b[..., 1] < a[..., 3] + padding)
+    return overlap.any(axis=1)
+
+
+def boxes_overlap_each_other(boxes, padding=0.0):
+    """
+    True if any two rows of boxes overlap. Boxes are put into grid of
+    cells at least as large as biggest box, so only boxes in neighbouring
+    cells are compared.
+    """
+    if len(boxes) < 2:
+        return False
+    cell = max(float((boxes[:, 2] - boxes[:, 0]).max()), float((boxes[:, 3] - boxes[:, 1]).max())) + padding
+    if cell <= 0.0:
+        cell = 1.0
+    cells = {}
+    for llx, lly, urx, ury in boxes.tolist():
+        i, j = int(math.floor(llx / cell)), int(math.floor(lly / cell))
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for llx2, lly2, urx2, ury2 in cells.get((i + di, j + dj), []):
+                    if llx < urx2 + padding and llx2 < urx + padding and \
+                            lly < ury2 + padding and lly2 < ury + padding:
+                        return True
+        cells.setdefault((i, j), []).append((llx, lly, urx, ury))
+    return False
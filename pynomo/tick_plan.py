@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Tick plan is a numpy structured array describing all ticks and tick texts
+of an axis. One row is one value at one level:
+
+    value   axis value u
+    level   tick level (0 = major)
+    x, y    position f(u), g(u)
+    dx, dy  unit tangent (turned to the tick side), tick points to (dy,-dx)
+    angle   text angle in degrees
+    tick    True if tick line is drawn
+    label   True if text is drawn
+"""
+
+import math
+import numpy
+
+TICK_PLAN_DTYPE = numpy.dtype([('value', float), ('level', int),
+                               ('x', float), ('y', float),
+                               ('dx', float), ('dy', float), ('angle', float),
+                               ('tick', bool), ('label', bool)])
+
+
+def empty_tick_plan():
+    """
+    tick plan with no rows
+    """
+    return numpy.zeros(0, dtype=TICK_PLAN_DTYPE)
+
+
+def is_tick_plan(obj):
+    """
+    True if obj is a tick plan array
+    """
+    return isinstance(obj, numpy.ndarray) and obj.dtype == TICK_PLAN_DTYPE
+
+
+def evaluate_array(func, values):
+    """
+    evaluates func(u) for array of values. Vectorized call is used if it gives
+    one value per input and agrees with scalar calls at two check points,
+    otherwise (functions written for scalars, math module etc.) func is called
+    one by one.
+    """
+    values = numpy.asarray(values, dtype=float)
+    if len(values) == 0:
+        return numpy.zeros(0)
+    try:
+        with numpy.errstate(all='ignore'):
+            result = numpy.asarray(func(values), dtype=float)
+            if result.shape == values.shape:
+                checks = sorted(set([len(values) // 2, len(values) - 1]))
+                expected = numpy.array([func(values[idx]) for idx in checks], dtype=float)
+                if numpy.allclose(result[checks], expected, rtol=1e-9, atol=1e-12, equal_nan=True):
+                    return result
+    except (TypeError, ValueError, AttributeError, ZeroDivisionError, OverflowError, IndexError):
+        pass
+    return numpy.array([func(u) for u in values], dtype=float)
+
+
+def find_plan_directions(values, f, g, turn, start, stop, full_angle=False, extra_angle=0.0):
+    """
+    vectorized version of nomo_axis.find_tick_directions for sorted values.
+    Returns arrays dx_units, dy_units, angles.
+    """
+    values = numpy.asarray(values, dtype=float)
+    if len(values) == 0:
+        return numpy.zeros(0), numpy.zeros(0), numpy.zeros(0)
+    # numerical derivative step from spacing to next value
+    if len(values) > 1:
+        spacing = numpy.diff(values)
+        spacing = numpy.append(spacing, spacing[-1])
+    else:  # only one element in list
+        spacing = numpy.array([abs(stop - start)])
+    du = spacing * 1e-6
+    dx = (evaluate_array(f, values + du) - evaluate_array(f, values)) * turn
+    dy = (evaluate_array(g, values + du) - evaluate_array(g, values)) * turn
+    with numpy.errstate(all='ignore'):
+        length = numpy.sqrt(dx ** 2 + dy ** 2)
+        dx_units = dx / length
+        dy_units = dy / length
+        angles = numpy.where(dy_units != 0.0,
+                             -numpy.arctan(dx_units / numpy.where(dy_units != 0.0, dy_units, 1.0)) * 180.0 / math.pi,
+                             0.0)
+    if full_angle:
+        angles = numpy.where((dx_units < 0.0) & (dy_units < 0.0), angles - 180.0, angles)
+        angles = numpy.where((dy_units < 0.0) & (dx_units >= 0.0), angles + 180.0, angles)
+    angles = angles + extra_angle
+    return dx_units, dy_units, angles
+
+
+def make_tick_plan(ticks, texts, f, g, turn, start, stop, full_angle=False, extra_angle=0.0):
+    """
+    makes tick plan from lists of tick values and text values
+    ticks = [tick_0_list, tick_1_list, ...]
+    texts = [text_0_list, text_1_list, ...]
+    turn = 1.0 or -1.0, see nomo_axis._determine_turn_
+    """
+    parts = []
+    for level in range(max(len(ticks), len(texts))):
+        tick_values = numpy.asarray(ticks[level] if level < len(ticks) else [], dtype=float)
+        text_values = numpy.asarray(texts[level] if level < len(texts) else [], dtype=float)
+        values = numpy.union1d(tick_values, text_values)
+        part = numpy.zeros(len(values), dtype=TICK_PLAN_DTYPE)
+        part['value'] = values
+        part['level'] = level
+        part['x'] = evaluate_array(f, values)
+        part['y'] = evaluate_array(g, values)
+        part['dx'], part['dy'], part['angle'] = \
+            find_plan_directions(values, f, g, turn, start, stop, full_angle, extra_angle)
+        part['tick'] = numpy.isin(values, tick_values)
+        part['label'] = numpy.isin(values, text_values)
+        parts.append(part)
+    if len(parts) == 0:
+        return empty_tick_plan()
+    return numpy.concatenate(parts)
+
+
+def plan_ticks(plan, level=None):
+    """
+    rows of plan that are drawn as tick lines (of given level)
+    """
+    mask = plan['tick']
+    if level is not None:
+        mask = mask & (plan['level'] == level)
+    return plan[mask]
+
+
+def plan_labels(plan, level=None):
+    """
+    rows of plan that are drawn as texts (of given level)
+    """
+    mask = plan['label']
+    if level is not None:
+        mask = mask & (plan['level'] == level)
+    return plan[mask]
+
+
+def plan_levels(plan):
+    """
+    number of levels in plan
+    """
+    if len(plan) == 0:
+        return 0
+    return int(plan['level'].max()) + 1
+
+
+def plan_to_lists(plan, levels=None):
+    """
+    gives back old style lists ticks = [tick_0_list,...], texts = [text_0_list,...]
+    """
+    if levels is None:
+        levels = plan_levels(plan)
+    ticks = [plan_ticks(plan, level)['value'].tolist() for level in range(levels)]
+    texts = [plan_labels(plan, level)['value'].tolist() for level in range(levels)]
+    return ticks, texts
+
+
+def plan_directions(rows):
+    """
+    old style direction lists (dx_units, dy_units, angles) of rows
+    """
+    return rows['dx'].tolist(), rows['dy'].tolist(), rows['angle'].tolist()
+
+
+def plan_tick_segments(rows, tick_length):
+    """
+    tick line coordinates x1, y1, x2, y2 (arrays) of rows
+    """
+    return rows['x'], rows['y'], \
+        rows['x'] + tick_length * rows['dy'], rows['y'] - tick_length * rows['dx']
+
+
+def plan_text_positions(rows, text_distance):
+    """
+    text anchor coordinates x, y (arrays) of rows
+    """
+    return rows['x'] + text_distance * rows['dy'], rows['y'] - text_distance * rows['dx']
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+#    This file is part of PyNomo -
+#    a program to create nomographs with Python (https://github.com/lefakkomies/pynomo)
+#
+#    Copyright (C) 2007-2019  Leif Roschier  <lefakkomies@users.sourceforge.net>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Tiled output of large nomograms (posters, wall charts). Drawing is cut to
+page size tiles that overlap a little. Each tile contains only the items
+(and subpaths of batched stroke paths) that intersect it, clipped to the
+tile, with registration marks and tile label in the page margin.
+"""
+
+import copy
+import math
+import pyx
+
+from .frozen_canvas import freeze_canvas
+from .nomo_text import flush_texts
+
+
+class Tiling(object):
+    """
+    tiles of finished canvas c. All sizes in cm.
+    width, height: size of drawing area of one tile (default A4 page with margin)
+    overlap: drawing that is repeated on neighbouring tiles
+    margin: page margin around drawing area for marks and label
+    marks: True = registration marks at corners of drawing area
+    labels: True = tile label 'row/col' below drawing area
+    """
+
+    def __init__(self, c, width=19.0, height=27.7, overlap=1.0, margin=1.0, marks=True, labels=True):
+        self.canvas = c
+        self.width_pt = pyx.unit.topt(width)
+        self.height_pt = pyx.unit.topt(height)
+        self.overlap_pt = pyx.unit.topt(overlap)
+        self.margin_pt = pyx.unit.topt(margin)
+        self.marks = marks
+        self.labels = labels
+        self.subpath_boxes = {}  # id(path) -> [(pathitems, box),...]
+        freeze_canvas(c)  # bounding boxes are asked for every tile
+        bbox = c.bbox()
+        self.llx, self.lly, self.urx, self.ury = bbox.llx_pt, bbox.lly_pt, bbox.urx_pt, bbox.ury_pt
+        self.cols = _tile_count_(self.urx - self.llx, self.width_pt, self.overlap_pt)
+        self.rows = _tile_count_(self.ury - self.lly, self.height_pt, self.overlap_pt)
+
+    def tiles(self):
+        """
+        yields (row, col, page canvas) of tiles, row 0 is top row. Tiles are
+        made one by one so that each can be written before next is made.
+        """
+        for row in range(self.rows):
+            for col in range(self.cols):
+                yield row, col, self.tile_canvas(row, col)
+
+    def tile_box(self, row, col):
+        """
+        drawing area (llx,lly,urx,ury) of tile in pt
+        """
+        llx = self.llx + col * (self.width_pt - self.overlap_pt)
+        ury = self.ury - row * (self.height_pt - self.overlap_pt)
+        return llx, ury - self.height_pt, llx + self.width_pt, ury
+
+    def page_bbox(self):
+        """
+        page size of tile as pyx bbox
+        """
+        return pyx.bbox.bbox_pt(0, 0, self.width_pt + 2 * self.margin_pt, self.height_pt + 2 * self.margin_pt)
+
+    def tile_canvas(self, row, col):
+        """
+        page canvas of tile: culled and clipped drawing, marks and label
+        """
+        box = self.tile_box(row, col)
+        llx, lly, urx, ury = box
+        drawing = cull_canvas(self.canvas, _enlarged_(box, 2 * self.margin_pt), self.subpath_boxes)
+        clipped = pyx.canvas.canvas([pyx.canvas.clip(pyx.path.rect_pt(llx, lly, urx - llx, ury - lly))])
+        if drawing is not None:
+            clipped.insert(drawing)
+        page = pyx.canvas.canvas()
+        page.settextengine(self.canvas.textengine)
+        page.insert(clipped, [pyx.trafo.translate_pt(self.margin_pt - llx, self.margin_pt - lly)])
+        if self.marks:
+            self._draw_marks_(page)
+        if self.labels:
+            page.text_pt(self.margin_pt, self.margin_pt / 2.0,
+                         '%i/%i' % (row + 1, col + 1), [pyx.text.valign.middle, pyx.text.size.scriptsize])
+            flush_texts(page)
+        return page
+
+    def _draw_marks_(self, page):
+        """
+        registration marks at corners of drawing area
+        """
+        m = self.margin_pt
+        length = 0.8 * m
+        marks = pyx.path.path()
+        for x, y, dx, dy in [(m, m, -1, -1), (m + self.width_pt, m, 1, -1),
+                             (m, m + self.height_pt, -1, 1), (m + self.width_pt, m + self.height_pt, 1, 1)]:
+            marks.append(pyx.path.moveto_pt(x + dx * 0.1 * m, y))
+            marks.append(pyx.path.lineto_pt(x + dx * length, y))
+            marks.append(pyx.path.moveto_pt(x, y + dy * 0.1 * m))
+            marks.append(pyx.path.lineto_pt(x, y + dy * length))
+        page.stroke(marks, [pyx.style.linewidth.thin, pyx.color.cmyk.Black])
+
+
+def write_tiles(tiling, file, output_format):
+    """
+    writes tiles. 'pdf' goes to one multi-page document in file (name or
+    file-like object), 'eps' and 'svg' to one file per tile named
+    file_rROW_cCOL.ext. Each tile is made when it is written.
+    """
+    if output_format == 'pdf':
+        pages = (pyx.document.page(page, bbox=tiling.page_bbox(), bboxenlarge=0)
+                 for row, col, page in tiling.tiles())
+        pyx.document.document(pages).writePDFfile(file)
+        return
+    if not isinstance(file, str):
+        raise ValueError("tiles of format '%s' need file name" % output_format)
+    base, dot, extension = file.rpartition('.')
+    if not dot:
+        base, extension = file, output_format
+    for row, col, page in tiling.tiles():
+        document = pyx.document.document([pyx.document.page(page, bbox=tiling.page_bbox(), bboxenlarge=0)])
+        filename = '%s_r%i_c%i.%s' % (base, row + 1, col + 1, extension)
+        if output_format == 'eps':
+            document.writeEPSfile(filename)
+        else:
+            document.writeSVGfile(filename)
+
+
+def cull_canvas(c, box, subpath_boxes=None):
+    """
+    copy of canvas c with only items that intersect box (llx,lly,urx,ury in pt,
+    coordinates where c is inserted). None if nothing intersects.
+    subpath_boxes: cache of subpath bounding boxes of batched paths, valid
+    as long as paths of c are alive (None = no cache between calls)
+    """
+    if subpath_boxes is None:
+        subpath_boxes = {}
+    if c.trafo is not pyx.trafo.identity:
+        box = _transformed_box_(box, c.trafo.inverse())
+    items = []
+    for item in c.items:
+        if isinstance(item, pyx.canvas.canvas):
+            item = cull_canvas(item, box, subpath_boxes)
+        elif isinstance(item, pyx.deco.decoratedpath) and item.fillstyles is None \
+                and not item.ornaments.items and not item.nostrokeranges:
+            item = _cull_path_(item, box, subpath_boxes)
+        elif not _intersects_(item.bbox(), box):
+            item = None
+        if item is not None:
+            items.append(item)
+    if not items:
+        return None
+    culled = copy.copy(c)
+    culled.items = items
+    return culled
+
+
+def _cull_path_(item, box, subpath_boxes):
+    """
+    stroked path with only subpaths that intersect box
+    """
+    key = id(item.path)
+    if key not in subpath_boxes:
+        subpath_boxes[key] = [(pathitems, pyx.path.path(*pathitems).bbox())
+                              for pathitems in _subpaths_(item.path.pathitems)]
+    subpaths = subpath_boxes[key]
+    kept = [pathitems for pathitems, bbox in subpaths if _intersects_(bbox, box)]
+    if not kept:
+        return None
+    if len(kept) == len(subpaths):
+        return item
+    culled = copy.copy(item)
+    culled.path = pyx.path.path(*[pathitem for pathitems in kept for pathitem in pathitems])
+    return culled
+
+
+def _subpaths_(pathitems):
+    """
+    path items split to subpaths at each moveto
+    """
+    subpaths = []
+    for pathitem in pathitems:
+        if isinstance(pathitem, (pyx.path.moveto_pt, pyx.path.moveto)) or not subpaths:
+            subpaths.append([])
+        subpaths[-1].append(pathitem)
+    return subpaths
+
+
+def _intersects_(bbox, box):
+    """
+    True if pyx bbox intersects box (llx,lly,urx,ury). Empty bbox intersects.
+    """
+    if bbox is None or bbox.llx_pt is None:
+        return True
+    return bbox.llx_pt <= box[2] and box[0] <= bbox.urx_pt and bbox.lly_pt <= box[3] and box[1] <= bbox.ury_pt
+
+
+def _transformed_box_(box, trafo):
+    """
+    bounding box of box corners transformed with trafo
+    """
+    llx, lly, urx, ury = box
+    points = [trafo.apply_pt(x, y) for x, y in [(llx, lly), (urx, lly), (llx, ury), (urx, ury)]]
+    xs = [x for x, y in points]
+    ys = [y for x, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _enlarged_(box, amount):
+    """
+    box enlarged by amount in pt to every direction
+    """
+    return box[0] - amount, box[1] - amount, box[2] + amount, box[3] + amount
+
+
+def _tile_count_(length, tile_length, overlap):
+    """
+    number of tiles needed to cover length
+    """
+    if length <= tile_length:
+        return 1
+    return int(math.ceil((length - overlap) / (tile_length - overlap)))